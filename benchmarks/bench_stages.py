@@ -0,0 +1,204 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+
+'''
+    Stage level benchmarks of the tweet pipeline.
+
+    For every corpus size a synthetic file is generated once (and kept in the
+    data directory for later runs), then each stage is timed on its own in a
+    fresh child process so its peak memory can be reported separately:
+
+        json      - extract_tweet_text_and_timestamp over the whole file
+        clean     - clean_string over the decoded texts
+        hashtags  - get_hashtags over the clean texts
+        update    - window insert and graph update for tweets with 2+ hashtags
+        evict     - window eviction and edge removal for the same tweets
+        output    - buffered writes of one ft1 line per tweet
+
+    Inputs of a stage are prepared before its timer starts, so every number
+    covers only that stage. Results are tweets/sec and the peak RSS of the
+    child process (which includes the prepared inputs). A stage that fails,
+    is killed or runs past --timeout is reported on stderr and skipped.
+
+    Usage: python benchmarks/bench_stages.py --sizes 10000,100000 --skew 1.2
+'''
+
+import argparse, multiprocessing, os, resource, sys, tempfile, time
+from Queue import Empty
+
+BENCH_DIR = os.path.dirname(os.path.realpath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+import solution
+from helper_modules import graph, window, output
+from synthetic_tweets import SyntheticTweets
+
+STAGES = ('json', 'clean', 'hashtags', 'update', 'evict', 'output')
+
+RESULT_TIMEOUT = 10 # Seconds to wait for the result of a child that exited cleanly
+
+
+'''
+    Function that returns the path of a synthetic corpus, generating it if needed
+'''
+def corpus(data_dir, lines, options):
+    name = 'tweets_{}_s{seed}_v{vocabulary}_k{skew}_h{mean_hashtags}_t{tweets_per_second}.txt'.format(lines, **options)
+    path = os.path.join(data_dir, name)
+    if not os.path.isfile(path):
+        if not os.path.isdir(data_dir):
+            os.makedirs(data_dir)
+        solution.print_out("Generating {}".format(path))
+        SyntheticTweets(**options).write(path + '.tmp', lines)
+        os.rename(path + '.tmp', path)
+    return path
+
+
+'''
+    Helper Functions: Inputs of each stage, prepared outside of the timer
+'''
+def decoded_tweets(input_file):
+    return list(solution.extract_tweet_text_and_timestamp(input_file))
+
+
+def clean_texts(input_file):
+    return [(solution.clean_string(text)[0], time_stamp, time_stamp_ms)
+            for (text, time_stamp, time_stamp_ms) in decoded_tweets(input_file)]
+
+
+def tagged_tweets(input_file):
+    hashtag_graph = solution.InsightChallengeSolution(input_file, os.devnull)
+    tweets = []
+    for text, time_stamp, time_stamp_ms in clean_texts(input_file):
+        hashtag_graph.text = text
+        tags = hashtag_graph.get_hashtags() if (r'#' in text) else set()
+        tweets.append((solution.tweet_time_to_epoch(time_stamp, time_stamp_ms), list(tags)))
+    return tweets
+
+
+'''
+    Stage functions: run one stage, return the number of tweets processed
+'''
+def stage_json(input_file):
+    start = time.time()
+    count = sum(1 for _ in solution.extract_tweet_text_and_timestamp(input_file))
+    return count, time.time() - start
+
+
+def stage_clean(input_file):
+    texts = [text for (text, _, _) in decoded_tweets(input_file)]
+    clean_string = solution.clean_string
+    start = time.time()
+    for text in texts:
+        clean_string(text)
+    return len(texts), time.time() - start
+
+
+def stage_hashtags(input_file):
+    texts = [text for (text, _, _) in clean_texts(input_file)]
+    hashtag_graph = solution.InsightChallengeSolution(input_file, os.devnull)
+    start = time.time()
+    for text in texts:
+        if (r'#' in text):
+            hashtag_graph.text = text
+            hashtag_graph.get_hashtags()
+    return len(texts), time.time() - start
+
+
+def stage_graph(input_file, timed_stage):
+    tweets = tagged_tweets(input_file)
+    hashtag_graph = solution.InsightChallengeSolution(input_file, os.devnull)
+    time_window = hashtag_graph.tweet_time_hashtag_graph
+    clock = time.time
+    elapsed = {'update': 0.0, 'evict': 0.0}
+
+    for epoch, tags in tweets:
+        start = clock()
+        for expired_tags in time_window.evict(epoch):
+            hashtag_graph.remove_hashtags_edge(list(expired_tags))
+        middle = clock()
+        if (len(tags) > 1):
+            time_window.add(epoch, tags)
+            hashtag_graph.update_graph(tags)
+            hashtag_graph.hashtag_graph_average_degrees()
+        end = clock()
+        elapsed['evict'] += middle - start
+        elapsed['update'] += end - middle
+    return len(tweets), elapsed[timed_stage]
+
+
+def stage_update(input_file):
+    return stage_graph(input_file, 'update')
+
+
+def stage_evict(input_file):
+    return stage_graph(input_file, 'evict')
+
+
+def stage_output(input_file):
+    lines = [solution.format_clean_tweet(text, time_stamp) for (text, time_stamp, _) in clean_texts(input_file)]
+    handle, path = tempfile.mkstemp(prefix='bench_ft1_')
+    os.close(handle)
+    try:
+        start = time.time()
+        with output.BufferedLineWriter(path, mode='w') as writer:
+            for line in lines:
+                writer.write_line(line)
+        return len(lines), time.time() - start
+    finally:
+        os.remove(path)
+
+
+'''
+    Child process entry: run a stage and report its timing and peak memory
+'''
+def run_stage(stage, input_file, results):
+    count, elapsed = globals()['stage_' + stage](input_file)
+    results.put((count, elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss))
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description='Time each stage of the tweet pipeline on synthetic corpora')
+    parser.add_argument('--sizes', default='10000,100000', help='comma separated corpus sizes, e.g 10000,100000,1000000,10000000')
+    parser.add_argument('--stages', default=','.join(STAGES), help='comma separated subset of ' + ','.join(STAGES))
+    parser.add_argument('--data-dir', default=os.path.join(BENCH_DIR, 'data'), help='where generated corpora are kept')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--vocabulary', type=int, default=10000, help='number of distinct hashtags')
+    parser.add_argument('--skew', type=float, default=1.1, help='Zipf exponent of hashtag popularity')
+    parser.add_argument('--mean-hashtags', type=float, default=1.5)
+    parser.add_argument('--tweets-per-second', type=float, default=50.0)
+    parser.add_argument('--timeout', type=float, help='seconds after which a stage is stopped and skipped')
+    args = parser.parse_args()
+
+    options = {'seed': args.seed, 'vocabulary': args.vocabulary, 'skew': args.skew,
+               'mean_hashtags': args.mean_hashtags, 'tweets_per_second': args.tweets_per_second}
+    stages = [stage for stage in args.stages.split(',') if stage]
+    for stage in stages:
+        if stage not in STAGES:
+            parser.error('unknown stage {}'.format(stage))
+
+    solution.print_out("{:>10} {:>9} {:>10} {:>14} {:>12}".format('tweets', 'stage', 'seconds', 'tweets/sec', 'peak MB'))
+    for size in [int(size) for size in args.sizes.split(',') if size]:
+        input_file = corpus(args.data_dir, size, options)
+        for stage in stages:
+            results = multiprocessing.Queue()
+            child = multiprocessing.Process(target=run_stage, args=(stage, input_file, results))
+            child.start()
+            child.join(args.timeout)
+
+            # A stage that raised, was killed (e.g out of memory) or timed out is reported and skipped
+            if child.is_alive():
+                child.terminate()
+                child.join()
+                sys.stderr.write("[bench_stages] - Error: stage {} on {} tweets timed out after {}s\n".format(stage, size, args.timeout))
+                continue
+            if (child.exitcode != 0):
+                sys.stderr.write("[bench_stages] - Error: stage {} on {} tweets failed with exit code {}\n".format(stage, size, child.exitcode))
+                continue
+            try:
+                count, elapsed, peak_kb = results.get(timeout=RESULT_TIMEOUT)
+            except Empty:
+                sys.stderr.write("[bench_stages] - Error: stage {} on {} tweets exited without a result\n".format(stage, size))
+                continue
+            rate = count / elapsed if elapsed else float('inf')
+            solution.print_out("{:>10} {:>9} {:>10.3f} {:>14.0f} {:>12.1f}".format(size, stage, elapsed, rate, peak_kb / 1024.0))
@@ -0,0 +1,155 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+
+'''
+    Reproducible synthetic tweet corpora for the benchmarks.
+
+    Lines follow the layout of the Twitter streaming API (created_at first,
+    timestamp_ms last, hashtags in entities) with a user object of realistic
+    size, so JSON decoding costs the same as on real captures. Everything is
+    driven by a seeded random generator: the same parameters always produce
+    the same file.
+
+    Usage: python benchmarks/synthetic_tweets.py output.txt --lines 100000 --skew 1.2
+'''
+
+import argparse, bisect, json, random, sys, time
+
+WORDS = ('the', 'data', 'stream', 'great', 'post', 'on', 'engineering', 'just', 'saw', 'new',
+         'and', 'improved', 'connector', 'for', 'summit', 'this', 'week', 'version', 'update',
+         'doing', 'work', 'excellent', 'today', 'love', 'my', 'team', 'we', 'are', 'live', 'now')
+
+UNICODE_WORDS = (u'café', u'João', u'❤', u'\U0001f494', u'naïve', u'¿Qué?')
+
+USER_TEMPLATE = ('"user":{{"id":{0},"id_str":"{0}","name":"Synthetic User {0}","screen_name":"synthetic{0}",'
+                 '"location":null,"url":null,"description":"Generated account used to benchmark the hashtag graph. '
+                 'Nothing to see here, this text only pads the object to a realistic size.","protected":false,'
+                 '"verified":false,"followers_count":{1},"friends_count":{2},"listed_count":0,"favourites_count":26,'
+                 '"statuses_count":2065,"created_at":"Sun Jul 26 01:15:03 +0000 2009","utc_offset":-7200,'
+                 '"time_zone":"Brasilia","geo_enabled":true,"lang":"en","contributors_enabled":false,'
+                 '"is_translator":false,"profile_background_color":"022330",'
+                 '"profile_background_image_url":"http:\\/\\/abs.twimg.com\\/images\\/themes\\/theme1\\/bg.png",'
+                 '"profile_background_image_url_https":"https:\\/\\/abs.twimg.com\\/images\\/themes\\/theme1\\/bg.png",'
+                 '"profile_background_tile":false,"profile_link_color":"0084B4","profile_sidebar_border_color":"C0DEED",'
+                 '"profile_sidebar_fill_color":"DDEEF6","profile_text_color":"333333","profile_use_background_image":true,'
+                 '"profile_image_url":"http:\\/\\/pbs.twimg.com\\/profile_images\\/{0}\\/synthetic_normal.jpg",'
+                 '"profile_image_url_https":"https:\\/\\/pbs.twimg.com\\/profile_images\\/{0}\\/synthetic_normal.jpg",'
+                 '"default_profile":true,"default_profile_image":false,"following":null,"follow_request_sent":null,'
+                 '"notifications":null}}')
+
+TWEET_TEMPLATE = ('{{"created_at":"{created_at}","id":{id},"id_str":"{id}","text":{text},'
+                  '"source":"\\u003ca href=\\"http:\\/\\/twitter.com\\" rel=\\"nofollow\\"\\u003eTwitter Web Client\\u003c\\/a\\u003e",'
+                  '"truncated":false,"in_reply_to_status_id":null,"in_reply_to_status_id_str":null,'
+                  '"in_reply_to_user_id":null,"in_reply_to_user_id_str":null,"in_reply_to_screen_name":null,'
+                  '{user},"geo":null,"coordinates":null,"place":null,"contributors":null,"is_quote_status":false,'
+                  '"retweet_count":0,"favorite_count":0,"entities":{{"hashtags":[{hashtags}],"urls":[],'
+                  '"user_mentions":[],"symbols":[]}},"favorited":false,"retweeted":false,"filter_level":"low",'
+                  '"lang":"en","timestamp_ms":"{timestamp_ms}"}}\n')
+
+
+'''
+    Class implementing a seeded generator of synthetic tweet lines
+
+    :type vocabulary: int - number of distinct hashtags
+    :type skew: float - Zipf exponent of hashtag popularity, 0 for uniform
+    :type mean_hashtags: float - average number of hashtags per tweet
+    :type max_hashtags: int - most hashtags a single tweet carries
+    :type tweets_per_second: float - timestamp density
+    :type unicode_ratio: float - share of tweets containing non basic latin characters
+    :type start_epoch: int - created_at of the first tweet
+'''
+
+class SyntheticTweets(object):
+
+    def __init__(self, seed=0, vocabulary=10000, skew=1.1, mean_hashtags=1.5, max_hashtags=8,
+                 tweets_per_second=50.0, unicode_ratio=0.25, start_epoch=1446141061):
+        self.random = random.Random(seed)
+        self.vocabulary = vocabulary
+        self.mean_hashtags = mean_hashtags
+        self.max_hashtags = max_hashtags
+        self.tweets_per_second = tweets_per_second
+        self.unicode_ratio = unicode_ratio
+        self.start_epoch = start_epoch
+
+        # Cumulative Zipf weights, sampled with bisect
+        total = 0.0
+        self.cumulative_weights = []
+        for rank in xrange(1, vocabulary + 1):
+            total += 1.0 / (rank ** skew)
+            self.cumulative_weights.append(total)
+        self.total_weight = total
+
+
+    '''
+        Function that draws a hashtag according to the popularity skew
+    '''
+    def hashtag(self):
+        rank = bisect.bisect_left(self.cumulative_weights, self.random.random() * self.total_weight)
+        return 'tag{}'.format(rank)
+
+
+    '''
+        Function that draws the number of hashtags of a tweet
+    '''
+    def num_hashtags(self):
+        probability = min(1.0, self.mean_hashtags / float(self.max_hashtags))
+        rand = self.random.random
+        return sum(1 for _ in xrange(self.max_hashtags) if rand() < probability)
+
+
+    '''
+        Function that returns the i-th line of the corpus
+    '''
+    def tweet(self, i):
+        rand = self.random
+        epoch = self.start_epoch + int(i / self.tweets_per_second)
+
+        words = [rand.choice(WORDS) for _ in xrange(rand.randint(4, 14))]
+        if (rand.random() < self.unicode_ratio):
+            words.insert(rand.randint(0, len(words)), rand.choice(UNICODE_WORDS))
+        for _ in xrange(self.num_hashtags()):
+            words.insert(rand.randint(0, len(words)), u'#' + self.hashtag())
+
+        text = u' '.join(words)
+        hashtags = []
+        position = 0
+        for word in words:
+            if word.startswith(u'#'):
+                hashtags.append('{{"text":"{}","indices":[{},{}]}}'.format(word[1:], position, position + len(word)))
+            position += len(word) + 1
+
+        user_id = rand.randint(1, 10 ** 9)
+        return TWEET_TEMPLATE.format(created_at=time.strftime('%a %b %d %H:%M:%S +0000 %Y', time.gmtime(epoch)),
+                                     id=659789756637822976 + i,
+                                     text=json.dumps(text),
+                                     user=USER_TEMPLATE.format(user_id, rand.randint(0, 5000), rand.randint(0, 5000)),
+                                     hashtags=','.join(hashtags),
+                                     timestamp_ms=epoch * 1000 + rand.randint(0, 999))
+
+
+    '''
+        Function that writes lines tweets to output_file
+    '''
+    def write(self, output_file, lines):
+        with open(output_file, 'w') as f:
+            for i in xrange(lines):
+                f.write(self.tweet(i))
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description='Generate a reproducible synthetic tweets file')
+    parser.add_argument('output_file')
+    parser.add_argument('--lines', type=int, default=10000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--vocabulary', type=int, default=10000, help='number of distinct hashtags')
+    parser.add_argument('--skew', type=float, default=1.1, help='Zipf exponent of hashtag popularity')
+    parser.add_argument('--mean-hashtags', type=float, default=1.5)
+    parser.add_argument('--max-hashtags', type=int, default=8)
+    parser.add_argument('--tweets-per-second', type=float, default=50.0)
+    parser.add_argument('--unicode-ratio', type=float, default=0.25)
+    args = parser.parse_args()
+
+    SyntheticTweets(args.seed, args.vocabulary, args.skew, args.mean_hashtags, args.max_hashtags,
+                    args.tweets_per_second, args.unicode_ratio).write(args.output_file, args.lines)
+    sys.stdout.write("Wrote {} tweets to {}\n".format(args.lines, args.output_file))
@@ -0,0 +1,44 @@
+import cPickle, os, zlib
+
+'''
+    Snapshots of the processing state, so an interrupted run can resume.
+
+    A snapshot is a plain dict (window contents, edge counts, output sizes,
+    input offset ...) pickled and zlib compressed. It replaces the previous
+    snapshot atomically: it is written to a temporary file, synced and renamed,
+    so the checkpoint file always holds the latest complete snapshot.
+'''
+
+CHECKPOINT_VERSION = 1
+
+
+'''
+    Function that atomically saves a snapshot
+
+    :type checkpoint_file: str
+    :type state: dict
+'''
+def save_checkpoint(checkpoint_file, state):
+    data = zlib.compress(cPickle.dumps((CHECKPOINT_VERSION, state), cPickle.HIGHEST_PROTOCOL), 1)
+    temp_file = checkpoint_file + '.tmp'
+    with open(temp_file, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.rename(temp_file, checkpoint_file)
+
+
+'''
+    Function that loads the latest snapshot
+
+    :type checkpoint_file: str
+    :rtype dict, or None if there is no snapshot yet
+'''
+def load_checkpoint(checkpoint_file):
+    if not os.path.isfile(checkpoint_file):
+        return None
+    with open(checkpoint_file, 'rb') as f:
+        (version, state) = cPickle.loads(zlib.decompress(f.read()))
+    if (version != CHECKPOINT_VERSION):
+        raise ValueError('checkpoint {} has version {}, expected {}'.format(checkpoint_file, version, CHECKPOINT_VERSION))
+    return state
@@ -0,0 +1,120 @@
+import re, string
+
+'''
+    Precompiled cleaner for tweet texts.
+
+    Everything is built once at import time. Cleaning a text is a handful of C
+    level passes: encoding to ASCII drops everything outside Basic Latin (and the
+    length difference tells whether the tweet had unicode), a translate table
+    deletes the remaining non-whitespace control characters, and split/join
+    turns every run of whitespace into a single space.
+
+    Texts come from the JSON decoder, so escapes are already replaced: \\n and
+    \\t end up as a single space and \\/ as /. Backslashes left in the text
+    are deleted like the original cleaner did, along with the \\uXXXX
+    sequences typed out literally, which only texts holding a backslash pay for.
+'''
+
+# Non-whitespace control characters, outside the printable Basic Latin range
+CONTROL_CHARS = ''.join(chr(c) for c in xrange(32) if chr(c) not in string.whitespace)
+
+# Byte values outside Basic Latin, for byte strings that were not decoded
+NON_ASCII_BYTES = ''.join(chr(c) for c in xrange(128, 256))
+
+PUNCTUATION = frozenset(string.punctuation)
+
+# Unicode escapes typed out in the text itself, e.g \\u2764, but for their backslash
+LITERAL_UNICODE_ESCAPE = re.compile(r'(?<=\\)u[0-9A-Fa-f]+')
+
+# Record separator used to clean a batch of texts in one go
+BATCH_SEPARATOR = u'\x1e'
+
+
+'''
+    Function that drops everything outside Basic Latin from a text
+
+    :type text: unicode or str
+    :rtype tuple(str, boolean) - ASCII text, True if unicode was removed
+'''
+def strip_non_ascii(text):
+    if isinstance(text, unicode):
+        ascii_text = text.encode('ascii', 'ignore')
+    else:
+        ascii_text = text.translate(None, NON_ASCII_BYTES)
+    return ascii_text, len(ascii_text) != len(text)
+
+
+'''
+    Function that cleans a single tweet text
+
+    :type text: unicode or str
+    :rtype tuple(str, boolean) - clean text, True if unicode was removed
+'''
+def clean_text(text):
+    if not text:
+        return ('', False)
+
+    ascii_text, has_unicode = strip_non_ascii(text)
+    ascii_text = ascii_text.translate(None, CONTROL_CHARS)
+    if ('\\' in ascii_text):
+        return strip_backslashes(ascii_text), has_unicode
+    return ' '.join(ascii_text.split()), has_unicode
+
+
+'''
+    Helper Function: Normalizes a text holding backslashes the way the original cleaner did
+
+    Literal \\uXXXX sequences go first, then whitespace is collapsed and only
+    then are the backslashes deleted, so a lone one between two words, or
+    one left by an escape, leaves their two spaces.
+'''
+def strip_backslashes(text):
+    text = ' '.join(LITERAL_UNICODE_ESCAPE.sub('', text).split())
+    return text.replace('\\', '').strip()
+
+
+'''
+    Function that cleans a list of tweet texts at once
+
+    The batch is encoded in a single call, only the whitespace normalization
+    runs per text. Falls back to cleaning text by text when a text contains
+    the batch separator or is a raw byte string.
+
+    :type texts: List[unicode or str]
+    :rtype List[tuple(str, boolean)]
+'''
+def clean_texts(texts):
+    if not texts:
+        return []
+
+    try:
+        joined = BATCH_SEPARATOR.join(texts)
+    except (UnicodeDecodeError, TypeError):
+        return [clean_text(text) for text in texts]
+
+    pieces = joined.encode('ascii', 'ignore').split(str(BATCH_SEPARATOR))
+    if (len(pieces) != len(texts)):
+        return [clean_text(text) for text in texts]
+
+    control_chars = CONTROL_CHARS
+    cleaned = []
+    for piece, text in zip(pieces, texts):
+        has_unicode = len(piece) != len(text)
+        piece = piece.translate(None, control_chars)
+        if ('\\' in piece):
+            cleaned.append((strip_backslashes(piece), has_unicode))
+        else:
+            cleaned.append((' '.join(piece.split()), has_unicode))
+    return cleaned
+
+
+'''
+    Function that checks if a clean text is worth writing out
+
+    True unless the text is empty or every word starts with punctuation.
+'''
+def is_printable(text):
+    for word in text.split():
+        if word[0] not in PUNCTUATION:
+            return True
+    return False
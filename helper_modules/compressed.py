@@ -0,0 +1,214 @@
+import bz2, subprocess, threading, zlib
+from distutils.spawn import find_executable
+from Queue import Queue, Full
+
+try:
+    import lzma
+except ImportError:
+    try:
+        from backports import lzma
+    except ImportError:
+        lzma = None
+
+'''
+    Transparent reading of gzip, bz2 and xz compressed tweet captures.
+
+    The compression is detected from the magic bytes of the file, or from its
+    extension when it is too short to tell. Decompression runs next to the
+    JSON decoding instead of in front of it: preferably in a gzip/bzip2/xz
+    child process writing into a large pipe buffer, otherwise in a reader
+    thread (zlib, bz2 and lzma release the GIL while they work) handing
+    decompressed chunks over a bounded queue. Either way the caller just
+    iterates over lines, exactly the lines of the uncompressed file.
+'''
+
+# Compression --> (magic bytes, file extensions, decompressing command)
+COMPRESSIONS = {
+    'gzip': ('\x1f\x8b', ('.gz', '.gzip'), ('gzip', '-dc')),
+    'bz2': ('BZh', ('.bz2',), ('bzip2', '-dc')),
+    'xz': ('\xfd7zXZ\x00', ('.xz',), ('xz', '-dc')),
+}
+
+READ_SIZE = 1 << 20 # Bytes of compressed input read at a time
+QUEUED_CHUNKS = 8 # Decompressed chunks the reader thread may run ahead
+
+
+'''
+    Function that tells how a file is compressed
+
+    :type filename: str
+    :rtype str - 'gzip', 'bz2', 'xz' or None for a plain file
+'''
+def detect_compression(filename):
+    with open(filename, 'rb') as f:
+        head = f.read(8)
+    for (compression, (magic, extensions, _)) in COMPRESSIONS.iteritems():
+        if head.startswith(magic):
+            return compression
+    if (len(head) < 6):
+        for (compression, (_, extensions, _)) in COMPRESSIONS.iteritems():
+            if filename.endswith(extensions):
+                return compression
+    return None
+
+
+'''
+    Function that opens a tweets file for reading lines, compressed or not
+
+    A plain file is returned as is. A compressed one is returned as a
+    CompressedInput, which has the same line iteration, close and context
+    manager interface.
+
+    :type filename: str
+    :type buffer_size: int - pipe buffer / chunk size of the decompressed stream
+    :type use_subprocess: boolean - False to always decompress in a thread
+'''
+def open_input(filename, buffer_size=READ_SIZE, use_subprocess=True):
+    compression = detect_compression(filename)
+    if compression is None:
+        return open(filename, 'rb')
+    return CompressedInput(filename, compression, buffer_size, use_subprocess)
+
+
+class CompressedInput(object):
+
+    '''
+        initializes a decompressed stream and starts its decompressor
+    '''
+    def __init__(self, filename, compression, buffer_size=READ_SIZE, use_subprocess=True):
+        self.filename = filename
+        self.compression = compression
+        self.buffer_size = buffer_size
+        self.process = None
+        self.thread = None
+
+        command = COMPRESSIONS[compression][2]
+        if (use_subprocess and find_executable(command[0])):
+            self.process = subprocess.Popen(list(command) + [filename], stdout=subprocess.PIPE,
+                                            bufsize=buffer_size, close_fds=True)
+        else:
+            self.new_decompressor() # Fails early when there is no decompressor for this format
+            self.chunks = Queue(QUEUED_CHUNKS)
+            self.stopped = False
+            self.thread = threading.Thread(target=self.decompress_chunks)
+            self.thread.daemon = True
+            self.thread.start()
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+    '''
+        Iterate over the decompressed lines, including their newline
+    '''
+    def __iter__(self):
+        if self.process is not None:
+            return self.process_lines()
+        return self.thread_lines()
+
+
+    '''
+        Helper Function: Lines read from the decompressing child process
+    '''
+    def process_lines(self):
+        for line in self.process.stdout:
+            yield line
+        if (self.process.wait() != 0):
+            raise IOError('{} failed on {}'.format(COMPRESSIONS[self.compression][2][0], self.filename))
+
+
+    '''
+        Helper Function: Lines cut out of the chunks of the reader thread
+    '''
+    def thread_lines(self):
+        partial = ''
+        while True:
+            chunk = self.chunks.get()
+            if chunk is None:
+                break
+            if isinstance(chunk, Exception):
+                raise IOError('could not decompress {}: {}'.format(self.filename, chunk))
+            lines = (partial + chunk).split('\n')
+            partial = lines.pop()
+            for line in lines:
+                yield line + '\n'
+        if partial:
+            yield partial
+
+
+    '''
+        Helper Function: A fresh decompressor for one stream of the file
+    '''
+    def new_decompressor(self):
+        if (self.compression == 'gzip'):
+            return zlib.decompressobj(16 + zlib.MAX_WBITS)
+        if (self.compression == 'bz2'):
+            return bz2.BZ2Decompressor()
+        if lzma is None:
+            raise IOError('no xz decompressor available for {}'.format(self.filename))
+        return lzma.LZMADecompressor()
+
+
+    '''
+        Reader thread: decompresses the file chunk by chunk into the queue
+
+        Files made of several concatenated streams (pigz, pbzip2 ...) are
+        followed across stream ends, trailing zero padding is ignored.
+    '''
+    def decompress_chunks(self):
+        try:
+            decompressor = self.new_decompressor()
+            with open(self.filename, 'rb') as f:
+                while not self.stopped:
+                    pending = f.read(self.buffer_size)
+                    if not pending:
+                        break
+                    while pending:
+                        try:
+                            data = decompressor.decompress(pending)
+                        except EOFError: # The last stream ended right at the end of the previous read
+                            if not pending.strip('\x00'):
+                                break
+                            decompressor = self.new_decompressor()
+                            continue
+                        if data:
+                            self.put_chunk(data)
+                        pending = decompressor.unused_data
+                        if pending:
+                            if not pending.strip('\x00'):
+                                break
+                            decompressor = self.new_decompressor()
+            self.put_chunk(None)
+        except Exception as e:
+            self.put_chunk(e)
+
+
+    '''
+        Helper Function: Hands a chunk to the consumer, gives up once the input is closed
+    '''
+    def put_chunk(self, chunk):
+        while not self.stopped:
+            try:
+                self.chunks.put(chunk, timeout=0.1)
+                return
+            except Full:
+                pass
+
+
+    '''
+        Function that stops the decompressor and releases its resources
+    '''
+    def close(self):
+        if self.process is not None:
+            if self.process.poll() is None:
+                self.process.terminate() # Before closing the pipe, spares a broken pipe message
+            self.process.stdout.close()
+            self.process.wait()
+        if self.thread is not None:
+            self.stopped = True
+            self.thread.join()
@@ -0,0 +1,180 @@
+import math
+from array import array
+
+'''
+    Class implementing the degree distribution of a graph, kept up to date edge by edge.
+
+    counts[d] is the number of vertices of degree d, and a Fenwick tree over
+    the counts holds their prefix sums, so the number of vertices of degree
+    up to d is a sum of O(log max degree) tree nodes. An edge change moves
+    its two vertices one bucket up or down, which only changes the prefix
+    sum of the bucket they leave: the update walks the tree paths of both
+    buckets until they merge, and the maximum degree only ever steps by one.
+    Ranks (median, percentiles) descend the tree in O(log max degree) steps,
+    however many vertices and buckets there are. The tree doubles when a
+    degree outgrows it.
+'''
+
+INITIAL_SIZE = 16 # Buckets of a new distribution, a power of two
+
+class DegreeHistogram(object):
+
+    __slots__ = ('counts', 'tree', 'num_vertices', 'max_degree')
+
+    '''
+        initializes an empty distribution
+    '''
+    def __init__(self):
+        self.reset()
+
+
+    '''
+        Setter: Forgets every vertex
+    '''
+    def reset(self):
+        self.counts = array('l', [0]) * INITIAL_SIZE # Degree --> number of vertices, counts[0] unused
+        self.tree = array('l', [0]) * INITIAL_SIZE # Fenwick tree of counts, 1-based
+        self.num_vertices = 0
+        self.max_degree = 0
+
+
+    '''
+        Helper Function: Doubles the buckets, rebuilding the tree from the counts in linear time
+    '''
+    def grow(self):
+        counts = self.counts
+        counts.extend(array('l', [0]) * len(counts))
+        size = len(counts)
+        tree = array('l', counts)
+        for index in xrange(1, size):
+            parent = index + (index & -index)
+            if (parent < size):
+                tree[parent] += tree[index]
+        self.tree = tree
+
+
+    '''
+        Helper Function: Adds delta to the vertices up to degree in the tree
+    '''
+    def add(self, degree, delta):
+        tree = self.tree
+        size = len(tree)
+        while (degree < size):
+            tree[degree] += delta
+            degree += degree & -degree
+
+
+    '''
+        Helper Function: Moves delta vertices from degree to degree + 1 in the tree
+
+        Only the prefix sum of degree changes. Both update paths are walked
+        from the lower index up until they meet, above that they cancel out.
+    '''
+    def shift(self, degree, delta):
+        tree = self.tree
+        size = len(tree)
+        (down, up) = (degree, degree + 1)
+        while (down != up):
+            if (down < up):
+                if (down >= size):
+                    break
+                tree[down] -= delta
+                down += down & -down
+            else:
+                if (up >= size):
+                    break
+                tree[up] += delta
+                up += up & -up
+
+
+    '''
+        Setter: A vertex of degree gains an edge, degree 0 being a new vertex
+    '''
+    def increment(self, degree):
+        counts = self.counts
+        if (degree + 1 == len(counts)):
+            self.grow()
+            counts = self.counts
+        if degree:
+            counts[degree] -= 1
+            self.shift(degree, 1)
+        else:
+            self.num_vertices += 1
+            self.add(1, 1)
+        degree += 1
+        counts[degree] += 1
+        if (degree > self.max_degree):
+            self.max_degree = degree
+
+
+    '''
+        Setter: A vertex of degree loses an edge, leaving the graph at degree 0
+    '''
+    def decrement(self, degree):
+        counts = self.counts
+        counts[degree] -= 1
+        if (degree > 1):
+            counts[degree - 1] += 1
+            self.shift(degree - 1, -1)
+        else:
+            self.num_vertices -= 1
+            self.add(1, -1)
+        if (degree == self.max_degree and not counts[degree]):
+            self.max_degree = degree - 1 # The vertex itself is now there, or the graph is empty
+
+
+    '''
+        Function that returns the degree of the vertex at rank in ascending degree order
+
+        Descends the tree from its largest power of two, keeping the longest
+        prefix of buckets holding fewer than rank vertices.
+
+        :type rank: int - 1 for the lowest degree up to num_vertices
+    '''
+    def degree_at_rank(self, rank):
+        if (rank < 1 or rank > self.num_vertices):
+            return 0
+        tree = self.tree
+        size = len(tree)
+        degree = 0
+        step = size >> 1
+        while step:
+            if (degree + step < size and tree[degree + step] < rank):
+                degree += step
+                rank -= tree[degree]
+            step >>= 1
+        return degree + 1
+
+
+    '''
+        Getter: Median degree, the mean of the two middle ones for an even number of vertices
+    '''
+    def median(self):
+        n = self.num_vertices
+        if not n:
+            return 0.0
+        if (n % 2):
+            return float(self.degree_at_rank(n // 2 + 1))
+        return (self.degree_at_rank(n // 2) + self.degree_at_rank(n // 2 + 1)) / 2.0
+
+
+    '''
+        Getter: Nearest rank percentile of the degrees
+
+        :type percent: float - between 0 and 100
+    '''
+    def percentile(self, percent):
+        n = self.num_vertices
+        if not n:
+            return 0
+        return self.degree_at_rank(max(1, int(math.ceil(percent * n / 100.0))))
+
+
+    '''
+        Getter: Non empty buckets, a walk over every degree up to the maximum
+
+        :rtype List[tuple(degree, number of vertices)]
+    '''
+    def histogram(self):
+        counts = self.counts
+        return [(degree, counts[degree]) for degree in xrange(1, self.max_degree + 1) if counts[degree]]
@@ -0,0 +1,118 @@
+import csv, struct
+from array import array
+
+'''
+    Streaming export of a hashtag graph as an edge list.
+
+    Edges come straight from Graph.iter_edge_counts and are written as they
+    are produced, the full edge list is never built. Two formats:
+
+        csv     - one "source,target,count" row per undirected edge
+        binary  - header, vertex name table, then packed edge records:
+
+                  8s  magic 'HTEDGE01'
+                  I   number of vertices, I number of edges   (little endian)
+                  per vertex: H name length, name bytes       (index = order)
+                  per edge:   I source, I target, I count     (vertex indexes)
+
+    count is the number of live tweets carrying the edge.
+'''
+
+BINARY_MAGIC = 'HTEDGE01'
+BINARY_HEADER = struct.Struct('<8sII')
+NAME_LENGTH = struct.Struct('<H')
+EDGES_PER_WRITE = 4096
+RECORD_ITEM_SIZE = array('I').itemsize # Bytes of each field of an edge record
+
+
+'''
+    Function that writes the edges of a graph as CSV
+
+    :type graph: Graph
+    :type handle: file
+    :type name: function(vertex) -> str, e.g to turn interned ids back into hashtags
+    :rtype int - number of edges written
+'''
+def write_edges_csv(graph, handle, name=None):
+    writer = csv.writer(handle, lineterminator='\n')
+    writer.writerow(('source', 'target', 'count'))
+    count = 0
+    for ((v1, v2), edge_count) in graph.iter_edge_counts():
+        if name is not None:
+            (v1, v2) = (name(v1), name(v2))
+        writer.writerow((v1, v2, edge_count))
+        count += 1
+    return count
+
+
+'''
+    Function that writes the edges of a graph in the binary format
+
+    :type graph: Graph
+    :type handle: file opened in binary mode, or any object with a write method
+    :type name: function(vertex) -> str
+    :rtype int - number of edges written
+'''
+def write_edges_binary(graph, handle, name=None):
+    vertices = graph.get_vertices()
+    handle.write(BINARY_HEADER.pack(BINARY_MAGIC, len(vertices), len(graph.edge_counts)))
+
+    index = {}
+    for vertex in vertices:
+        index[vertex] = len(index)
+        vertex_name = str(name(vertex) if name is not None else vertex)
+        handle.write(NAME_LENGTH.pack(len(vertex_name)))
+        handle.write(vertex_name)
+
+    records = array('I')
+    count = 0
+    for ((v1, v2), edge_count) in graph.iter_edge_counts():
+        records.extend((index[v1], index[v2], edge_count))
+        count += 1
+        if (len(records) >= 3 * EDGES_PER_WRITE):
+            write_records(handle, records)
+            records = array('I')
+    write_records(handle, records)
+    return count
+
+
+'''
+    Helper Function: Writes packed edge records little endian
+'''
+def write_records(handle, records):
+    if (struct.pack('=I', 1) != struct.pack('<I', 1)):
+        records.byteswap()
+    handle.write(records.tostring())
+
+
+'''
+    Generator of the edges of a binary export, with vertex names
+
+    :type handle: file opened in binary mode, or any object with a read method
+    :rtype generator of tuple(str, str, int)
+'''
+def read_edges_binary(handle):
+    header = handle.read(BINARY_HEADER.size)
+    if (len(header) != BINARY_HEADER.size):
+        raise ValueError('not a binary edge export')
+    (magic, num_vertices, num_edges) = BINARY_HEADER.unpack(header)
+    if (magic != BINARY_MAGIC):
+        raise ValueError('not a binary edge export')
+
+    names = []
+    for _ in xrange(num_vertices):
+        (length,) = NAME_LENGTH.unpack(handle.read(NAME_LENGTH.size))
+        names.append(handle.read(length))
+
+    remaining = num_edges
+    while remaining:
+        size = 3 * min(remaining, EDGES_PER_WRITE) * RECORD_ITEM_SIZE
+        data = handle.read(size)
+        if (len(data) != size):
+            raise ValueError('truncated binary edge export')
+        records = array('I', data)
+        if (struct.pack('=I', 1) != struct.pack('<I', 1)):
+            records.byteswap()
+        for i in xrange(0, len(records), 3):
+            yield names[records[i]], names[records[i + 1]], records[i + 2]
+        remaining -= len(records) // 3
@@ -0,0 +1,86 @@
+import os, time
+
+'''
+    Follow a tweets file as it is appended to, like tail -f.
+
+    New bytes are read in large chunks and only complete lines are handed out;
+    a partial trailing line is kept until the rest of it (and its newline)
+    arrives. When the reader has caught up it polls for more data, starting
+    at poll_interval and backing off up to max_poll_interval while the file
+    stays quiet. If the file is truncated or replaced (log rotation) it is
+    reopened from the start. A last line without a newline is handed out
+    when the reader gives up waiting, like a batch read of the finished file
+    would.
+'''
+
+READ_SIZE = 1 << 20
+
+
+'''
+    Generator of the complete lines appended to a file
+
+    Yields (end offset, line) for every complete line, and None each time it
+    has caught up with the writer, so the caller can flush its outputs before
+    the reader sleeps. Stops after idle_timeout seconds without new data,
+    yielding the trailing line first if the file does not end with a
+    newline, or runs forever when idle_timeout is None.
+
+    :type filename: str
+    :type start_offset: int - byte offset to start reading from
+    :type poll_interval: float - seconds between polls right after new data
+    :type max_poll_interval: float - longest wait between polls of a quiet file
+    :type idle_timeout: float or None
+'''
+def follow_lines(filename, start_offset=0, poll_interval=0.05, max_poll_interval=1.0, idle_timeout=None):
+    handle = open(filename, 'rb')
+    try:
+        handle.seek(start_offset)
+        position = start_offset # Offset right after the last complete line handed out
+        partial = ''
+        wait = poll_interval
+        idle_since = None
+
+        while True:
+            chunk = handle.read(READ_SIZE)
+            if chunk:
+                lines = (partial + chunk).split('\n')
+                partial = lines.pop()
+                for line in lines:
+                    position += len(line) + 1
+                    yield position, line + '\n'
+                wait = poll_interval
+                idle_since = None
+                continue
+
+            # Caught up with the writer
+            if idle_since is None:
+                idle_since = time.time()
+                yield None
+            elif (idle_timeout is not None and time.time() - idle_since >= idle_timeout):
+                if partial:
+                    yield position + len(partial), partial
+                return
+
+            if file_replaced(filename, handle, position + len(partial)):
+                handle.close()
+                handle = open(filename, 'rb')
+                position = 0
+                partial = ''
+                continue
+
+            time.sleep(wait)
+            wait = min(wait * 2, max_poll_interval)
+    finally:
+        handle.close()
+
+
+'''
+    Helper Function: True if the followed file was truncated or replaced
+'''
+def file_replaced(filename, handle, read_offset):
+    try:
+        stat = os.stat(filename)
+    except OSError:
+        return False # Being rotated, keep reading the old file until the new one appears
+    current = os.fstat(handle.fileno())
+    return (stat.st_ino != current.st_ino or stat.st_dev != current.st_dev or stat.st_size < read_offset)
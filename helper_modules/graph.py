@@ -1,23 +1,40 @@
-from collections import OrderedDict
-
 # Graph implementation adapted from Graphs in Python (http://www.python-course.eu/graphs_python.php) to suit the chosen design f
 '''
     Class implementing the behaviors, attributes and functionalities of a graph needed for a
     hashtag graph
     
-    Using OrderedDict to hold order of insertion of hashtags into graph.
+    Adjacency is held in sets so edge insert/delete is O(1). Edges are undirected
+    and reference counted: each live tweet carrying a pair of hashtags adds one to
+    the count of that edge, and the edge only leaves the graph when the last of
+    those tweets is evicted. Vertices whose degree reaches zero are dropped.
     
 '''
 
+from array import array
+
+from helper_modules.degrees import DegreeHistogram
+
 # Graph implemented with a dictionary
 class Graph(object):
 
+    __slots__ = ('graph_dict', 'edge_counts', 'total_degree', 'degree_histogram')
+
     '''
         initializes a graph object
+        
+        track_degrees keeps a DegreeHistogram of the vertex degrees up to date
+        for max, median and percentile queries.
     '''
     
-    def __init__(self, graph_dict = OrderedDict()):
-        self.graph_dict = graph_dict
+    def __init__(self, graph_dict = None, track_degrees=False):
+        self.graph_dict = graph_dict if graph_dict is not None else {}
+        self.edge_counts = {} # Edge key --> number of live tweets contributing the edge
+        self.total_degree = sum(len(n) for n in self.graph_dict.values()) # Running sum of edge endpoints
+        self.degree_histogram = DegreeHistogram() if track_degrees else None
+        if track_degrees:
+            for neighbors in self.graph_dict.values():
+                for degree in xrange(len(neighbors)):
+                    self.degree_histogram.increment(degree)
 
     '''
         Getter: Function that returns all vertices currently  of a graph
@@ -26,6 +43,12 @@ class Graph(object):
     def get_vertices(self):
         return list(self.graph_dict.keys())
 
+    '''
+        Getter: Adjacent vertices of a vertex, empty if it is not in the graph
+    '''
+    def neighbors(self, vertex):
+        return self.graph_dict.get(vertex, ())
+
     '''
         Getter: Returns edges of a graph
         :rtype List(set)
@@ -38,65 +61,140 @@ class Graph(object):
         Setter: Adds a vertex to a graph
         
         If vertex exists in graph, nothing is added, 
-        otherwise adds vertex with an empty list
+        otherwise adds vertex with an empty set
         to collect it's adjacent neighbors. 
     '''
     def add_vertex(self, vertex):
         if (vertex not in self.graph_dict):
-            self.graph_dict[vertex] = []
+            self.graph_dict[vertex] = set()
 
     
+    '''
+        Helper Function: Key under which an undirected edge is counted.
+    '''
+    @staticmethod
+    def edge_key(v1, v2):
+        return (v1, v2) if (v1 < v2) else (v2, v1)
+
+
     '''
         Setter: Adds an edge to a graph
         
-        Edge is assumed as a set of iterable; tuple, list or set
+        Edge is assumed as a set of iterable; tuple, list or set.
+        Adding an edge that is already live only bumps its count.
+        Self connections are ignored.
     '''       
     
     def add_edge(self, edge):
         (v1, v2) = tuple(edge)
-        if (v1 in self.graph_dict):
-            if (v2 not in self.graph_dict[v1]):
-                self.graph_dict[v1].append(v2)
-        else:
-            self.graph_dict[v1] = [v2]
+        if (v1 == v2):
+            return
+        key = self.edge_key(v1, v2)
+        count = self.edge_counts.get(key, 0)
+        self.edge_counts[key] = count + 1
+        if (count == 0):
+            graph = self.graph_dict
+            if (v1 not in graph):
+                graph[v1] = set()
+            if (v2 not in graph):
+                graph[v2] = set()
+            graph[v1].add(v2)
+            graph[v2].add(v1)
+            self.total_degree += 2
+            if self.degree_histogram is not None:
+                self.degree_histogram.increment(len(graph[v1]) - 1)
+                self.degree_histogram.increment(len(graph[v2]) - 1)
 
     
     
     '''
         Function that removes edge between two vertices.
         Edge is a set/tuple of vertices
+        
+        The edge is only deleted once no live tweet contributes it anymore,
+        vertices left without neighbors are removed from the graph.
     '''
     def remove_edge(self, edge):
         (v1, v2) = tuple(edge)
-        if (v1 in self.graph_dict):
-            if (v2 in self.graph_dict[v1]): # For readability, could use one if cond1 and cond2
-                self.graph_dict[v1].remove(v2)
-                
+        key = self.edge_key(v1, v2)
+        count = self.edge_counts.get(key, 0)
+        if (count > 1):
+            self.edge_counts[key] = count - 1
+        elif (count == 1):
+            del self.edge_counts[key]
+            graph = self.graph_dict
+            graph[v1].discard(v2)
+            graph[v2].discard(v1)
+            self.total_degree -= 2
+            if self.degree_histogram is not None:
+                self.degree_histogram.decrement(len(graph[v1]) + 1)
+                self.degree_histogram.decrement(len(graph[v2]) + 1)
+            if not graph[v1]:
+                del graph[v1]
+            if not graph[v2]:
+                del graph[v2]
                 
     
+    '''
+        Setter: Rebuild the graph from edge counts, e.g from a checkpoint
+        
+        :type edge_counts: dict of edge key --> number of live tweets contributing it
+    '''
+    def load_edge_counts(self, edge_counts):
+        self.graph_dict = {}
+        self.edge_counts = {}
+        self.total_degree = 0
+        if self.degree_histogram is not None:
+            self.degree_histogram.reset()
+        for (v1, v2), count in edge_counts.iteritems():
+            self.add_edge((v1, v2))
+            self.edge_counts[self.edge_key(v1, v2)] = count
+    
+    
+    '''
+        Getter: Live edges with their counts
+        
+        :rtype generator of ((v1, v2), count)
+    '''
+    def iter_edge_counts(self):
+        return self.edge_counts.iteritems()
+    
+    
     '''
         Function that calculates the degree of a single vertex.
         
         Degree being number of edges leading out of a vertex to 
         adject vertices. In general cases a vertex can have a cycle,
-        but for simplicity in this challenge we avoid cycles. But if 
-        cycles were allowed, then degree of a vertex would be sum of adjacent
-        vertices plus occurence of vertex in it's own adject neighbor list
+        but for simplicity in this challenge we avoid cycles, add_edge
+        never stores a vertex in it's own adjacent neighbor set
     '''
     def vertex_degree(self, vertex):
-        neighbors =  self.graph_dict[vertex]
-        degree = len(neighbors) + neighbors.count(vertex)
-        return degree
+        return len(self.graph_dict[vertex])
     
     
     '''
         Calculate Complete Graph Average Degrees
+        
+        Answered in constant time from the running total of edge endpoints,
+        which add_edge/remove_edge keep up to date, and the live vertex count.
     '''
     def get_graph_average_degrees(self):
-        running_total = 0
-        for vertex in self.graph_dict:
-            running_total += self.vertex_degree(vertex)
-        return running_total / float(len(self.graph_dict))
+        num_vertices = len(self.graph_dict)
+        if not num_vertices:
+            return 0.0
+        return self.total_degree / float(num_vertices)
+    
+    '''
+        Generator of the edges of the graph, each undirected edge once
+        
+        Walks the edge counts, so it is linear in the number of edges and
+        never holds more than one edge.
+        
+        :rtype generator of tuple(v1, v2)
+    '''
+    def iter_edges(self):
+        for (edge, _) in self.iter_edge_counts():
+            yield edge
     
     '''
         Helper Function: Generate the edges of the graph.
@@ -104,41 +202,308 @@ class Graph(object):
         Edges are internally represented as set two vertices 
     '''
     def generate_graph_edges(self):
-        edges = []
-        for vertex in self.graph_dict:
-            for neighbour in self.graph_dict[vertex]:
-                if ({neighbour, vertex} not in edges):
-                    edges.append({vertex, neighbour})
-        return edges
+        return [set(edge) for edge in self.iter_edges()]
 
     '''
-        Function that finds a path between two vertices in graph
+        Function that finds a shortest path between two vertices in graph
+        
+        Bidirectional breadth first search: both ends grow a frontier one level
+        at a time, always the smaller one, until they meet. Iterative, so long
+        paths through large clusters need neither recursion nor path copies.
+        
+        :rtype List of vertices from st to en, None if they are not connected
     '''
-    def find_path(self, st, en, path=[]):
-        graph = self.graph_dict
-        path = path + [st]
+    def find_path(self, st, en):
         if (st == en):
-            return path
-        if (st not in graph):
+            return [st]
+        if not self.neighbors(st) or not self.neighbors(en):
+            return None
+        
+        parents_st = {st: None} # Vertex --> previous vertex on the way from st
+        parents_en = {en: None} # Vertex --> next vertex on the way to en
+        frontier_st = [st]
+        frontier_en = [en]
+        meet = None
+        while (meet is None and frontier_st and frontier_en):
+            if (len(frontier_st) <= len(frontier_en)):
+                (frontier_st, meet) = self.expand_frontier(frontier_st, parents_st, parents_en)
+            else:
+                (frontier_en, meet) = self.expand_frontier(frontier_en, parents_en, parents_st)
+        if meet is None:
             return None
-        for vertex in graph[st]:
-            if (vertex not in path):
-                extended_path = self.find_path(vertex, 
-                                               en, 
-                                               path)
-                if (extended_path): 
-                    return extended_path
-        return None
+        
+        path = []
+        vertex = meet
+        while vertex is not None:
+            path.append(vertex)
+            vertex = parents_st[vertex]
+        path.reverse()
+        vertex = parents_en[meet]
+        while vertex is not None:
+            path.append(vertex)
+            vertex = parents_en[vertex]
+        return path
+    
+    
+    '''
+        Helper Function: Grows a search frontier by one level for find_path
+        
+        :rtype tuple(next frontier, vertex reached by both searches or None)
+    '''
+    def expand_frontier(self, frontier, parents, other_parents):
+        neighbors = self.neighbors
+        next_frontier = []
+        for vertex in frontier:
+            for neighbour in neighbors(vertex):
+                if (neighbour not in parents):
+                    parents[neighbour] = vertex
+                    if (neighbour in other_parents):
+                        return next_frontier, neighbour
+                    next_frontier.append(neighbour)
+        return next_frontier, None
+    
+    
+    '''
+        Generator of the connected components of the graph
+        
+        Each component is found by an iterative breadth first search from a
+        vertex no earlier component reached, O(V + E) overall.
+        
+        :rtype generator of List of vertices
+    '''
+    def connected_components(self):
+        neighbors = self.neighbors
+        seen = set()
+        for vertex in self.get_vertices():
+            if (vertex in seen):
+                continue
+            seen.add(vertex)
+            component = [vertex]
+            for member in component: # Grows while it is walked
+                for neighbour in neighbors(member):
+                    if (neighbour not in seen):
+                        seen.add(neighbour)
+                        component.append(neighbour)
+            yield component
+    
+    
+    '''
+        Function that summarizes the connected components of the graph
+        
+        :rtype tuple(int, int) - number of components, size of the largest one
+    '''
+    def get_component_stats(self):
+        count = 0
+        largest = 0
+        for component in self.connected_components():
+            count += 1
+            if (len(component) > largest):
+                largest = len(component)
+        return count, largest
    
 
     '''
         Overwritten function: To have a representation of graph when printed.
     '''
     def __str__(self):
-        result = "vertices: "
-        for v in self.graph_dict:
-            result += str(v) + " "
-        result += "\nedges: "
-        for e in self.generate_graph_edges():
-            result += str(e) + " "
-        return result
+        return "vertices: {}\nedges: {}".format(" ".join(str(v) for v in self.get_vertices()),
+                                                " ".join(str(set(e)) for e in self.iter_edges()))
+
+
+
+'''
+    Class implementing the same hashtag graph over dense integer vertex ids.
+    
+    Meant for vertices interned by helper_modules.interning, ids index a flat
+    list of adjacency arrays instead of a dictionary of sets, and edge counts
+    are keyed by both ids packed in one integer instead of a tuple. Neighbors
+    are unordered, so removing one is a swap with the last element. Its slot
+    is found by scanning at most HUB_DEGREE neighbors; above that degree a
+    vertex gets a neighbor --> slot map, so hub tags like #news do not pay
+    for their degree on every removal while the many small vertices keep
+    just their array. Ids must be non negative and below 2**32.
+'''
+
+class CompactGraph(Graph):
+
+    __slots__ = ('adjacency', 'hub_slots', 'num_vertices')
+
+    HUB_DEGREE = 256 # Largest degree searched by a scan, see remove_neighbor
+
+    '''
+        initializes an empty compact graph, see Graph for track_degrees
+    '''
+    def __init__(self, track_degrees=False):
+        self.graph_dict = None
+        self.adjacency = [] # Vertex id --> array of neighbor ids, None when the vertex is not in the graph
+        self.hub_slots = {} # Vertex id of degree above HUB_DEGREE --> {neighbor id: index in its adjacency array}
+        self.num_vertices = 0
+        self.edge_counts = {} # Packed edge key --> number of live tweets contributing the edge
+        self.total_degree = 0
+        self.degree_histogram = DegreeHistogram() if track_degrees else None
+
+
+    '''
+        Getter: Function that returns all vertices currently of a graph
+        :rtype List(int)
+    '''
+    def get_vertices(self):
+        return [vertex for vertex, neighbors in enumerate(self.adjacency) if neighbors is not None]
+
+
+    '''
+        Getter: Adjacent vertices of a vertex, empty if it is not in the graph
+    '''
+    def neighbors(self, vertex):
+        if (vertex < len(self.adjacency) and self.adjacency[vertex] is not None):
+            return self.adjacency[vertex]
+        return ()
+
+
+    '''
+        Setter: Adds a vertex to a graph, nothing happens if it is already in
+    '''
+    def add_vertex(self, vertex):
+        adjacency = self.adjacency
+        if (vertex >= len(adjacency)):
+            adjacency.extend([None] * (vertex + 1 - len(adjacency)))
+        if adjacency[vertex] is None:
+            adjacency[vertex] = array('l')
+            self.num_vertices += 1
+
+
+    '''
+        Helper Function: Key under which an undirected edge is counted.
+    '''
+    @staticmethod
+    def edge_key(v1, v2):
+        return (v1 << 32 | v2) if (v1 < v2) else (v2 << 32 | v1)
+
+
+    '''
+        Setter: Adds an edge between two vertex ids, see Graph.add_edge
+    '''
+    def add_edge(self, edge):
+        (v1, v2) = tuple(edge)
+        if (v1 == v2):
+            return
+        key = (v1 << 32 | v2) if (v1 < v2) else (v2 << 32 | v1)
+        count = self.edge_counts.get(key, 0)
+        self.edge_counts[key] = count + 1
+        if (count == 0):
+            self.add_vertex(v1)
+            self.add_vertex(v2)
+            (neighbors1, neighbors2) = (self.adjacency[v1], self.adjacency[v2])
+            # Only vertices past half of HUB_DEGREE may have a slot map to keep up to date
+            if (len(neighbors1) < self.HUB_DEGREE // 2):
+                neighbors1.append(v2)
+            else:
+                self.add_neighbor(v1, v2)
+            if (len(neighbors2) < self.HUB_DEGREE // 2):
+                neighbors2.append(v1)
+            else:
+                self.add_neighbor(v2, v1)
+            self.total_degree += 2
+            if self.degree_histogram is not None:
+                self.degree_histogram.increment(len(self.adjacency[v1]) - 1)
+                self.degree_histogram.increment(len(self.adjacency[v2]) - 1)
+
+
+    '''
+        Setter: Removes an edge between two vertex ids, see Graph.remove_edge
+    '''
+    def remove_edge(self, edge):
+        (v1, v2) = tuple(edge)
+        key = (v1 << 32 | v2) if (v1 < v2) else (v2 << 32 | v1)
+        count = self.edge_counts.get(key, 0)
+        if (count > 1):
+            self.edge_counts[key] = count - 1
+        elif (count == 1):
+            del self.edge_counts[key]
+            if self.degree_histogram is not None:
+                self.degree_histogram.decrement(len(self.adjacency[v1]))
+                self.degree_histogram.decrement(len(self.adjacency[v2]))
+            self.remove_neighbor(v1, v2)
+            self.remove_neighbor(v2, v1)
+            self.total_degree -= 2
+
+
+    '''
+        Helper Function: Appends v2 to the neighbors of v1
+    '''
+    def add_neighbor(self, v1, v2):
+        neighbors = self.adjacency[v1]
+        slots = self.hub_slots.get(v1)
+        if (slots is None and len(neighbors) == self.HUB_DEGREE):
+            self.hub_slots[v1] = slots = dict((neighbour, slot) for (slot, neighbour) in enumerate(neighbors))
+        if slots is not None:
+            slots[v2] = len(neighbors)
+        neighbors.append(v2)
+
+
+    '''
+        Helper Function: Drops v2 from the neighbors of v1, and v1 from the graph if it is left alone
+        
+        The last neighbor moves into the slot of v2, which is looked up in the
+        slot map of a hub and found by a scan of at most HUB_DEGREE neighbors
+        otherwise, O(1) whatever the degree of v1. A hub keeps its map until
+        its degree falls to half of HUB_DEGREE.
+    '''
+    def remove_neighbor(self, v1, v2):
+        neighbors = self.adjacency[v1]
+        slots = self.hub_slots.get(v1) if (len(neighbors) > self.HUB_DEGREE // 2) else None
+        last = neighbors.pop()
+        if slots is None:
+            if (last != v2):
+                neighbors[neighbors.index(v2)] = last
+        else:
+            slot = slots.pop(v2)
+            if (last != v2):
+                neighbors[slot] = last
+                slots[last] = slot
+            if (len(neighbors) <= self.HUB_DEGREE // 2):
+                del self.hub_slots[v1]
+        if not neighbors:
+            self.adjacency[v1] = None
+            self.num_vertices -= 1
+
+
+    '''
+        Setter: Rebuild the graph from edge counts keyed by (v1, v2) pairs, e.g from a checkpoint
+    '''
+    def load_edge_counts(self, edge_counts):
+        self.adjacency = []
+        self.hub_slots = {}
+        self.num_vertices = 0
+        self.edge_counts = {}
+        self.total_degree = 0
+        if self.degree_histogram is not None:
+            self.degree_histogram.reset()
+        for (v1, v2), count in edge_counts.iteritems():
+            self.add_edge((v1, v2))
+            self.edge_counts[self.edge_key(v1, v2)] = count
+
+
+    '''
+        Getter: Live edges with their counts, unpacked to (v1, v2) pairs
+    '''
+    def iter_edge_counts(self):
+        mask = (1 << 32) - 1
+        for key, count in self.edge_counts.iteritems():
+            yield (key >> 32, key & mask), count
+
+
+    '''
+        Function that calculates the degree of a single vertex.
+    '''
+    def vertex_degree(self, vertex):
+        return len(self.adjacency[vertex])
+
+
+    '''
+        Calculate Complete Graph Average Degrees, in constant time
+    '''
+    def get_graph_average_degrees(self):
+        if not self.num_vertices:
+            return 0.0
+        return self.total_degree / float(self.num_vertices)
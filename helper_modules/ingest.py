@@ -0,0 +1,152 @@
+import asynchat, asyncore, os, socket
+
+'''
+    Local ingestion server for newline delimited tweets.
+
+    Built on the asyncore event loop: one listening dispatcher on a TCP or
+    Unix socket and one async_chat handler per producer connection. Every
+    complete line received is handed to a process_line callback, whose reply
+    is streamed back on the same connection followed by a newline, one reply
+    per line and in order. All connections share the single event loop, so
+    the callback never runs concurrently.
+
+    Backpressure: a connection stops being read while more than max_pending
+    replies wait to be sent to it, its socket buffers then fill up and the
+    producer blocks in send until it reads its replies again.
+'''
+
+MAX_LINE_LENGTH = 1 << 20 # Longest line kept, the rest of a longer one is dropped
+
+
+'''
+    Function that parses a listen address
+
+    'unix:/path/to/socket' gives a Unix socket, 'host:port' or a bare port
+    gives a TCP socket (on localhost when host is left out).
+
+    :type text: str
+    :rtype tuple(family, address)
+'''
+def parse_address(text):
+    if text.startswith('unix:'):
+        return socket.AF_UNIX, text[len('unix:'):]
+    (host, _, port) = text.rpartition(':')
+    return socket.AF_INET, (host or '127.0.0.1', int(port))
+
+
+class TweetIngestHandler(asynchat.async_chat):
+
+    '''
+        initializes a handler for one producer connection
+
+        :type sock: socket
+        :type ingest_server: TweetIngestServer
+    '''
+    def __init__(self, sock, ingest_server):
+        asynchat.async_chat.__init__(self, sock)
+        self.ingest_server = ingest_server
+        self.incoming = []
+        self.incoming_size = 0
+        self.eof = False
+        self.set_terminator('\n')
+
+
+    '''
+        Called by async_chat with the data of a line received so far
+    '''
+    def collect_incoming_data(self, data):
+        if (self.incoming_size < MAX_LINE_LENGTH):
+            self.incoming.append(data)
+            self.incoming_size += len(data)
+
+
+    '''
+        Called by async_chat once a line is complete, replies to it
+    '''
+    def found_terminator(self):
+        line = ''.join(self.incoming)
+        self.incoming = []
+        self.incoming_size = 0
+        self.push(self.ingest_server.process_line(line) + '\n')
+
+
+    '''
+        Stop reading while too many replies are pending, or after the producer is done
+    '''
+    def readable(self):
+        return (not self.eof and len(self.producer_fifo) < self.ingest_server.max_pending)
+
+
+    '''
+        Producer closed its side: answer a last unterminated line, send what is left, then close
+    '''
+    def handle_close(self):
+        if self.eof:
+            self.close()
+            return
+        self.eof = True
+        if self.incoming:
+            self.found_terminator()
+        self.close_when_done()
+
+
+    def handle_error(self):
+        self.ingest_server.log_error()
+        self.close()
+
+
+class TweetIngestServer(asyncore.dispatcher):
+
+    '''
+        initializes and binds a server
+
+        :type address: str - see parse_address
+        :type process_line: function(str) -> str, reply to one received line
+        :type max_pending: int - replies a connection may have waiting before it stops being read
+    '''
+    def __init__(self, address, process_line, max_pending=1024):
+        asyncore.dispatcher.__init__(self)
+        self.process_line = process_line
+        self.max_pending = max_pending
+        (family, self.address) = parse_address(address)
+        self.unix_path = self.address if (family == socket.AF_UNIX) else None
+
+        self.create_socket(family, socket.SOCK_STREAM)
+        if self.unix_path is None:
+            self.set_reuse_addr()
+        elif os.path.exists(self.unix_path):
+            os.remove(self.unix_path) # Left behind by an earlier server
+        self.bind(self.address)
+        self.listen(128)
+
+
+    def handle_accept(self):
+        pair = self.accept()
+        if pair is not None:
+            TweetIngestHandler(pair[0], self)
+
+
+    '''
+        Helper Function: Report an error in a handler without stopping the server
+    '''
+    def log_error(self):
+        (_, t, v, tbinfo) = asyncore.compact_traceback()
+        self.log_info('connection dropped: {} {} {}'.format(t, v, tbinfo), 'error')
+
+
+    '''
+        Function that runs the event loop until interrupted
+
+        :type idle: function() called at least every interval seconds, e.g to flush outputs
+        :type interval: float
+    '''
+    def serve_forever(self, idle=None, interval=1.0):
+        try:
+            while True:
+                asyncore.loop(timeout=interval, count=1)
+                if idle is not None:
+                    idle()
+        finally:
+            asyncore.close_all()
+            if (self.unix_path is not None and os.path.exists(self.unix_path)):
+                os.remove(self.unix_path)
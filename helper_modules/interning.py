@@ -0,0 +1,102 @@
+from array import array
+
+'''
+    Class implementing an interning table that maps hashtags to dense integer ids.
+
+    Every distinct hashtag is stored once and referred to by a small integer,
+    so window entries and graph edges hold machine integers instead of copies
+    of the strings. Ids are reference counted by the window entries holding
+    them. Once the last entry with a tag is evicted the tag is forgotten and
+    its id goes on a free list for the next new tag, keeping ids dense so they
+    can index flat arrays.
+'''
+
+class HashtagTable(object):
+
+    __slots__ = ('ids', 'tags', 'refcounts', 'free_ids')
+
+    '''
+        initializes an empty table
+    '''
+    def __init__(self):
+        self.ids = {} # Hashtag --> id
+        self.tags = [] # Id --> hashtag, None for a free id
+        self.refcounts = array('l') # Id --> number of live references
+        self.free_ids = array('l') # Ids ready for reuse
+
+
+    '''
+        Number of live hashtags
+    '''
+    def __len__(self):
+        return len(self.ids)
+
+
+    '''
+        Getter: Hashtag of a live id
+    '''
+    def tag(self, tag_id):
+        return self.tags[tag_id]
+
+
+    '''
+        Getter: Id of a live hashtag, None if it is not in the table
+    '''
+    def get_id(self, tag):
+        return self.ids.get(tag)
+
+
+    '''
+        Setter: Takes a reference to a hashtag, interning it if new
+
+        :type tag: str
+        :rtype int - id of the hashtag
+    '''
+    def acquire(self, tag):
+        tag_id = self.ids.get(tag)
+        if tag_id is not None:
+            self.refcounts[tag_id] += 1
+            return tag_id
+
+        if self.free_ids:
+            tag_id = self.free_ids.pop()
+            self.tags[tag_id] = tag
+            self.refcounts[tag_id] = 1
+        else:
+            tag_id = len(self.tags)
+            self.tags.append(tag)
+            self.refcounts.append(1)
+        self.ids[tag] = tag_id
+        return tag_id
+
+
+    '''
+        Setter: Drops a reference to an id, recycling it when none are left
+    '''
+    def release(self, tag_id):
+        count = self.refcounts[tag_id] - 1
+        self.refcounts[tag_id] = count
+        if (count == 0):
+            del self.ids[self.tags[tag_id]]
+            self.tags[tag_id] = None
+            self.free_ids.append(tag_id)
+
+
+    '''
+        Helper Function: Ids of a set of hashtags, taking a reference to each
+
+        :type tags: iterable of str
+        :rtype array of int
+    '''
+    def acquire_all(self, tags):
+        acquire = self.acquire
+        return array('l', [acquire(tag) for tag in tags])
+
+
+    '''
+        Helper Function: Drops a reference to each of a set of ids
+    '''
+    def release_all(self, tag_ids):
+        release = self.release
+        for tag_id in tag_ids:
+            release(tag_id)
@@ -0,0 +1,174 @@
+from itertools import combinations
+
+from helper_modules.timingwheel import TimingWheel
+
+'''
+    Class implementing several hashtag graph windows of different lengths over one edge store.
+
+    An edge is live in a window as long as the newest tweet carrying it is
+    recent enough, so one store of edge --> last seen epoch serves every
+    window. Windows are sorted by length, an edge therefore expires from them
+    in order, and the store keeps with each edge its expired level: the number
+    of shortest windows it already left. Only the next expiry of an edge is
+    scheduled, in a hierarchical timing wheel; when it fires the edge moves
+    one level up and its expiry from the next window is scheduled. Seeing the
+    edge again makes earlier wheel entries stale, they are recognized and
+    skipped when they come out.
+
+    Each window only keeps its live edge count and the degree of its live
+    vertices, which is all the rolling average degree needs.
+'''
+
+LEVEL_BITS = 3 # Expired level is packed with the last seen epoch in one integer
+MAX_WINDOWS = (1 << LEVEL_BITS) - 1
+
+
+class MultiWindowGraph(object):
+
+    '''
+        initializes the store
+
+        :type window_lengths: List[int] - max age in seconds kept by each window, like TimeWindow
+    '''
+    def __init__(self, window_lengths):
+        if not (0 < len(window_lengths) <= MAX_WINDOWS):
+            raise ValueError('between 1 and {} windows are supported'.format(MAX_WINDOWS))
+        self.window_lengths = sorted(window_lengths)
+        self.reset()
+
+
+    '''
+        Setter: Forgets every edge
+    '''
+    def reset(self):
+        self.edges = {} # Edge key --> last seen epoch << LEVEL_BITS | expired level
+        self.degrees = [{} for _ in self.window_lengths] # Per window: live vertex --> degree
+        self.num_edges = [0 for _ in self.window_lengths] # Per window: live edges
+        self.wheel = TimingWheel()
+        self.newest = None
+
+
+    '''
+        Helper Function: Number of windows an edge last seen at epoch has already left
+    '''
+    def expired_level(self, last_seen):
+        level = 0
+        for length in self.window_lengths:
+            if (last_seen >= self.newest - length):
+                break
+            level += 1
+        return level
+
+
+    '''
+        Helper Functions: Add or drop an edge in one window
+    '''
+    def add_to_window(self, window, v1, v2):
+        degrees = self.degrees[window]
+        degrees[v1] = degrees.get(v1, 0) + 1
+        degrees[v2] = degrees.get(v2, 0) + 1
+        self.num_edges[window] += 1
+
+
+    def remove_from_window(self, window, v1, v2):
+        degrees = self.degrees[window]
+        for vertex in (v1, v2):
+            degree = degrees[vertex] - 1
+            if degree:
+                degrees[vertex] = degree
+            else:
+                del degrees[vertex]
+        self.num_edges[window] -= 1
+
+
+    '''
+        Setter: Records an edge seen at epoch, adding it to the windows it was not live in
+    '''
+    def touch_edge(self, key, epoch):
+        n = len(self.window_lengths)
+        state = self.edges.get(key)
+        if state is None:
+            (last_seen, old_level) = (epoch, n)
+        else:
+            (last_seen, old_level) = (max(state >> LEVEL_BITS, epoch), state & MAX_WINDOWS)
+
+        level = self.expired_level(last_seen)
+        if (level == n):
+            return # Too old for every window
+        for window in xrange(level, old_level):
+            self.add_to_window(window, key[0], key[1])
+
+        new_state = (last_seen << LEVEL_BITS) | level
+        if (new_state != state):
+            self.edges[key] = new_state
+            self.wheel.schedule(last_seen + self.window_lengths[level] + 1, (key, new_state))
+
+
+    '''
+        Setter: Adds the edges between every pair of hashtags of a tweet
+
+        :type epoch: int
+        :type tags: iterable of hashtags
+    '''
+    def add_tweet(self, epoch, tags):
+        if (self.newest is None or epoch > self.newest):
+            self.newest = epoch
+        touch_edge = self.touch_edge
+        for key in combinations(sorted(tags), 2):
+            touch_edge(key, epoch)
+
+
+    '''
+        Function that advances every window to epoch, expiring edges that got too old
+    '''
+    def advance(self, epoch):
+        if (self.newest is None or epoch > self.newest):
+            self.newest = epoch
+        newest = self.newest
+        lengths = self.window_lengths
+        n = len(lengths)
+        edges = self.edges
+
+        for (_, (key, state)) in self.wheel.advance(newest):
+            if (edges.get(key) != state):
+                continue # Seen again since this expiry was scheduled
+            last_seen = state >> LEVEL_BITS
+            level = state & MAX_WINDOWS
+            while (level < n and last_seen + lengths[level] < newest):
+                self.remove_from_window(level, key[0], key[1])
+                level += 1
+            if (level == n):
+                del edges[key]
+            else:
+                state = (last_seen << LEVEL_BITS) | level
+                edges[key] = state
+                self.wheel.schedule(last_seen + lengths[level] + 1, (key, state))
+
+
+    '''
+        Getter: Rolling average degree of each window, in window_lengths order
+    '''
+    def get_average_degrees(self):
+        return [(2.0 * num_edges / len(degrees)) if degrees else 0.0
+                for (num_edges, degrees) in zip(self.num_edges, self.degrees)]
+
+
+    '''
+        Snapshot for checkpoints: the windows, the clock and the last seen epoch of every edge
+    '''
+    def get_state(self):
+        return {'window_lengths': list(self.window_lengths),
+                'newest': self.newest,
+                'last_seen': dict((key, state >> LEVEL_BITS) for (key, state) in self.edges.iteritems())}
+
+
+    '''
+        Restore a snapshot taken by get_state, rebuilding the windows and the wheel
+    '''
+    def restore_state(self, state):
+        self.reset()
+        self.newest = state['newest']
+        if self.newest is not None:
+            self.wheel.reset(self.newest + 1)
+        for (key, last_seen) in state['last_seen'].iteritems():
+            self.touch_edge(key, last_seen)
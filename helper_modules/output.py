@@ -0,0 +1,100 @@
+import os
+
+'''
+    Class implementing a buffered line sink for the feature output files.
+
+    One handle stays open for the whole run. Lines are batched in memory and
+    written in one call once the batch reaches buffer_size bytes or max_lines
+    lines, and on close. With line_buffered every line is written and flushed
+    right away, for when a downstream consumer tails the file.
+'''
+
+class BufferedLineWriter(object):
+
+    '''
+        initializes a writer object
+
+        :type filename: str
+        :type mode: str - 'a' to append to an existing output as before, 'w' to truncate
+        :type buffer_size: int - flush once this many bytes are pending
+        :type max_lines: int - flush once this many lines are pending
+        :type line_buffered: boolean - flush after every line
+    '''
+    def __init__(self, filename, mode='a', buffer_size=1 << 16, max_lines=4096, line_buffered=False):
+        self.filename = filename
+        self.buffer_size = buffer_size
+        self.max_lines = max_lines
+        self.line_buffered = line_buffered
+        self.pending = []
+        self.pending_bytes = 0
+        self.handle = open(filename, mode)
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+    '''
+        Setter: Queue a single output line, the newline is added here
+    '''
+    def write_line(self, line):
+        self.pending.append(line)
+        self.pending_bytes += len(line) + 1
+        if (self.line_buffered or self.pending_bytes >= self.buffer_size or len(self.pending) >= self.max_lines):
+            self.flush()
+
+
+    '''
+        Setter: Write a block of complete lines, each already ending with a newline
+    '''
+    def write_block(self, block):
+        if block:
+            self.flush()
+            self.handle.write(block)
+            if self.line_buffered:
+                self.handle.flush()
+
+
+    '''
+        Function that writes all pending lines and pushes them to the OS
+    '''
+    def flush(self):
+        if self.pending:
+            self.pending.append('')
+            self.handle.write('\n'.join(self.pending))
+            self.pending = []
+            self.pending_bytes = 0
+        self.handle.flush()
+
+
+    '''
+        Getter: Size in bytes of the file once pending lines are written
+    '''
+    def size(self):
+        self.flush()
+        return os.fstat(self.handle.fileno()).st_size
+
+
+    '''
+        Setter: Cut the file back to size bytes, dropping pending lines
+
+        Lines written afterwards are appended at the new end of file.
+    '''
+    def truncate(self, size):
+        self.pending = []
+        self.pending_bytes = 0
+        self.handle.flush()
+        self.handle.truncate(size)
+
+
+    '''
+        Function that flushes pending lines and closes the file, safe to call twice
+    '''
+    def close(self):
+        if not self.handle.closed:
+            self.flush()
+            self.handle.close()
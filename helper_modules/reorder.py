@@ -0,0 +1,88 @@
+import heapq
+
+'''
+    Class implementing a bounded reorder buffer for tweets arriving slightly out of order.
+
+    Items are held in a heap keyed by epoch second and released by watermark:
+    once a tweet newer than epoch + lateness has been seen, nothing older than
+    epoch is expected anymore and everything up to it is handed out in time
+    order. Items with the same epoch keep their arrival order. An item already
+    behind the watermark when it arrives is released right away, the caller
+    decides what to do with it.
+'''
+
+class ReorderBuffer(object):
+
+    '''
+        initializes a reorder buffer
+
+        :type lateness: int - seconds a tweet may arrive after newer ones and still be reordered
+    '''
+    def __init__(self, lateness):
+        self.lateness = lateness
+        self.heap = []
+        self.newest = None
+        self.sequence = 0
+
+
+    '''
+        Number of items waiting for the watermark
+    '''
+    def __len__(self):
+        return len(self.heap)
+
+
+    '''
+        Getter: Epoch up to which items are released, None before the first item
+    '''
+    def watermark(self):
+        return None if self.newest is None else self.newest - self.lateness
+
+
+    '''
+        Setter: Adds an item and returns the items it releases, oldest first
+
+        :type epoch: int
+        :rtype List[(epoch, item)]
+    '''
+    def push(self, epoch, item):
+        heapq.heappush(self.heap, (epoch, self.sequence, item))
+        self.sequence += 1
+        if (self.newest is None or epoch > self.newest):
+            self.newest = epoch
+
+        watermark = self.newest - self.lateness
+        heap = self.heap
+        released = []
+        while heap and heap[0][0] <= watermark:
+            (epoch, _, item) = heapq.heappop(heap)
+            released.append((epoch, item))
+        return released
+
+
+    '''
+        Function that releases every waiting item, oldest first, e.g at the end of the input
+    '''
+    def drain(self):
+        heap = self.heap
+        released = []
+        while heap:
+            (epoch, _, item) = heapq.heappop(heap)
+            released.append((epoch, item))
+        return released
+
+
+    '''
+        Snapshot of the waiting items and clock for checkpoints
+    '''
+    def get_state(self):
+        return {'items': sorted(self.heap), 'newest': self.newest, 'sequence': self.sequence}
+
+
+    '''
+        Restore a snapshot taken by get_state
+    '''
+    def restore_state(self, state):
+        self.heap = list(state['items']) # A sorted list is a valid heap
+        self.newest = state['newest']
+        self.sequence = state['sequence']
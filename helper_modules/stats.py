@@ -0,0 +1,143 @@
+import sys, time
+
+'''
+    Per-stage timing and counter instrumentation.
+
+    Nothing in the pipeline refers to the collector on the hot path. When
+    stats are enabled, the functions and methods of each stage are replaced
+    by timing wrappers (instrument), which add up calls and seconds per stage;
+    when they are off nothing is wrapped and there is no overhead at all.
+    Objects with interesting sizes (window, graph ...) register a gauge
+    function that is only called when a report is printed.
+
+    Stages may nest, e.g the per tweet total includes cleaning and the graph
+    updates, so their times do not add up to the wall time.
+'''
+
+COLLECTOR = None # The active collector, None when stats are off
+
+
+class StageStats(object):
+
+    '''
+        initializes a collector
+
+        :type interval: float - seconds between intermediate reports, None for a final report only
+        :type stream: file - where reports are written
+    '''
+    def __init__(self, interval=None, stream=None):
+        self.interval = interval
+        self.stream = stream if stream is not None else sys.stderr
+        self.stages = [] # Stage names in registration order
+        self.calls = {}
+        self.seconds = {}
+        self.gauges = []
+        self.wrapped = [] # (owner, name, original) to undo instrument
+        self.started = time.time()
+        self.last_report = self.started
+        self.ticks = 0
+
+
+    '''
+        Setter: Replaces owner.name by a wrapper timing every call as stage
+
+        :type owner: module or class
+        :type name: str
+        :type stage: str
+        :type tick: boolean - count a processed tweet per call, and print intermediate reports from it
+    '''
+    def instrument(self, owner, name, stage, tick=False):
+        original = getattr(owner, name)
+        if stage not in self.calls:
+            self.stages.append(stage)
+            self.calls[stage] = 0
+            self.seconds[stage] = 0.0
+        calls = self.calls
+        seconds = self.seconds
+        clock = time.time
+
+        def timed(*args, **kwargs):
+            start = clock()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                end = clock()
+                calls[stage] += 1
+                seconds[stage] += end - start
+                if tick:
+                    self.ticks += 1
+                    if (self.interval is not None and end - self.last_report >= self.interval):
+                        self.last_report = end
+                        self.report()
+
+        timed.__name__ = getattr(original, '__name__', name)
+        timed.__doc__ = getattr(original, '__doc__', None)
+        self.wrapped.append((owner, name, owner.__dict__.get(name, original)))
+        setattr(owner, name, timed)
+
+
+    '''
+        Function that puts back every wrapped function and method
+    '''
+    def restore(self):
+        for (owner, name, original) in reversed(self.wrapped):
+            setattr(owner, name, original)
+        self.wrapped = []
+
+
+    '''
+        Setter: Registers a gauge function returning a list of (name, value), called at report time
+    '''
+    def watch(self, gauges):
+        self.gauges.append(gauges)
+
+
+    '''
+        Function that writes a report of every stage and gauge
+
+        :type final: boolean - title the report as the end of run summary
+    '''
+    def report(self, final=False):
+        elapsed = time.time() - self.started
+        write = self.stream.write
+        write("--- {} stats after {:.1f}s, {} tweets, {:.0f} tweets/sec ---\n".format(
+              'Final' if final else 'Running', elapsed, self.ticks, self.ticks / elapsed if elapsed else 0.0))
+        write("{:<28} {:>12} {:>10} {:>10} {:>7}\n".format('stage', 'calls', 'seconds', 'us/call', '% wall'))
+        for stage in self.stages:
+            (calls, seconds) = (self.calls[stage], self.seconds[stage])
+            write("{:<28} {:>12} {:>10.3f} {:>10.2f} {:>7.1f}\n".format(
+                  stage, calls, seconds, 1e6 * seconds / calls if calls else 0.0,
+                  100.0 * seconds / elapsed if elapsed else 0.0))
+        for gauges in self.gauges:
+            for (name, value) in gauges():
+                write("{:<28} {:>12}\n".format(name, value))
+        self.stream.flush()
+
+
+'''
+    Function that starts collecting, see StageStats
+'''
+def enable(interval=None, stream=None):
+    global COLLECTOR
+    COLLECTOR = StageStats(interval, stream)
+    return COLLECTOR
+
+
+'''
+    Function that stops collecting and removes the wrappers, returns the last collector
+'''
+def disable():
+    global COLLECTOR
+    collector = COLLECTOR
+    COLLECTOR = None
+    if collector is not None:
+        collector.restore()
+    return collector
+
+
+'''
+    Function that registers a gauge function with the active collector, nothing when stats are off
+'''
+def watch(gauges):
+    if COLLECTOR is not None:
+        COLLECTOR.watch(gauges)
@@ -0,0 +1,151 @@
+'''
+    Class implementing a hierarchical timing wheel with one second ticks.
+
+    Level 0 has one slot per second for the next 2**slot_bits seconds, each
+    higher level covers 2**slot_bits times longer ranges with coarser slots.
+    An item is filed in the finest level that can hold its due time; whenever
+    a level wraps around, the next slot of the level above is cascaded down
+    into finer slots. Scheduling is O(1) and every item is moved at most once
+    per level, however far ahead it is due; runs of empty seconds are skipped
+    a slot scan at a time. Items beyond the top level wait in an overflow list
+    until the top level wraps.
+'''
+
+class TimingWheel(object):
+
+    '''
+        initializes an empty wheel
+
+        :type slot_bits: int - log2 of the number of slots per level
+        :type levels: int
+    '''
+    def __init__(self, slot_bits=6, levels=4):
+        self.slot_bits = slot_bits
+        self.mask = (1 << slot_bits) - 1
+        self.levels = levels
+        self.wheels = [[[] for _ in xrange(1 << slot_bits)] for _ in xrange(levels)]
+        self.overflow = []
+        self.due = [] # Items scheduled at or before a tick already processed
+        self.base = None # Next second to process
+        self.size = 0
+
+
+    '''
+        Number of scheduled items
+    '''
+    def __len__(self):
+        return self.size
+
+
+    '''
+        Setter: Schedules item to come out of advance once time is reached
+
+        :type time: int - epoch second
+    '''
+    def schedule(self, time, item):
+        if self.base is None:
+            self.base = time
+        self.size += 1
+        self.place(time, item)
+
+
+    '''
+        Helper Function: Files an item in the finest level that can hold it
+    '''
+    def place(self, time, item):
+        delta = time - self.base
+        if (delta < 0):
+            self.due.append((time, item))
+            return
+        bits = self.slot_bits
+        for level in xrange(self.levels):
+            if (delta < (1 << (bits * (level + 1)))):
+                self.wheels[level][(time >> (bits * level)) & self.mask].append((time, item))
+                return
+        self.overflow.append((time, item))
+
+
+    '''
+        Helper Function: Moves the items of a slot of a level down to finer slots
+    '''
+    def cascade(self, level, index):
+        items = self.wheels[level][index]
+        self.wheels[level][index] = []
+        for (time, item) in items:
+            self.place(time, item)
+
+
+    '''
+        Generator of the items due up to second now, oldest first
+
+        :type now: int - epoch second
+        :rtype generator of (time, item)
+    '''
+    def advance(self, now):
+        if self.base is None:
+            self.base = now + 1
+            return
+        while self.due:
+            due = self.due
+            self.due = []
+            for entry in sorted(due):
+                self.size -= 1
+                yield entry
+
+        bits = self.slot_bits
+        mask = self.mask
+        while (self.base <= now):
+            if not self.size:
+                self.base = now + 1 # Nothing scheduled, jump ahead
+                break
+            base = self.base
+            index = base & mask
+
+            # Level 0 wrapped, bring the next slots of the levels above down
+            if (index == 0):
+                level = 1
+                while (level < self.levels):
+                    level_index = (base >> (bits * level)) & mask
+                    self.cascade(level, level_index)
+                    if level_index:
+                        break
+                    level += 1
+                if (level == self.levels and self.overflow):
+                    overflow = self.overflow
+                    self.overflow = []
+                    for (time, item) in overflow:
+                        self.place(time, item)
+
+            items = self.wheels[0][index]
+            if (index and not items):
+                # Skip the empty seconds up to the next filled slot, or the next wrap
+                slots = self.wheels[0]
+                skip = mask + 1 - index
+                for offset in xrange(1, skip):
+                    if slots[index + offset]:
+                        skip = offset
+                        break
+                self.base = min(base + skip, now + 1)
+                continue
+            self.base = base + 1
+            if items:
+                self.wheels[0][index] = []
+                for entry in items:
+                    self.size -= 1
+                    yield entry
+
+            # Items scheduled while this tick was handed out
+            while self.due:
+                due = self.due
+                self.due = []
+                for entry in sorted(due):
+                    self.size -= 1
+                    yield entry
+
+
+    '''
+        Setter: Forgets every item and restarts at second base
+    '''
+    def reset(self, base=None):
+        self.__init__(self.slot_bits, self.levels)
+        self.base = base
@@ -0,0 +1,267 @@
+import random
+from array import array
+from itertools import combinations
+
+'''
+    Incrementally maintained top-K of the hashtags and hashtag pairs in the window.
+
+    Counts go up when a tweet enters the window and down when it is evicted,
+    nothing is ever rescanned. Two interchangeable counters:
+
+        BucketCounter      - exact counts. Keys are grouped in buckets of equal
+                             count, chained from the highest count down, so a
+                             count changes in O(1) and the top K is read by
+                             walking down from the highest bucket.
+
+        SketchTopK         - bounded memory. Counts live in a count-min sketch
+                             of width x depth counters (an estimate, never
+                             below the true count), only K candidate keys are
+                             remembered with their estimates.
+'''
+
+
+class BucketCounter(object):
+
+    '''
+        initializes an empty exact counter
+    '''
+    def __init__(self):
+        self.counts = {} # Key --> count, only keys with a positive count
+        self.buckets = {} # Count --> set of keys with that count
+        self.lower = {} # Count of a bucket --> count of the next lower bucket (0 for none)
+        self.higher = {} # Count of a bucket --> count of the next higher bucket (0 for none)
+        self.highest = 0
+        self.lowest = 0
+
+
+    def __len__(self):
+        return len(self.counts)
+
+
+    '''
+        Helper Function: Creates the empty bucket for count, chained between below and the bucket above it
+    '''
+    def insert_bucket(self, count, below):
+        above = self.higher[below] if below else self.lowest
+        self.buckets[count] = set()
+        self.lower[count] = below
+        self.higher[count] = above
+        if below:
+            self.higher[below] = count
+        else:
+            self.lowest = count
+        if above:
+            self.lower[above] = count
+        else:
+            self.highest = count
+
+
+    '''
+        Helper Function: Unchains and drops the bucket for count once it is empty
+    '''
+    def remove_bucket(self, count):
+        (below, above) = (self.lower.pop(count), self.higher.pop(count))
+        del self.buckets[count]
+        if below:
+            self.higher[below] = above
+        else:
+            self.lowest = above
+        if above:
+            self.lower[above] = below
+        else:
+            self.highest = below
+
+
+    '''
+        Setter: Adds one to the count of key
+    '''
+    def increment(self, key):
+        count = self.counts.get(key, 0)
+        new_count = count + 1
+        if new_count not in self.buckets:
+            self.insert_bucket(new_count, count)
+        self.buckets[new_count].add(key)
+        self.counts[key] = new_count
+        if count:
+            self.buckets[count].discard(key)
+            if not self.buckets[count]:
+                self.remove_bucket(count)
+
+
+    '''
+        Setter: Takes one from the count of key, forgetting it at zero
+    '''
+    def decrement(self, key):
+        count = self.counts.get(key, 0)
+        if not count:
+            return
+        new_count = count - 1
+        if new_count:
+            if new_count not in self.buckets:
+                self.insert_bucket(new_count, self.lower[count])
+            self.buckets[new_count].add(key)
+            self.counts[key] = new_count
+        else:
+            del self.counts[key]
+        self.buckets[count].discard(key)
+        if not self.buckets[count]:
+            self.remove_bucket(count)
+
+
+    '''
+        Function that returns the k most frequent keys, ties broken by key
+
+        :rtype List[tuple(key, count)]
+    '''
+    def top(self, k):
+        result = []
+        count = self.highest
+        while (count and len(result) < k):
+            for key in sorted(self.buckets[count])[:k - len(result)]:
+                result.append((key, count))
+            count = self.lower[count]
+        return result
+
+
+class SketchTopK(object):
+
+    '''
+        initializes an empty sketch
+
+        :type k: int - number of candidates kept
+        :type width: int - counters per row, the estimate error is about 2 * total count / width
+        :type depth: int - rows, the error bound fails with probability about 2 ** -depth
+        :type seed: int
+    '''
+    def __init__(self, k, width=1 << 14, depth=4, seed=0):
+        self.k = k
+        self.width = width
+        self.depth = depth
+        self.rows = [array('l', [0]) * width for _ in xrange(depth)]
+        generator = random.Random(seed)
+        self.prime = (1 << 61) - 1
+        self.hash_params = [(generator.randrange(1, self.prime), generator.randrange(self.prime)) for _ in xrange(depth)]
+        self.candidates = {} # Key --> estimated count
+        self.threshold = None # Smallest candidate estimate, None when it must be recomputed
+
+
+    def __len__(self):
+        return len(self.candidates)
+
+
+    '''
+        Helper Function: Adds delta to the counters of key, returns its new estimate
+    '''
+    def add(self, key, delta):
+        h = hash(key) & 0xffffffffffffffff
+        (prime, width) = (self.prime, self.width)
+        estimate = None
+        for (row, (a, b)) in zip(self.rows, self.hash_params):
+            index = ((a * h + b) % prime) % width
+            value = row[index] + delta
+            row[index] = value
+            if (estimate is None or value < estimate):
+                estimate = value
+        return estimate
+
+
+    '''
+        Setter: Adds one to the count of key, it may push out the weakest candidate
+    '''
+    def increment(self, key):
+        estimate = self.add(key, 1)
+        candidates = self.candidates
+        if (key in candidates or len(candidates) < self.k):
+            candidates[key] = estimate
+            self.threshold = None
+            return
+        if self.threshold is None:
+            self.threshold = min(candidates.itervalues())
+        if (estimate > self.threshold):
+            weakest = min(candidates, key=candidates.get)
+            del candidates[weakest]
+            candidates[key] = estimate
+            self.threshold = None
+
+
+    '''
+        Setter: Takes one from the count of key
+    '''
+    def decrement(self, key):
+        estimate = self.add(key, -1)
+        candidates = self.candidates
+        if key in candidates:
+            if (estimate > 0):
+                candidates[key] = estimate
+            else:
+                del candidates[key]
+            self.threshold = None
+
+
+    '''
+        Function that returns the k candidates with the highest estimates, ties broken by key
+
+        :rtype List[tuple(key, estimated count)]
+    '''
+    def top(self, k):
+        ranked = sorted(self.candidates.iteritems(), key=lambda item: (-item[1], item[0]))
+        return ranked[:k]
+
+
+class TrendingTopK(object):
+
+    '''
+        initializes the hashtag and pair counters
+
+        :type k: int
+        :type sketch_width: int - 0 for exact counts, else the count-min sketch width
+        :type sketch_depth: int
+    '''
+    def __init__(self, k, sketch_width=0, sketch_depth=4):
+        self.k = k
+        self.sketch_width = sketch_width
+        self.sketch_depth = sketch_depth
+        self.reset()
+
+
+    '''
+        Setter: Forgets every count
+    '''
+    def reset(self):
+        if self.sketch_width:
+            self.hashtags = SketchTopK(self.k, self.sketch_width, self.sketch_depth, seed=1)
+            self.pairs = SketchTopK(self.k, self.sketch_width, self.sketch_depth, seed=2)
+        else:
+            self.hashtags = BucketCounter()
+            self.pairs = BucketCounter()
+
+
+    '''
+        Setter: Counts the hashtags and pairs of a tweet entering the window
+    '''
+    def add_tweet(self, tags):
+        tags = sorted(tags)
+        for tag in tags:
+            self.hashtags.increment(tag)
+        for pair in combinations(tags, 2):
+            self.pairs.increment(pair)
+
+
+    '''
+        Setter: Uncounts the hashtags and pairs of a tweet leaving the window
+    '''
+    def remove_tweet(self, tags):
+        tags = sorted(tags)
+        for tag in tags:
+            self.hashtags.decrement(tag)
+        for pair in combinations(tags, 2):
+            self.pairs.decrement(pair)
+
+
+    '''
+        Getter: Top hashtags and top pairs
+
+        :rtype tuple(List[tuple(tag, count)], List[tuple((tag, tag), count)])
+    '''
+    def top(self):
+        return self.hashtags.top(self.k), self.pairs.top(self.k)
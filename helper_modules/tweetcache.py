@@ -0,0 +1,197 @@
+import cPickle, os, struct
+from array import array
+from bisect import bisect_left
+
+from helper_modules.tweetfile import OFFSET_TYPECODE
+
+'''
+    Pre-parsed tweet cache: a capture decoded, cleaned and split into hashtags once.
+
+    Re-running the features over the same capture spends most of its time in
+    JSON decoding, cleaning and hashtag extraction. The cache keeps their
+    results next to the input (tweets.txt.cache) in packed columns, one entry
+    per tweet, stamped with the size and mtime of the input like the line
+    index of tweetfile, so a changed input is never read from a stale cache:
+
+        line starts, line ends   byte span of the tweet line in the input
+        epochs                   epoch second of the tweet
+        flags                    HAS_UNICODE, VALID_TIME
+        time ids                 created_at string, interned in a time table
+        text ends                end of the cleaned text in the text blob
+        tag ends, tag ids        hashtags of the cleaned text, interned in a tag table
+
+    followed by the time and tag tables (pickled) and the text blob.
+    Loading is a handful of array reads.
+'''
+
+CACHE_MAGIC = 'TWCCH' + OFFSET_TYPECODE + '02'
+CACHE_HEADER = struct.Struct('<8sQdQQQQ') # magic, input size, input mtime, tweets, tag ids, table bytes, text bytes
+
+HAS_UNICODE = 1
+VALID_TIME = 2
+
+
+'''
+    Function that returns the default cache path of an input file
+'''
+def cache_path(input_file):
+    return input_file + '.cache'
+
+
+'''
+    Function that reads the header of the cache of input_file
+
+    :rtype tuple - the unpacked header, or None when there is no cache or it does not match the input
+'''
+def read_header(input_file, cache_file=None):
+    try:
+        stat = os.stat(input_file)
+        with open(cache_file or cache_path(input_file), 'rb') as cache:
+            header = cache.read(CACHE_HEADER.size)
+    except (IOError, OSError):
+        return None
+    if (len(header) != CACHE_HEADER.size):
+        return None
+    header = CACHE_HEADER.unpack(header)
+    if (header[0] != CACHE_MAGIC or header[1] != stat.st_size or header[2] != stat.st_mtime):
+        return None
+    return header
+
+
+'''
+    Function that loads the cache of input_file
+
+    :rtype TweetCache, or None when there is no valid cache
+'''
+def load_cache(input_file, cache_file=None):
+    header = read_header(input_file, cache_file)
+    if header is None:
+        return None
+    try:
+        with open(cache_file or cache_path(input_file), 'rb') as cache:
+            cache.seek(CACHE_HEADER.size)
+            return TweetCache(cache, *header[3:])
+    except (IOError, OSError, EOFError, cPickle.UnpicklingError):
+        return None
+
+
+class TweetCache(object):
+
+    '''
+        initializes a cache from an open cache file positioned after the header
+    '''
+    def __init__(self, cache, num_tweets, num_tag_ids, table_bytes, text_bytes):
+        self.line_starts = read_column(cache, OFFSET_TYPECODE, num_tweets)
+        self.line_ends = read_column(cache, OFFSET_TYPECODE, num_tweets)
+        self.epochs = read_column(cache, 'l', num_tweets)
+        self.flags = read_column(cache, 'B', num_tweets)
+        self.time_ids = read_column(cache, 'l', num_tweets)
+        self.text_ends = read_column(cache, OFFSET_TYPECODE, num_tweets)
+        self.tag_ends = read_column(cache, OFFSET_TYPECODE, num_tweets)
+        self.tag_ids = read_column(cache, 'l', num_tag_ids)
+        tables = cache.read(table_bytes)
+        self.text = cache.read(text_bytes)
+        if (len(tables) != table_bytes or len(self.text) != text_bytes):
+            raise EOFError('truncated tweet cache')
+        (self.times, self.tags) = cPickle.loads(tables)
+
+
+    '''
+        Number of tweets in the cache
+    '''
+    def __len__(self):
+        return len(self.epochs)
+
+
+    '''
+        Generator of the cached tweets whose line starts at or after start_offset
+
+        :rtype generator of (line end offset, clean text, has unicode, created_at,
+                             epoch or None for a malformed time, set of hashtags)
+    '''
+    def rows(self, start_offset=0):
+        (line_ends, epochs, flags, time_ids) = (self.line_ends, self.epochs, self.flags, self.time_ids)
+        (text_ends, tag_ends, tag_ids) = (self.text_ends, self.tag_ends, self.tag_ids)
+        (times, tags, text) = (self.times, self.tags, self.text)
+
+        first = bisect_left(self.line_starts, start_offset)
+        text_start = int(text_ends[first - 1]) if first else 0
+        tag_start = int(tag_ends[first - 1]) if first else 0
+        for i in xrange(first, len(epochs)):
+            (text_end, tag_end, flag) = (int(text_ends[i]), int(tag_ends[i]), flags[i])
+            yield (int(line_ends[i]), text[text_start:text_end], bool(flag & HAS_UNICODE), times[time_ids[i]],
+                   epochs[i] if (flag & VALID_TIME) else None,
+                   set([tags[tag_id] for tag_id in tag_ids[tag_start:tag_end]]))
+            (text_start, tag_start) = (text_end, tag_end)
+
+
+'''
+    Helper Function: Reads a packed column
+'''
+def read_column(cache, typecode, count):
+    column = array(typecode)
+    column.fromfile(cache, count)
+    return column
+
+
+class TweetCacheWriter(object):
+
+    '''
+        initializes an empty cache for input_file, stamped with its current size and mtime
+    '''
+    def __init__(self, input_file, cache_file=None):
+        stat = os.stat(input_file)
+        self.input_size = stat.st_size
+        self.input_mtime = stat.st_mtime
+        self.cache_file = cache_file or cache_path(input_file)
+        self.line_starts = array(OFFSET_TYPECODE)
+        self.line_ends = array(OFFSET_TYPECODE)
+        self.epochs = array('l')
+        self.flags = array('B')
+        self.time_ids = array('l')
+        self.text_ends = array(OFFSET_TYPECODE)
+        self.tag_ends = array(OFFSET_TYPECODE)
+        self.tag_ids = array('l')
+        self.time_table = {} # created_at --> id
+        self.tag_table = {} # Hashtag --> id
+        self.texts = []
+        self.text_size = 0
+
+
+    '''
+        Setter: Appends one tweet
+
+        :type epoch: int or None for a malformed time
+        :type tags: iterable of hashtags of the clean text
+    '''
+    def add(self, line_start, line_end, clean_text, has_unicode, time_stamp, epoch, tags):
+        self.line_starts.append(line_start)
+        self.line_ends.append(line_end)
+        self.epochs.append(epoch if epoch is not None else 0)
+        self.flags.append((HAS_UNICODE if has_unicode else 0) | (VALID_TIME if epoch is not None else 0))
+        self.time_ids.append(self.time_table.setdefault(time_stamp, len(self.time_table)))
+        self.texts.append(clean_text)
+        self.text_size += len(clean_text)
+        self.text_ends.append(self.text_size)
+        tag_table = self.tag_table
+        for tag in tags:
+            self.tag_ids.append(tag_table.setdefault(tag, len(tag_table)))
+        self.tag_ends.append(len(self.tag_ids))
+
+
+    '''
+        Function that writes the cache next to the input, replacing any previous one at once
+    '''
+    def close(self):
+        tables = cPickle.dumps((sorted(self.time_table, key=self.time_table.get),
+                                sorted(self.tag_table, key=self.tag_table.get)), cPickle.HIGHEST_PROTOCOL)
+        with open(self.cache_file + '.tmp', 'wb') as cache:
+            cache.write(CACHE_HEADER.pack(CACHE_MAGIC, self.input_size, self.input_mtime, len(self.epochs),
+                                          len(self.tag_ids), len(tables), self.text_size))
+            for column in (self.line_starts, self.line_ends, self.epochs, self.flags, self.time_ids,
+                           self.text_ends, self.tag_ends, self.tag_ids):
+                column.tofile(cache)
+            cache.write(tables)
+            for text in self.texts:
+                cache.write(text)
+        os.rename(self.cache_file + '.tmp', self.cache_file)
@@ -0,0 +1,182 @@
+import mmap, os, struct
+from array import array
+from bisect import bisect_left
+
+'''
+    Class implementing random access to a tweets file by line number.
+
+    The file is memory-mapped and the start offset of every line is kept in a
+    packed array. The array is saved next to the input as a sidecar index
+    (tweets.txt.idx) stamped with the size and mtime of the file it describes,
+    so later runs load it instead of scanning the file again, and rebuild it
+    when the input changed. Reading a slice of a large capture then costs only
+    the bytes of that slice, and line boundaries give workers free split points.
+'''
+
+# Offsets need 64 bits, Python 2 arrays only offer them as 'L' on LP64 platforms,
+# doubles hold any realistic file offset exactly elsewhere.
+OFFSET_TYPECODE = 'L' if (array('L').itemsize == 8) else 'd'
+
+INDEX_MAGIC = 'TWIDX' + OFFSET_TYPECODE + '01'
+INDEX_HEADER = struct.Struct('<8sQdQ') # magic, input size, input mtime, number of lines
+
+
+class TweetFile(object):
+
+    '''
+        initializes a tweet file object
+
+        :type filename: str
+        :type index_file: str - sidecar index path, defaults to filename + '.idx'
+        :type save_index: boolean - write a freshly built index back to disk
+    '''
+    def __init__(self, filename, index_file=None, save_index=True):
+        self.filename = filename
+        self.index_file = index_file if index_file is not None else filename + '.idx'
+        self.handle = open(filename, 'rb')
+        stat = os.fstat(self.handle.fileno())
+        self.size = stat.st_size
+        self.mtime = stat.st_mtime
+
+        # mmap refuses empty files, an empty string has the same interface for slicing
+        self.data = mmap.mmap(self.handle.fileno(), 0, access=mmap.ACCESS_READ) if self.size else ''
+
+        self.offsets = self.load_index()
+        if self.offsets is None:
+            self.offsets = self.build_index()
+            if save_index:
+                self.save_index()
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+    '''
+        Number of lines in the file
+    '''
+    def __len__(self):
+        return len(self.offsets)
+
+
+    '''
+        Function that releases the mapping and the file handle
+    '''
+    def close(self):
+        if self.size and self.data:
+            self.data.close()
+            self.data = ''
+        self.handle.close()
+
+
+    '''
+        Helper Function: Offsets of every line start, found by scanning the mapping
+    '''
+    def build_index(self):
+        offsets = array(OFFSET_TYPECODE)
+        data = self.data
+        size = self.size
+        find = data.find
+        pos = 0
+        while pos < size:
+            offsets.append(pos)
+            end = find('\n', pos)
+            if (end == -1):
+                break
+            pos = end + 1
+        return offsets
+
+
+    '''
+        Helper Function: Load the sidecar index if it matches the input, else None
+    '''
+    def load_index(self):
+        try:
+            with open(self.index_file, 'rb') as index:
+                header = index.read(INDEX_HEADER.size)
+                if (len(header) != INDEX_HEADER.size):
+                    return None
+                (magic, size, mtime, count) = INDEX_HEADER.unpack(header)
+                if (magic != INDEX_MAGIC or size != self.size or mtime != self.mtime):
+                    return None
+                offsets = array(OFFSET_TYPECODE)
+                offsets.fromfile(index, count)
+                return offsets
+        except (IOError, OSError, EOFError, struct.error):
+            return None
+
+
+    '''
+        Helper Function: Save the index next to the input, silently skipped when not writable
+    '''
+    def save_index(self):
+        try:
+            with open(self.index_file + '.tmp', 'wb') as index:
+                index.write(INDEX_HEADER.pack(INDEX_MAGIC, self.size, self.mtime, len(self.offsets)))
+                self.offsets.tofile(index)
+            os.rename(self.index_file + '.tmp', self.index_file)
+        except (IOError, OSError):
+            pass
+
+
+    '''
+        Getter: Byte offset where line n starts, len(self) maps to the end of file
+    '''
+    def offset(self, n):
+        return int(self.offsets[n]) if (n < len(self.offsets)) else self.size
+
+
+    '''
+        Getter: Line n, including its trailing newline
+    '''
+    def line(self, n):
+        if (n < 0):
+            n += len(self.offsets)
+        if not (0 <= n < len(self.offsets)):
+            raise IndexError('line {} out of range'.format(n))
+        return self.data[self.offset(n):self.offset(n + 1)]
+
+
+    '''
+        Generator of lines start..stop-1, with slice semantics for None and negative numbers
+
+        :rtype generator of (byte offset, line)
+    '''
+    def lines(self, start=None, stop=None):
+        (start, stop, _) = slice(start, stop).indices(len(self.offsets))
+        data = self.data
+        offsets = self.offsets
+        size = self.size
+        for n in xrange(start, stop):
+            begin = int(offsets[n])
+            end = int(offsets[n + 1]) if (n + 1 < len(offsets)) else size
+            yield begin, data[begin:end]
+
+
+    '''
+        Generator of lines starting at the first line that begins at or after offset
+
+        :rtype generator of (byte offset, line)
+    '''
+    def lines_from_offset(self, offset):
+        return self.lines(bisect_left(self.offsets, offset))
+
+
+    '''
+        Function that cuts the file in parts of about equal size on line boundaries
+
+        :type parts: int
+        :rtype List[tuple(int, int)] - (start, end) byte offsets
+    '''
+    def split_ranges(self, parts):
+        bounds = [0]
+        for i in xrange(1, parts):
+            bound = self.offset(bisect_left(self.offsets, self.size * i // parts))
+            if (bound > bounds[-1]):
+                bounds.append(bound)
+        bounds.append(self.size)
+        return [(bounds[i], bounds[i + 1]) for i in xrange(len(bounds) - 1) if bounds[i] < bounds[i + 1]]
@@ -0,0 +1,152 @@
+import re, simplejson
+from simplejson.decoder import scanstring
+
+'''
+    Selective extraction of tweet fields from a raw JSON line.
+
+    A tweet object is ~4 KB of JSON of which we only need a handful of fields.
+    Instead of decoding the whole object tree, the fast path locates each
+    requested key in the raw line and decodes just that value with simplejson's
+    (C accelerated) string scanner. The layout of the streaming API puts
+    created_at, id, id_str and text first at the top level, and timestamp_ms
+    last, which the fast path relies on. Any line it cannot vouch for is decoded
+    in full instead, so the result is always the same as a full parse.
+
+    Supported fields: created_at, text, id_str, timestamp_ms and hashtags (the
+    text of each entities.hashtags entry).
+'''
+
+DEFAULT_FIELDS = ('text', 'created_at', 'timestamp_ms')
+
+TWEET_PREFIX = '{"created_at":"'
+ENTITIES_KEY = '"entities":'
+HASHTAGS_KEY = ENTITIES_KEY + '{"hashtags":['
+HASHTAG_ARRAY = re.compile(r'(?:\{"text":"(?:[^"\\]|\\.)*","indices":\[\d+,\d+\]\},?)*\]')
+HASHTAG_TEXT = re.compile(r'\{"text":"((?:[^"\\]|\\.)*)"')
+NESTED_STATUS_KEYS = ('"retweeted_status":{', '"quoted_status":{')
+
+
+'''
+    Exception raised by the fast path for lines it cannot handle
+'''
+class FallbackToFullParse(Exception):
+    pass
+
+
+'''
+    Function that returns the requested fields of a tweet line
+
+    :type line: str - a single JSON line
+    :type fields: tuple(str) - names of the fields to extract
+    :type selective: boolean - use the fast path, full decoding otherwise
+    :rtype dict of field --> value, or None if the line is not a tweet
+'''
+def extract_fields(line, fields=DEFAULT_FIELDS, selective=True):
+    if selective:
+        try:
+            return extract_fields_fast(line, fields)
+        except FallbackToFullParse:
+            pass
+    return extract_fields_full(line, fields)
+
+
+'''
+    Helper Function: Extract fields by decoding the whole tweet object.
+'''
+def extract_fields_full(line, fields):
+    single_tweet = simplejson.loads(line)
+    if not isinstance(single_tweet, dict) or 'text' not in single_tweet:
+        return None
+
+    result = {}
+    for field in fields:
+        if (field == 'hashtags'):
+            entities = single_tweet.get('entities') or {}
+            result[field] = [tag['text'] for tag in entities.get('hashtags', [])]
+        else:
+            result[field] = single_tweet.get(field)
+    return result
+
+
+'''
+    Helper Function: Extract fields without building the object tree.
+
+    Raises FallbackToFullParse whenever the line does not have the layout
+    the scanner relies on.
+'''
+def extract_fields_fast(line, fields):
+    if not line.startswith(TWEET_PREFIX):
+        raise FallbackToFullParse()
+
+    # Everything up to the top-level text key must be flat scalars, otherwise
+    # the first occurrence of a key could belong to a nested object.
+    text_pos = line.find('"text":"')
+    if (text_pos == -1 or line.find('{', 1, text_pos) != -1 or line.find('[', 1, text_pos) != -1):
+        raise FallbackToFullParse()
+
+    result = {}
+    for field in fields:
+        if (field == 'text'):
+            result[field] = decode_string(line, text_pos + 8)
+        elif (field == 'created_at' or field == 'id_str'):
+            key = '"{}":"'.format(field)
+            pos = line.find(key, 0, text_pos)
+            result[field] = decode_string(line, pos + len(key)) if (pos != -1) else None
+        elif (field == 'timestamp_ms'):
+            result[field] = extract_timestamp_ms(line)
+        elif (field == 'hashtags'):
+            result[field] = extract_hashtags(line)
+        else:
+            raise FallbackToFullParse()
+    return result
+
+
+'''
+    Helper Function: Decode the JSON string value starting after its opening quote.
+'''
+def decode_string(line, start):
+    try:
+        return scanstring(line, start)[0]
+    except ValueError:
+        raise FallbackToFullParse()
+
+
+'''
+    Helper Function: timestamp_ms is the last key of a streamed tweet.
+'''
+def extract_timestamp_ms(line):
+    pos = line.rfind('"timestamp_ms":"')
+    if (pos == -1):
+        if (line.find('"timestamp_ms"') != -1):
+            raise FallbackToFullParse()
+        return None
+    end = line.find('"', pos + 16)
+    if (end == -1 or line[end + 1:].strip() != '}'):
+        raise FallbackToFullParse()
+    return line[pos + 16:end]
+
+
+'''
+    Helper Function: Hashtag texts of the top-level entities object.
+
+    Retweets and quotes embed whole statuses with their own entities, and so
+    can extended_tweet, user or any other nested object. Only a line with a
+    single entities object, starting with its hashtags, can tell which one
+    is the top-level one; every other line is left to the full parser.
+    Quotes inside JSON strings are escaped, so the keys cannot be matched
+    inside a text.
+'''
+def extract_hashtags(line):
+    for key in NESTED_STATUS_KEYS:
+        if (line.find(key) != -1):
+            raise FallbackToFullParse()
+
+    pos = line.find(ENTITIES_KEY)
+    if (pos == -1 or not line.startswith(HASHTAGS_KEY, pos) or line.find(ENTITIES_KEY, pos + 1) != -1):
+        raise FallbackToFullParse()
+    start = pos + len(HASHTAGS_KEY)
+    match = HASHTAG_ARRAY.match(line, start)
+    if not match:
+        raise FallbackToFullParse()
+
+    return [scanstring(raw + '"', 0)[0] for raw in HASHTAG_TEXT.findall(line, start, match.end())]
@@ -0,0 +1,102 @@
+import calendar
+
+'''
+    Class implementing fast conversion of tweet timestamps to epoch seconds.
+
+    Twitter's created_at always has the layout 'Thu Oct 29 17:51:01 +0000 2015',
+    so fields are sliced at fixed positions instead of going through strptime.
+    At firehose rates hundreds of tweets share a second, so results are memoized
+    per created_at string, and the midnight epoch of each day is cached so a
+    miss only costs a few int() calls. When the tweet carries timestamp_ms it is
+    used directly.
+'''
+
+MONTHS = {'Jan': 1, 'Feb': 2, 'Mar': 3, 'Apr': 4, 'May': 5, 'Jun': 6,
+          'Jul': 7, 'Aug': 8, 'Sep': 9, 'Oct': 10, 'Nov': 11, 'Dec': 12}
+
+
+class TweetTimeParser(object):
+
+    '''
+        initializes a parser object
+
+        :type cache_size: int - number of distinct seconds memoized before the cache is reset
+    '''
+    def __init__(self, cache_size=4096):
+        self.cache_size = cache_size
+        self.cache = {} # created_at string --> epoch second
+        self.day_cache = {} # (year, month, day) --> epoch second of midnight
+
+
+    '''
+        Function that returns the epoch second of a tweet
+
+        timestamp_ms is preferred when present, otherwise created_at is parsed.
+
+        :type created_at: str
+        :type timestamp_ms: str or int
+        :rtype int or None if neither field could be parsed
+    '''
+    def parse(self, created_at, timestamp_ms=None):
+        if timestamp_ms:
+            try:
+                return int(timestamp_ms) // 1000
+            except ValueError:
+                pass
+
+        epoch = self.cache.get(created_at)
+        if epoch is None:
+            epoch = self.parse_created_at(created_at)
+            if epoch is None:
+                return None
+            if (len(self.cache) >= self.cache_size):
+                self.cache.clear()
+            self.cache[created_at] = epoch
+        return epoch
+
+
+    '''
+        Function that converts a created_at string to epoch seconds, uncached
+
+        :type created_at: str e.g 'Thu Oct 29 17:51:01 +0000 2015'
+        :rtype int or None if the string is malformed
+    '''
+    def parse_created_at(self, created_at):
+        if not created_at:
+            return None
+        if (len(created_at) != 30):
+            # Tolerate stray whitespace around the otherwise fixed layout
+            created_at = ' '.join(created_at.split())
+            if (len(created_at) != 30):
+                return None
+        try:
+            month = MONTHS[created_at[4:7]]
+            day = int(created_at[8:10])
+            hour = int(created_at[11:13])
+            minute = int(created_at[14:16])
+            second = int(created_at[17:19])
+            offset = created_at[20:25]
+            year = int(created_at[26:30])
+        except (KeyError, ValueError):
+            return None
+
+        if (created_at[13] != ':' or created_at[16] != ':'):
+            return None
+
+        key = (year, month, day)
+        midnight = self.day_cache.get(key)
+        if midnight is None:
+            try:
+                midnight = calendar.timegm((year, month, day, 0, 0, 0))
+            except (ValueError, OverflowError):
+                return None
+            self.day_cache[key] = midnight
+
+        epoch = midnight + hour * 3600 + minute * 60 + second
+        if (offset != '+0000'):
+            try:
+                shift = int(offset[1:3]) * 3600 + int(offset[3:5]) * 60
+            except ValueError:
+                return None
+            epoch = epoch - shift if (offset[0] == '+') else epoch + shift
+        return epoch
@@ -0,0 +1,100 @@
+from collections import deque
+
+'''
+    Class implementing the sliding time window of hashtag sets needed for the
+    hashtag graph.
+
+    Entries are kept in a deque in arrival order, keyed by the epoch second of
+    the tweet that produced them. Tweets arrive (mostly) in time order, so the
+    oldest entries always sit at the left end and eviction is a run of popleft
+    calls, amortized O(1) per tweet. Several tweets may share a second, each
+    one gets its own entry. The few late entries are inserted in place.
+'''
+
+class TimeWindow(object):
+
+    '''
+        initializes a window object
+
+        :type window_length: int - max age in seconds of an entry relative to the newest tweet
+    '''
+    def __init__(self, window_length):
+        self.window_length = window_length
+        self.entries = deque()
+        self.newest = None
+
+
+    '''
+        Number of live entries in the window
+    '''
+    def __len__(self):
+        return len(self.entries)
+
+
+    '''
+        Iterate over live entries as (epoch, hashtags) from oldest to newest
+    '''
+    def __iter__(self):
+        return iter(self.entries)
+
+
+    '''
+        Setter: Replace the window contents, e.g from a checkpoint
+
+        :type entries: iterable of (epoch, hashtags) from oldest to newest
+        :type newest: int - epoch of the newest tweet seen, None if none yet
+    '''
+    def reset(self, entries, newest):
+        self.entries = deque(entries)
+        self.newest = newest
+
+
+    '''
+        Getter: True if a tweet at epoch is already older than the window
+    '''
+    def expired(self, epoch):
+        return (self.newest is not None and epoch < self.newest - self.window_length)
+
+
+    '''
+        Setter: Adds a set of hashtags seen at epoch second to the window
+
+        A late entry is inserted at its place in time order, found by walking
+        back from the newest end, so the window stays sorted for eviction.
+    '''
+    def add(self, epoch, hashtags):
+        entries = self.entries
+        if (not entries or epoch >= entries[-1][0]):
+            entries.append((epoch, hashtags))
+        else:
+            later = 0
+            for entry in reversed(entries):
+                if (entry[0] <= epoch):
+                    break
+                later += 1
+            entries.rotate(later)
+            entries.append((epoch, hashtags))
+            entries.rotate(-later)
+        if (self.newest is None or epoch > self.newest):
+            self.newest = epoch
+
+
+    '''
+        Function that advances the window to epoch and evicts expired entries.
+
+        Every entry older than window_length seconds relative to the newest
+        tweet seen so far is popped and its hashtags yielded, oldest first, so
+        the caller can remove the matching edges. The generator must be
+        exhausted for the eviction to complete.
+
+        :type epoch: int - epoch second of the latest tweet
+        :rtype generator of hashtag sets
+    '''
+    def evict(self, epoch):
+        if (self.newest is None or epoch > self.newest):
+            self.newest = epoch
+
+        cutoff = self.newest - self.window_length
+        entries = self.entries
+        while entries and entries[0][0] < cutoff:
+            yield entries.popleft()[1]
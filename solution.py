@@ -2,13 +2,12 @@
 # -*- coding: UTF-8 -*-
 
 # Standard Library Importations
-import unicodedata as ud, re, string, sys, os, simplejson
-from itertools import islice, chain
-from collections import OrderedDict, deque
-from datetime import datetime, timedelta
+import unicodedata as ud, re, sys, os, argparse, multiprocessing, socket, cProfile, simplejson
+from itertools import islice, combinations
+from collections import deque
 
 # Personal Libraries import
-from helper_modules import graph
+from helper_modules import graph, window, tweettime, tweetjson, output, cleaner, tweetfile, checkpoint, follow, interning, reorder, ingest, stats, edgeexport, compressed, topk, multiwindow, tweetcache
 
 
 ######### HELPER CLASSES #################
@@ -25,6 +24,10 @@ class _Const(object):
         return 59
 
 
+# Shared memoizing parser of tweet timestamps
+TWEET_TIME_PARSER = tweettime.TweetTimeParser()
+
+
 '''
     Helper class to highlight clean text 
 '''
@@ -92,6 +95,16 @@ def contains_pattern(text, pattern):
     return True if (re.search(pattern, text)) else False
     
     
+'''
+    Function that extracts the hashtags of a clean tweet text
+    
+    :rtype set(str)
+'''
+
+def extract_hashtags(text):
+    return set([re.sub(r"#+", "#", k) for k in set([re.sub(r"(\W+)$", "", j, flags = re.UNICODE) for j in set([i for i in text.split() if i.startswith("#")])])])
+
+
 '''
     Function that checks if text is empty
 '''
@@ -105,9 +118,7 @@ def is_empty(text):
 '''
 
 def is_not_only_punc(text):
-    pattern = re.compile("[{}]".format(re.escape(string.punctuation)))
-    text_list = text.split()
-    return True if [char for char in text_list if not pattern.match(char)] else False
+    return cleaner.is_printable(text)
     
     
 '''
@@ -116,7 +127,23 @@ def is_not_only_punc(text):
 
 def remove_non_basic_latin_chars(text):
     # Process only basic latin characters else continue
-    return ''.join([c for c in text if ord(c) in xrange(32, 128)])
+    if isinstance(text, unicode):
+        text = text.encode('ascii', 'ignore')
+    return text.translate(None, cleaner.NON_ASCII_BYTES + cleaner.CONTROL_CHARS + '\t\n\x0b\x0c\r')
+
+
+'''
+    Function that converts a tweet timestamp to epoch seconds
+    
+    Prefers timestamp_ms when the tweet carries it.
+    
+    :type str: Tweet time string e.g 'Thu Oct 29 17:51:01 +0000 2015'
+    :type str: timestamp_ms field of the tweet, if any
+    :rtype int or None if the time string is malformed
+'''
+
+def tweet_time_to_epoch(time_str, timestamp_ms=None):
+    return TWEET_TIME_PARSER.parse(time_str, timestamp_ms)
 
 
 ############## PROCESS FLOW FUNCTIONS ####################
@@ -124,246 +151,1149 @@ def remove_non_basic_latin_chars(text):
 '''
     Generate tweets text and timestamp 
     
-    Yields a single tweet timestamp and text on at a time using a generator,
-    which must be properly handled by the generator caller.
+    Yields a single tweet text, timestamp and timestamp_ms (None when absent)
+    at a time using a generator, which must be properly handled by the generator caller.
+    
+    With selective set only the needed fields are decoded from each line,
+    lines the selective scanner cannot handle are fully parsed.
+    
+    A slice of the input can be read through the memory-mapped line index,
+    either lines line_range[0] to line_range[1] - 1 (slice semantics)
+    or every line from byte start_offset on.
+    
+    gzip, bz2 and xz inputs are decompressed on the fly, a slice of them is
+    found by reading through the decompressed lines before it.
 '''
 
-def extract_tweet_text_and_timestamp(input_file):
+def extract_tweet_text_and_timestamp(input_file, selective=True, line_range=None, start_offset=None):
     
     # Open input file, generate text and timestamp
     try:
-        with open(input_file) as twitter_input:
-            for line in twitter_input:
-                if not line: # To filter out keep-alive new lines
-                    continue
-                single_tweet = simplejson.loads(line)
-                if 'text' in single_tweet:
-                    
-                    text = single_tweet['text']
-                    time_stamp = single_tweet['created_at']
-                    
-                    yield text, time_stamp
+        if (line_range is None and start_offset is None):
+            with compressed.open_input(input_file) as twitter_input:
+                for text_and_time in extract_tweets_from_lines(twitter_input, selective):
+                    yield text_and_time
+        elif compressed.detect_compression(input_file):
+            with compressed.open_input(input_file) as twitter_input:
+                if (start_offset is not None):
+                    lines = (line for (_, line) in offset_lines(twitter_input, start_offset))
+                else:
+                    lines = islice(twitter_input, *line_range)
+                for text_and_time in extract_tweets_from_lines(lines, selective):
+                    yield text_and_time
+        else:
+            with tweetfile.TweetFile(input_file) as twitter_input:
+                if (start_offset is not None):
+                    lines = twitter_input.lines_from_offset(start_offset)
+                else:
+                    lines = twitter_input.lines(*line_range)
+                for text_and_time in extract_tweets_from_lines((line for (_, line) in lines), selective):
+                    yield text_and_time
     
     except IOError:
         sys.stderr.write("[extract_tweet_text_and_timestamp] - Error: Could not open {}".format(input_file))
         sys.exit(-1)
 
 
+'''
+    Generate tweets text and timestamp from an iterable of raw JSON lines
+'''
+
+def extract_tweets_from_lines(lines, selective=True):
+    for line in lines:
+        text_and_time = extract_tweet(line, selective)
+        if text_and_time is not None:
+            yield text_and_time
+
+
+'''
+    Generate lines of a stream with their offset, from the first line that begins at or after start_offset
+    
+    :rtype generator of (byte offset, line)
+'''
+
+def offset_lines(lines, start_offset=0):
+    offset = 0
+    for line in lines:
+        if (offset >= start_offset):
+            yield offset, line
+        offset += len(line)
+
+
+'''
+    Generate tweets text and timestamp together with input offsets
+    
+    Yields the byte offset right after each tweet line (where a resumed run
+    picks up) followed by the tweet text, timestamp and timestamp_ms.
+    Offsets of a compressed input count decompressed bytes.
+'''
+
+def extract_tweets_with_offsets(input_file, start_offset=0, selective=True):
+    try:
+        (twitter_input, lines) = open_lines_with_offsets(input_file, start_offset)
+        with twitter_input:
+            for begin, line in lines:
+                text_and_time = extract_tweet(line, selective)
+                if text_and_time is not None:
+                    yield (begin + len(line),) + text_and_time
+    
+    except IOError:
+        sys.stderr.write("[extract_tweets_with_offsets] - Error: Could not open {}".format(input_file))
+        sys.exit(-1)
+
+
+'''
+    Function that opens the input for reading lines with their offsets, from start_offset on
+    
+    :rtype tuple(open input to close, generator of (byte offset, line))
+'''
+
+def open_lines_with_offsets(input_file, start_offset=0):
+    if compressed.detect_compression(input_file):
+        twitter_input = compressed.open_input(input_file)
+        return twitter_input, offset_lines(twitter_input, start_offset)
+    twitter_input = tweetfile.TweetFile(input_file)
+    return twitter_input, twitter_input.lines_from_offset(start_offset)
+
+
+'''
+    Generate tweets text and timestamp as they are appended to the input
+    
+    Same tuples as extract_tweets_with_offsets, plus None whenever the reader
+    has caught up with the end of the file.
+'''
+
+def extract_tweets_following(input_file, start_offset=0, selective=True, poll_interval=0.05, idle_timeout=None):
+    try:
+        for line_and_offset in follow.follow_lines(input_file, start_offset, poll_interval, idle_timeout=idle_timeout):
+            if line_and_offset is None:
+                yield None
+                continue
+            text_and_time = extract_tweet(line_and_offset[1], selective)
+            if text_and_time is not None:
+                yield (line_and_offset[0],) + text_and_time
+    
+    except IOError:
+        sys.stderr.write("[extract_tweets_following] - Error: Could not open {}".format(input_file))
+        sys.exit(-1)
+
+
+'''
+    Function that extracts text, timestamp and timestamp_ms from a raw JSON line
+    
+    :rtype tuple, or None for keep-alive new lines and non tweet messages
+'''
+
+def extract_tweet(line, selective=True):
+    if not line or line.isspace(): # To filter out keep-alive new lines
+        return None
+    single_tweet = tweetjson.extract_fields(line, tweetjson.DEFAULT_FIELDS, selective)
+    if single_tweet is None:
+        return None
+    return single_tweet['text'], single_tweet['created_at'], single_tweet['timestamp_ms']
+
+
 '''
     clean_tweet remove unicode and track number of these tweets
+    
+    Non basic latin characters are removed and whitespace normalized
+    by the precompiled cleaner in a single pass.
+    
     :type str: text
-    :rtype str
+    :rtype tuple(str, boolean) - clean text, True if text had unicode
 '''
 def clean_string(text):
+    return cleaner.clean_text(text)
+
+
+'''
+    Function that formats a clean tweet as a line of ft1.txt
+'''
+
+def format_clean_tweet(clean_text, time_stamp):
+    return "{} (timestamp: {})".format(clean_text, time_stamp)
+
+
+'''
+    Class that writes clean tweets of feature 1 and tracks the unicode count
+    
+    Tweets are fed one at a time already cleaned, the unicode trailer
+    line is written when the writer is closed.
+'''
+
+class CleanTweetsWriter(object):
+    
+    def __init__(self, output_file, line_buffered=False):
+        self.output_file = output_file
+        self.num_tweets_with_unicode = 0
+        
+        # Single output handle for the whole run
+        try:
+            self.writer = output.BufferedLineWriter(output_file, line_buffered=line_buffered)
+        except IOError:
+            sys.stderr.write("[CleanTweetsWriter] - Error: Could not open {}".format(output_file))
+            sys.exit(-1)
     
-    if not text: return ("", False)
+    '''
+        Write a single clean tweet, skipping tweets composed of non basic latin chars
+    '''
+    def add_tweet(self, clean_text, has_unicode, time_stamp):
+        if (has_unicode):
+            self.num_tweets_with_unicode += 1
         
-    text_has_unicode = False
+        if cleaner.is_printable(clean_text):
+            self.writer.write_line(format_clean_tweet(clean_text, time_stamp))
     
-    # Convert text to raw literals and unicode to avoid regex  and internal processing issues.
-    text = text.replace("\\", "\\\\")
-    text = to_unicode(text)
+    '''
+        Write a block of already formatted lines produced elsewhere, e.g by a worker process
+    '''
+    def add_block(self, block, num_tweets_with_unicode):
+        self.num_tweets_with_unicode += num_tweets_with_unicode
+        self.writer.write_block(block)
     
-    # Unicode pattern
-    unicode_pattern = re.compile(u'(\\u[0-9A-Fa-f]+)')
+    '''
+        Snapshot of the writer for checkpoints
+    '''
+    def get_state(self):
+        return {'num_tweets_with_unicode': self.num_tweets_with_unicode,
+                'output_size': self.writer.size()}
     
-    # Keep track of texts with unicode and then remove the unicode chars
-    if contains_pattern(text, unicode_pattern):
-        text_has_unicode = True
-        text = strip_unicode(text)
-
-    # Remove escape characters. This is faster than using re.compile(r'\s+') class
-    text = ' '.join(text.strip().split())
-    text = text.replace("\\", "")
+    '''
+        Restore a snapshot, dropping lines written after it was taken
+    '''
+    def restore_state(self, state):
+        self.num_tweets_with_unicode = state['num_tweets_with_unicode']
+        self.writer.truncate(state['output_size'])
+    
+    '''
+        Push written lines to the output file
+    '''
+    def flush(self):
+        self.writer.flush()
     
-    # Return clean/normalized text and also if a unicode character was found.
-    return to_str(text), text_has_unicode
+    '''
+        Write number of tweet with unicode and close the output file
+    '''
+    def close(self):
+        self.writer.write_line("{} tweets contained unicode.".format(self.num_tweets_with_unicode))
+        self.writer.close()
 
 
 '''
     Function that processes a text message and writes to a text file in required output
 '''
 
-def process_tweets(input_file, output_file):       
+def process_tweets(input_file, output_file, line_buffered=False):       
     
     # check if file exists on filesystem
     if not input_file or not os.path.isfile(input_file):    
         return
     
-    # Global variable initializations
-    num_tweets_with_unicode = 0
-    has_unicode = False
+    feed_tweet_features(input_file, clean_tweets=CleanTweetsWriter(output_file, line_buffered))
 
-    # Extract tweet text and timestamp with generator
-    for text_and_time in extract_tweet_text_and_timestamp(input_file):
-        text = text_and_time[0]
-        time_stamp = text_and_time[1]
-        
-        # Proceed only with non basic latin characters
-        text = remove_non_basic_latin_chars(text)
-        
-        # tweet was composed of non basic latin chars
-        if not text:
-            continue
-            
-        # Clean out text
-        clean_text, has_unicode = clean_string(text)
-        clean_text = clean_text.strip()
-          
-        # Sanity Check on timestamp
-        clean_time, _ = clean_string(time_stamp)
-        
+
+'''
+    Function that splits a file into newline aligned byte ranges
+    
+    Each range starts at the beginning of a line and ends right after a newline
+    (or at end of file), so ranges can be processed independently. Split
+    points come from the line index of tweetfile.TweetFile, which is saved
+    next to the input and reused by later runs.
+    
+    :type int: chunk_size - approximate size in bytes of each range
+    :rtype List[tuple(int, int)] - (start, end) offsets
+'''
+
+def split_input_ranges(input_file, chunk_size):
+    with tweetfile.TweetFile(input_file) as twitter_input:
+        return twitter_input.split_ranges(max(1, -(-twitter_input.size // chunk_size)))
+
+
+'''
+    Worker function: clean the tweets of one byte range for feature 1
+    
+    :type tuple(str, int, int): task - input file, start and end offsets
+    :rtype tuple(str, int) - block of ft1 lines, number of tweets with unicode
+'''
+
+def clean_tweets_range(task):
+    (input_file, start, end) = task
+    with open(input_file, 'rb') as twitter_input:
+        twitter_input.seek(start)
+        block = twitter_input.read(end - start)
+    
+    texts = []
+    time_stamps = []
+    for text, time_stamp, _ in extract_tweets_from_lines(block.split('\n')):
+        texts.append(text)
+        time_stamps.append(time_stamp)
+    
+    lines = []
+    num_tweets_with_unicode = 0
+    for (clean_text, has_unicode), time_stamp in zip(cleaner.clean_texts(texts), time_stamps):
         if (has_unicode):
             num_tweets_with_unicode += 1
+        if cleaner.is_printable(clean_text):
+            lines.append(format_clean_tweet(clean_text, time_stamp))
     
-        # Write to output file
-        try:
-            with open(output_file, 'a') as f:
-                if not is_empty(clean_text) and is_not_only_punc(clean_text):
-                    f.write("{} (timestamp: {})\n".format(clean_text, clean_time))
-        except IOError:
-            sys.stderr.write("[process_tweets] - Error: Could not open {}".format(output_file))
-            sys.exit(-1)
+    if lines:
+        lines.append('')
+    return '\n'.join(lines), num_tweets_with_unicode
+
+
+'''
+    Feature 1 sharded over a pool of worker processes
+    
+    The input is split in newline aligned byte ranges that are cleaned in
+    parallel, blocks are written back in input order and the unicode counts
+    summed for the trailer line. Output is identical to process_tweets.
+'''
+
+def process_tweets_parallel(input_file, output_file, workers=None, chunk_size=1 << 22, line_buffered=False):
     
-    # Write number of tweet with unicode to file
+    # check if file exists on filesystem
+    if not input_file or not os.path.isfile(input_file):    
+        return
+    
+    tasks = [(input_file, start, end) for (start, end) in split_input_ranges(input_file, chunk_size)]
+    clean_tweets = CleanTweetsWriter(output_file, line_buffered)
+    
+    pool = multiprocessing.Pool(workers)
     try:
-        with open(output_file, 'a') as f:
-            f.write("{} tweets contained unicode.\n".format(num_tweets_with_unicode))
+        for block, num_tweets_with_unicode in pool.imap(clean_tweets_range, tasks):
+            clean_tweets.add_block(block, num_tweets_with_unicode)
+        clean_tweets.close()
+        pool.close()
     except IOError:
-        sys.stderr.write("[process_tweets] - Error: Could not open {}".format(output_file))
+        pool.terminate()
+        sys.stderr.write("[process_tweets_parallel] - Error: Could not write {}".format(output_file))
         sys.exit(-1)
+    except:
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
+
 
+'''
+    Single pass over the input feeding both features
+    
+    Reads, decodes and cleans every tweet once and feeds the result to the
+    feature 1 writer and to the hashtag graph of feature 2, either can be None.
+    line_range and start_offset restrict the run to a slice of the input.
+    
+    With a checkpoint_file, a snapshot of both features and of the input
+    offset is saved every checkpoint_every tweets and at the end of the
+    input. resume restores the latest snapshot, cuts the output files back
+    to their size at that point and continues reading after its offset.
+    
+    With follow the input is kept open and tweets are processed as they are
+    appended, outputs are flushed whenever the reader catches up. The run
+    ends after idle_timeout seconds without new tweets (never when None)
+    or on Ctrl-C, then finishes like the end of a regular input.
+    
+    When the input has an up to date tweet cache (see build_tweet_cache),
+    tweets are read from it already decoded, cleaned and split in hashtags,
+    unless use_cache is False. Follow mode and line_range read the JSON.
+    
+    Otherwise, with more than one worker (None for every core), a plain
+    input is decoded, cleaned and split in hashtags by a pool of worker
+    processes, see pipeline_tweet_rows, and only the features run here, in
+    input order. Outputs are the same as with a single worker.
+'''
+
+def feed_tweet_features(input_file, clean_tweets=None, hashtag_graph=None, line_range=None, start_offset=None,
+                        checkpoint_file=None, checkpoint_every=100000, resume=False,
+                        follow=False, poll_interval=0.05, idle_timeout=None, use_cache=True, workers=1):
+    
+    if hashtag_graph is not None:
+        hashtag_graph.open_output()
+    
+    try:
+        # Restore the latest snapshot and continue right after it
+        if (resume and checkpoint_file is not None):
+            state = checkpoint.load_checkpoint(checkpoint_file)
+            if state is not None:
+                if ((clean_tweets is not None and state['feature1'] is None) or
+                        (hashtag_graph is not None and state['feature2'] is None)):
+                    sys.stderr.write("[feed_tweet_features] - Error: {} was taken with other features".format(checkpoint_file))
+                    sys.exit(-1)
+                start_offset = state['offset']
+                if clean_tweets is not None:
+                    clean_tweets.restore_state(state['feature1'])
+                if hashtag_graph is not None:
+                    hashtag_graph.restore_state(state['feature2'])
         
+        cache = None
+        if (use_cache and not follow and line_range is None):
+            cache = tweetcache.load_cache(input_file)
+        pipelined = (cache is None and workers != 1 and not follow and line_range is None and start_offset is None and
+                     checkpoint_file is None and not compressed.detect_compression(input_file))
+        
+        # Checkpoints need the offset of every tweet in the input
+        if cache is not None:
+            tweets = cache.rows(start_offset or 0)
+        elif pipelined:
+            tweets = pipeline_tweet_rows(input_file, workers)
+        elif follow:
+            tweets = extract_tweets_following(input_file, start_offset or 0, poll_interval=poll_interval,
+                                              idle_timeout=idle_timeout)
+        elif checkpoint_file is not None:
+            tweets = extract_tweets_with_offsets(input_file, start_offset or 0)
+        else:
+            tweets = ((None,) + text_and_time for text_and_time in
+                      extract_tweet_text_and_timestamp(input_file, line_range=line_range, start_offset=start_offset))
+        
+        offset = start_offset or 0
+        num_tweets = 0
+        saved_tweets = 0
+        try:
+            for tweet in tweets:
+                
+                # Caught up with a followed input, make the latest results visible
+                if tweet is None:
+                    if clean_tweets is not None:
+                        clean_tweets.flush()
+                    if hashtag_graph is not None:
+                        hashtag_graph.flush_output()
+                    if (checkpoint_file is not None and num_tweets != saved_tweets):
+                        save_features_checkpoint(checkpoint_file, offset, clean_tweets, hashtag_graph)
+                        saved_tweets = num_tweets
+                    continue
+                
+                if (cache is not None or pipelined):
+                    feed_cached_tweet(tweet, clean_tweets, hashtag_graph)
+                else:
+                    (_, text, time_stamp, time_stamp_ms) = tweet
+                    feed_tweet(text, time_stamp, time_stamp_ms, clean_tweets, hashtag_graph)
+                
+                # Only advanced once the tweet is fully applied, an interrupt never splits a tweet
+                offset = tweet[0]
+                num_tweets += 1
+                if (checkpoint_file is not None and num_tweets % checkpoint_every == 0):
+                    save_features_checkpoint(checkpoint_file, offset, clean_tweets, hashtag_graph)
+                    saved_tweets = num_tweets
+        except KeyboardInterrupt:
+            if not follow:
+                raise
+        
+        # Final snapshot before the ft1 trailer, a resume then simply rewrites it
+        if checkpoint_file is not None:
+            save_features_checkpoint(checkpoint_file, offset, clean_tweets, hashtag_graph)
+        
+        if clean_tweets is not None:
+            clean_tweets.close()
+        if hashtag_graph is not None:
+            hashtag_graph.close_output()
+    except IOError:
+        sys.stderr.write("[feed_tweet_features] - Error: Could not write output files")
+        sys.exit(-1)
+
+
+'''
+    Function that cleans one tweet and feeds it to both features, either can be None
+'''
+
+def feed_tweet(text, time_stamp, time_stamp_ms, clean_tweets, hashtag_graph):
+    clean_text, has_unicode = cleaner.clean_text(text)
+    
+    if clean_tweets is not None:
+        clean_tweets.add_tweet(clean_text, has_unicode, time_stamp)
+    if hashtag_graph is not None:
+        hashtag_graph.process_tweet(clean_text, time_stamp, time_stamp_ms)
+
+
+'''
+    Function that feeds one parsed row, of the tweet cache or a pipeline worker, to both features, either can be None
+'''
+
+def feed_cached_tweet(row, clean_tweets, hashtag_graph):
+    (_, clean_text, has_unicode, time_stamp, tweet_epoch, tags) = row
+    
+    if clean_tweets is not None:
+        clean_tweets.add_tweet(clean_text, has_unicode, time_stamp)
+    if (hashtag_graph is not None and tweet_epoch is not None):
+        hashtag_graph.process_tweet(clean_text, time_stamp, tweet_epoch=tweet_epoch, tags=tags)
+
+
+'''
+    Function that decodes, cleans and splits in hashtags one raw JSON line
+    
+    Everything feed_tweet does before the features, in the form of a row of
+    the tweet cache without its offsets.
+    
+    :rtype tuple(clean text, has unicode, created_at, epoch or None, hashtags), or None for non tweets
+'''
+
+def parse_tweet(line):
+    text_and_time = extract_tweet(line)
+    if text_and_time is None:
+        return None
+    (text, time_stamp, time_stamp_ms) = text_and_time
+    clean_text, has_unicode = cleaner.clean_text(text)
+    tags = extract_hashtags(clean_text) if (r'#' in clean_text) else ()
+    return clean_text, has_unicode, time_stamp, tweet_time_to_epoch(time_stamp, time_stamp_ms), tags
+
+
+'''
+    Worker function: parse the tweets of one byte range for the feature pipeline
+    
+    :type tuple(str, int, int): task - input file, start and end offsets
+    :rtype List[tuple] - rows like TweetCache.rows, in input order
+'''
+
+def parse_tweets_range(task):
+    (input_file, start, end) = task
+    with open(input_file, 'rb') as twitter_input:
+        twitter_input.seek(start)
+        block = twitter_input.read(end - start)
+    
+    rows = []
+    line_end = start
+    for line in block.split('\n'):
+        line_end = min(line_end + len(line) + 1, end)
+        parsed = parse_tweet(line)
+        if parsed is not None:
+            rows.append((line_end,) + parsed)
+    return rows
+
+
+'''
+    Generate parsed tweets of the input from a pool of worker processes
+    
+    Workers parse newline aligned byte ranges of the input in parallel, see
+    parse_tweets_range, while the caller consumes the rows in input order.
+    At most max_pending ranges are parsed ahead of the caller, which bounds
+    the memory held by finished but unconsumed ranges.
+    
+    :rtype generator of rows like TweetCache.rows
+'''
+
+def pipeline_tweet_rows(input_file, workers=None, chunk_size=1 << 22, max_pending=None):
+    tasks = [(input_file, start, end) for (start, end) in split_input_ranges(input_file, chunk_size)]
+    pool = multiprocessing.Pool(workers)
+    max_pending = max_pending or 2 * (workers or multiprocessing.cpu_count())
+    
+    pending = deque()
+    try:
+        for task in tasks:
+            pending.append(pool.apply_async(parse_tweets_range, (task,)))
+            if (len(pending) >= max_pending):
+                for row in pending.popleft().get():
+                    yield row
+        while pending:
+            for row in pending.popleft().get():
+                yield row
+        pool.close()
+    except:
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
+
+
+'''
+    Function that converts the input once into its tweet cache
+    
+    Every tweet is decoded, cleaned and split in hashtags like a run of the
+    features would, and the results are saved next to the input, see
+    tweetcache. Later runs over the unchanged input read the cache instead.
+    
+    :rtype int - number of cached tweets
+'''
+
+def build_tweet_cache(input_file, cache_file=None):
+    try:
+        cache = tweetcache.TweetCacheWriter(input_file, cache_file)
+        (twitter_input, lines) = open_lines_with_offsets(input_file)
+        with twitter_input:
+            for begin, line in lines:
+                parsed = parse_tweet(line)
+                if parsed is not None:
+                    cache.add(begin, begin + len(line), *parsed)
+        cache.close()
+    except (IOError, OSError):
+        sys.stderr.write("[build_tweet_cache] - Error: Could not convert {} into its tweet cache".format(input_file))
+        sys.exit(-1)
+    return len(cache.epochs)
+
+
+'''
+    Function that saves a snapshot of both features at an input offset
+'''
+
+def save_features_checkpoint(checkpoint_file, offset, clean_tweets, hashtag_graph):
+    checkpoint.save_checkpoint(checkpoint_file, {
+        'offset': offset,
+        'feature1': clean_tweets.get_state() if clean_tweets is not None else None,
+        'feature2': hashtag_graph.get_state() if hashtag_graph is not None else None,
+    })
+
+
+'''
+    Fused driver for both features
+    
+    Runs feed_tweet_features over the input with the requested features.
+    With more than one worker (workers=None uses every core) tweets are
+    parsed in a process pool feeding both features in order, feature 1 on
+    its own is sharded over the pool by process_tweets_parallel. interned runs feature 2 on integer
+    hashtag ids and the compact graph, lateness is the reordering tolerance
+    of feature 2 in seconds. export_graph saves the hashtag graph of the
+    last window at the end, see InsightChallengeSolution.export_hashtag_graph.
+    trending (a topk.TrendingTopK) tracks the top hashtags and pairs of the
+    window, written to trending_file every trending_interval seconds.
+    extra_windows lists (seconds, output file) of more rolling average
+    degree windows, see InsightChallengeSolution. degree_stats_file gets the
+    max, median and degree_percentiles of the vertex degrees next to every
+    ft2 line, degree_histogram_file the full degree histogram of the last
+    window at the end. build_cache
+    first converts the input into its tweet cache, which both features then
+    read when it is up to date, unless use_cache is False.
+'''
+
+def process_tweet_features(input_file, output_file, output_file2, feature1=True, feature2=True, line_buffered=False, workers=1,
+                           line_range=None, start_offset=None, checkpoint_file=None, checkpoint_every=100000, resume=False,
+                           follow=False, poll_interval=0.05, idle_timeout=None, interned=False, lateness=0,
+                           export_graph=None, export_format='csv', trending=None, trending_file=None, trending_interval=60,
+                           extra_windows=None, degree_stats_file=None, degree_percentiles=(90, 99),
+                           degree_histogram_file=None, use_cache=True, build_cache=False):
+    
+    # check if file exists on filesystem
+    if not input_file or not os.path.isfile(input_file):    
+        return
+    
+    if build_cache:
+        print_out("Cached {} tweets".format(build_tweet_cache(input_file)))
+    cached = (use_cache and not follow and line_range is None and tweetcache.read_header(input_file) is not None)
+    
+    # Feature 1 alone scales out on its own, with feature 2 both are fed from the parsing pipeline.
+    # Compressed inputs cannot be split in byte ranges and are read in one pass,
+    # a cached input is read faster from its cache.
+    if (feature1 and not feature2 and workers != 1 and not cached and not compressed.detect_compression(input_file)):
+        process_tweets_parallel(input_file, output_file, workers, line_buffered=line_buffered)
+        return
+    
+    hashtag_graph = InsightChallengeSolution(input_file, output_file2, line_buffered, interned, lateness,
+                                             trending, trending_file, trending_interval, extra_windows,
+                                             degree_stats_file, degree_percentiles,
+                                             track_degrees=degree_histogram_file is not None) if feature2 else None
+    feed_tweet_features(input_file,
+                        clean_tweets=CleanTweetsWriter(output_file, line_buffered) if feature1 else None,
+                        hashtag_graph=hashtag_graph,
+                        line_range=line_range, start_offset=start_offset,
+                        checkpoint_file=checkpoint_file, checkpoint_every=checkpoint_every, resume=resume,
+                        follow=follow, poll_interval=poll_interval, idle_timeout=idle_timeout, use_cache=use_cache,
+                        workers=workers)
+    
+    if (export_graph is not None and hashtag_graph is not None):
+        hashtag_graph.export_hashtag_graph(export_graph, export_format)
+    if (degree_histogram_file is not None and hashtag_graph is not None):
+        hashtag_graph.export_degree_histogram(degree_histogram_file)
+
+
+
+'''
+    Ingestion server for both features
+    
+    Listens on address (see ingest.parse_address) for newline delimited tweet
+    JSON from any number of producers. Every tweet is cleaned and fed to both
+    features like a line of the input file, ft1/ft2 keep being written, and
+    each line is answered with the rolling average degree of the hashtag graph
+    once it is applied (unchanged for lines that are not tweets). Runs until
+    interrupted, then closes the outputs as at the end of an input file.
+    
+    :type max_pending: int - unanswered replies after which a producer is no longer read
+'''
+
+def serve_tweet_features(address, output_file, output_file2, feature1=True, line_buffered=False, interned=False,
+                         lateness=0, max_pending=1024, export_graph=None, export_format='csv',
+                         trending=None, trending_file=None, trending_interval=60, extra_windows=None,
+                         degree_stats_file=None, degree_percentiles=(90, 99), degree_histogram_file=None):
+    
+    clean_tweets = CleanTweetsWriter(output_file, line_buffered) if feature1 else None
+    hashtag_graph = InsightChallengeSolution(None, output_file2, line_buffered, interned, lateness,
+                                             trending, trending_file, trending_interval, extra_windows,
+                                             degree_stats_file, degree_percentiles,
+                                             track_degrees=degree_histogram_file is not None)
+    hashtag_graph.open_output()
+    
+    def process_line(line):
+        text_and_time = extract_tweet(line)
+        if text_and_time is not None:
+            feed_tweet(text_and_time[0], text_and_time[1], text_and_time[2], clean_tweets, hashtag_graph)
+        return "{}".format(hashtag_graph.hashtag_graph_average_degrees())
+    
+    def flush_outputs():
+        if clean_tweets is not None:
+            clean_tweets.flush()
+        hashtag_graph.flush_output()
+    
+    try:
+        server = ingest.TweetIngestServer(address, process_line, max_pending)
+    except (socket.error, ValueError) as e:
+        sys.stderr.write("[serve_tweet_features] - Error: Could not listen on {}: {}".format(address, e))
+        sys.exit(-1)
+    
+    print_out("Listening on {}".format(address))
+    try:
+        server.serve_forever(flush_outputs)
+    except KeyboardInterrupt:
+        pass
+    
+    if clean_tweets is not None:
+        clean_tweets.close()
+    hashtag_graph.close_output()
+    
+    if export_graph is not None:
+        hashtag_graph.export_hashtag_graph(export_graph, export_format)
+    if degree_histogram_file is not None:
+        hashtag_graph.export_degree_histogram(degree_histogram_file)
+
+
+'''
+    Function that turns on per-stage instrumentation of both features
+    
+    Wraps the function of every stage with a timer, see helper_modules.stats.
+    Every tweet is counted, whether it is parsed here (feed_tweet) or comes
+    already parsed from the tweet cache or the parsing pipeline
+    (feed_cached_tweet). Only the current process is measured: the decode,
+    clean and hashtag stages of tweets parsed by pool workers (--workers)
+    are not, nor are feature 1 workers of a parallel run, and tweets read
+    from the cache skip those stages. Reports go to stderr every interval
+    seconds (if given) and when report_stats is called.
+    
+    :type interval: float - seconds between intermediate reports, None for a final report only
+'''
+
+def enable_stats(interval=None):
+    collector = stats.enable(interval)
+    this_module = sys.modules[__name__]
+    collector.instrument(this_module, 'extract_tweet', 'json decode')
+    collector.instrument(this_module, 'feed_tweet', 'tweet (after json decode)', tick=True)
+    collector.instrument(this_module, 'feed_cached_tweet', 'tweet (parsed row)', tick=True)
+    collector.instrument(cleaner, 'strip_non_ascii', 'non-latin filter')
+    collector.instrument(cleaner, 'clean_text', 'clean_string')
+    collector.instrument(InsightChallengeSolution, 'get_hashtags', 'get_hashtags')
+    collector.instrument(InsightChallengeSolution, 'update_graph', 'update_graph')
+    collector.instrument(InsightChallengeSolution, 'remove_hashtags_edge', 'remove_hashtags_edge')
+    collector.instrument(InsightChallengeSolution, 'hashtag_graph_average_degrees', 'average degree')
+    collector.instrument(output.BufferedLineWriter, 'write_line', 'output writes')
+    return collector
+
+
+'''
+    Function that writes the end of run stats report, if stats are on
+'''
+
+def report_stats():
+    collector = stats.disable()
+    if collector is not None:
+        collector.report(final=True)
+
+
 class InsightChallengeSolution(object):
     
-    def __init__(self, input_filename, output_filename):
+    def __init__(self, input_filename, output_filename, line_buffered=False, interned=False, lateness=0,
+                 trending=None, trending_file=None, trending_interval=60, extra_windows=None,
+                 degree_stats_file=None, degree_percentiles=(90, 99), track_degrees=False):
         ''' Initiate Solution Object '''
         CONST = _Const()
         self.update_interval = CONST.HASH_GRAPH_UPDATE_INTERVAL
         self.time_graph_last_modified = ''
         self.input_file = input_filename
         self.output_file = output_filename
+        self.line_buffered = line_buffered # Flush ft2 after every line for tailing consumers
         self.num_tweets_with_unicode = 0
         self.time_of_latest_tweet = 0
         self.text = ''
         self.timestamp = 0
         self.lastupdate = 0
         self.set_of_tags = set()
+        self.num_late_tweets_dropped = 0 # Tweets that arrived after the window moved past them
+        
+        # Tweets out of order by up to lateness seconds are put back in order before use
+        self.reorder_buffer = reorder.ReorderBuffer(lateness) if lateness else None
+        
+        # Top hashtags and pairs of the window (a topk.TrendingTopK), written every trending_interval seconds
+        self.trending = trending
+        self.trending_file = trending_file
+        self.trending_interval = trending_interval
+        self.next_trending = None # Epoch from which the next top list is due
+        self.trending_writer = None
+        
+        # More windows next to the main one, as (seconds, output file), sharing one edge store.
+        # A window of S seconds keeps tweets up to S - 1 seconds old, like the main window.
+        self.extra_windows = sorted(extra_windows) if extra_windows else []
+        self.multi_window = multiwindow.MultiWindowGraph([seconds - 1 for (seconds, _) in self.extra_windows]) if self.extra_windows else None
+        self.window_writers = []
+        
+        # Max, median and percentiles of the vertex degrees, written next to every ft2 line
+        self.degree_stats_file = degree_stats_file
+        self.degree_percentiles = degree_percentiles
+        self.degree_writer = None
         
         # Tables to hold Tracking and Routing information of hashtags.
-        self.tweet_time_hashtag_graph = OrderedDict() # Track time and associating hashtags
-        self.hashtag_graph = graph.Graph() # Final graph of hashtag to hashtag
+        # Interned mode keeps every hashtag once and works on integer ids in the window and graph.
+        self.tweet_time_hashtag_graph = window.TimeWindow(self.update_interval) # Track time and associating hashtags
+        track_degrees = track_degrees or degree_stats_file is not None
+        if interned:
+            self.hashtag_table = interning.HashtagTable() # Hashtag <--> id of hashtags in the window
+            self.hashtag_graph = graph.CompactGraph(track_degrees=track_degrees) # Final graph of hashtag id to hashtag id
+        else:
+            self.hashtag_table = None
+            self.hashtag_graph = graph.Graph(track_degrees=track_degrees) # Final graph of hashtag to hashtag
         
         
         
     
     '''
         Solution of feature 2 - Hash Tag Graph
+        
+        See feed_tweet_features for checkpoint_file, checkpoint_every, resume and workers.
+    '''
+    
+    def build_hashtag_graph(self, checkpoint_file=None, checkpoint_every=100000, resume=False, workers=1):
+        feed_tweet_features(self.input_file, hashtag_graph=self, checkpoint_file=checkpoint_file,
+                            checkpoint_every=checkpoint_every, resume=resume, workers=workers)
+    
+    
+    '''
+        Open the single output handle for the whole run
+    '''
+    def open_output(self):
+        try:
+            self.writer = output.BufferedLineWriter(self.output_file, line_buffered=self.line_buffered)
+        except IOError:
+            sys.stderr.write("[build_hashtag_graph] - Error: Could not open {}".format(self.output_file))
+            sys.exit(-1)
+        if (self.trending is not None and self.trending_file is not None):
+            try:
+                self.trending_writer = output.BufferedLineWriter(self.trending_file, line_buffered=self.line_buffered)
+            except IOError:
+                sys.stderr.write("[build_hashtag_graph] - Error: Could not open {}".format(self.trending_file))
+                sys.exit(-1)
+        for (_, window_file) in self.extra_windows:
+            try:
+                self.window_writers.append(output.BufferedLineWriter(window_file, line_buffered=self.line_buffered))
+            except IOError:
+                sys.stderr.write("[build_hashtag_graph] - Error: Could not open {}".format(window_file))
+                sys.exit(-1)
+        if self.degree_stats_file is not None:
+            try:
+                self.degree_writer = output.BufferedLineWriter(self.degree_stats_file, line_buffered=self.line_buffered)
+            except IOError:
+                sys.stderr.write("[build_hashtag_graph] - Error: Could not open {}".format(self.degree_stats_file))
+                sys.exit(-1)
+        stats.watch(self.get_gauges)
+    
+    
+    '''
+        Sizes of the window and graph for stats reports
+        
+        :rtype List[tuple(str, int)]
     '''
+    def get_gauges(self):
+        (num_components, largest_component) = self.hashtag_graph_components()
+        gauges = [('window entries', len(self.tweet_time_hashtag_graph)),
+                  ('graph vertices', len(self.hashtag_graph.get_vertices())),
+                  ('graph edges', len(self.hashtag_graph.edge_counts)),
+                  ('connected components', num_components),
+                  ('largest component', largest_component),
+                  ('late tweets dropped', self.num_late_tweets_dropped)]
+        if self.reorder_buffer is not None:
+            gauges.append(('tweets awaiting reorder', len(self.reorder_buffer)))
+        if self.hashtag_table is not None:
+            gauges.append(('interned hashtags', len(self.hashtag_table)))
+        if self.hashtag_graph.degree_histogram is not None:
+            gauges.append(('max degree', self.hashtag_graph.degree_histogram.max_degree))
+        return gauges
+    
+    
+    '''
+        Snapshot of the window, graph and output for checkpoints
+        
+        Hashtags are saved as strings in both modes, so a snapshot can be
+        resumed with or without interning.
+    '''
+    def get_state(self):
+        table = self.hashtag_table
+        if table is None:
+            window_entries = list(self.tweet_time_hashtag_graph)
+            edge_counts = self.hashtag_graph.edge_counts
+        else:
+            tag = table.tag
+            window_entries = [(epoch, set(tag(tag_id) for tag_id in tag_ids))
+                              for (epoch, tag_ids) in self.tweet_time_hashtag_graph]
+            edge_counts = dict(((tag(v1), tag(v2)), count) for ((v1, v2), count) in self.hashtag_graph.iter_edge_counts())
+        
+        return {'window': window_entries,
+                'newest': self.tweet_time_hashtag_graph.newest,
+                'edge_counts': edge_counts,
+                'time_graph_last_modified': self.time_graph_last_modified,
+                'reorder_buffer': self.reorder_buffer.get_state() if self.reorder_buffer is not None else None,
+                'num_late_tweets_dropped': self.num_late_tweets_dropped,
+                'next_trending': self.next_trending,
+                'trending_output_size': self.trending_writer.size() if self.trending_writer is not None else None,
+                'multi_window': self.multi_window.get_state() if self.multi_window is not None else None,
+                'window_output_sizes': [writer.size() for writer in self.window_writers],
+                'degree_output_size': self.degree_writer.size() if self.degree_writer is not None else None,
+                'output_size': self.writer.size()}
     
-    def build_hashtag_graph(self):
+    
+    '''
+        Restore a snapshot, dropping ft2 lines written after it was taken
+    '''
+    def restore_state(self, state):
+        window_entries = state['window']
+        edge_counts = state['edge_counts']
+        
+        # Re-intern the hashtags, every edge endpoint belongs to a window entry
+        if self.hashtag_table is not None:
+            self.hashtag_table = table = interning.HashtagTable()
+            window_entries = [(epoch, table.acquire_all(tags)) for (epoch, tags) in window_entries]
+            get_id = table.get_id
+            edge_counts = dict(((get_id(v1), get_id(v2)), count) for ((v1, v2), count) in edge_counts.iteritems())
+        
+        self.tweet_time_hashtag_graph.reset(window_entries, state['newest'])
+        self.hashtag_graph.load_edge_counts(edge_counts)
+        self.time_graph_last_modified = state['time_graph_last_modified']
+        self.num_late_tweets_dropped = state.get('num_late_tweets_dropped', 0)
+        
+        # Tweets still waiting for the watermark are part of the snapshot, not of the input after it
+        if self.reorder_buffer is not None:
+            if state.get('reorder_buffer'):
+                self.reorder_buffer.restore_state(state['reorder_buffer'])
+        elif state.get('reorder_buffer') and state['reorder_buffer']['items']:
+            sys.stderr.write("[restore_state] - Error: checkpoint holds tweets waiting for reordering, resume with --lateness")
+            sys.exit(-1)
+        self.writer.truncate(state['output_size'])
         
-        # First ever tweet with 2 or more distinct hashtag timestamp
-        t1 = '' 
+        # Top counts are not saved, they follow from the window contents
+        if self.trending is not None:
+            self.trending.reset()
+            for (_, tags) in self.tweet_time_hashtag_graph:
+                self.trending.add_tweet(self.hashtag_names(tags))
+            self.next_trending = state.get('next_trending')
+            if (self.trending_writer is not None and state.get('trending_output_size') is not None):
+                self.trending_writer.truncate(state['trending_output_size'])
         
-        # Extract tweet text and timestamp with generator
-        for text_and_time in extract_tweet_text_and_timestamp(self.input_file):
-            self.text = text_and_time[0]
-            self.timestamp = text_and_time[1]
+        if self.multi_window is not None:
+            if (state.get('multi_window') is None or
+                    state['multi_window']['window_lengths'] != self.multi_window.window_lengths):
+                sys.stderr.write("[restore_state] - Error: checkpoint was taken with other --window options")
+                sys.exit(-1)
+            self.multi_window.restore_state(state['multi_window'])
+            for (writer, size) in zip(self.window_writers, state['window_output_sizes']):
+                writer.truncate(size)
+        if (self.degree_writer is not None and state.get('degree_output_size') is not None):
+            self.degree_writer.truncate(state['degree_output_size'])
+    
+    
+    '''
+        Push written lines to the output file
+    '''
+    def flush_output(self):
+        self.writer.flush()
+        if self.trending_writer is not None:
+            self.trending_writer.flush()
+        for writer in self.window_writers:
+            writer.flush()
+        if self.degree_writer is not None:
+            self.degree_writer.flush()
+    
+    
+    '''
+        Flush and close the output handle
+        
+        Tweets still held for reordering are applied first, the end of the
+        input means nothing older can arrive anymore.
+    '''
+    def close_output(self):
+        if self.reorder_buffer is not None:
+            for (tweet_epoch, tweet) in self.reorder_buffer.drain():
+                self.apply_tweet(tweet_epoch, *tweet)
+        self.writer.close()
+        if self.trending_writer is not None:
+            self.trending_writer.close()
+        for writer in self.window_writers:
+            writer.close()
+        if self.degree_writer is not None:
+            self.degree_writer.close()
+        if self.num_late_tweets_dropped:
+            print_out("{} tweets arrived after the window moved past them and were dropped".format(self.num_late_tweets_dropped))
+    
+    
+    '''
+        Process a single clean tweet
+        
+        With a lateness tolerance the tweet waits in the reorder buffer until
+        the watermark passes it, then every released tweet is applied in time
+        order. Otherwise it is applied right away.
+        
+        :type str: clean_text - tweet text as returned by the cleaner
+        :type str: time_stamp - created_at of the tweet
+        :type str: time_stamp_ms - timestamp_ms of the tweet, if any
+        :type int: tweet_epoch - epoch second of the tweet when already known
+        :type set(str): tags - hashtags of clean_text when already known
+    '''
+    def process_tweet(self, clean_text, time_stamp, time_stamp_ms=None, tweet_epoch=None, tags=None):
+        
+        # Tweets with a malformed timestamp cannot be placed in the window
+        if tweet_epoch is None:
+            tweet_epoch = tweet_time_to_epoch(time_stamp, time_stamp_ms)
+            if tweet_epoch is None:
+                return
+        
+        if self.reorder_buffer is None:
+            self.apply_tweet(tweet_epoch, clean_text, time_stamp, tags)
+        else:
+            for (released_epoch, tweet) in self.reorder_buffer.push(tweet_epoch, (clean_text, time_stamp, tags)):
+                self.apply_tweet(released_epoch, *tweet)
+    
+    
+    '''
+        Apply a single clean tweet to the window and graph
+        
+        Advances the window to the tweet time, removing expired edges, then
+        connects the hashtags of the tweet and writes the new average degree.
+        A tweet older than the window is only counted and dropped.
+        
+        :type int: tweet_epoch - epoch second of the tweet
+        :type str: clean_text - tweet text as returned by the cleaner
+        :type str: time_stamp - created_at of the tweet
+        :type set(str): tags - hashtags of clean_text when already known, e.g from the tweet cache
+    '''
+    def apply_tweet(self, tweet_epoch, clean_text, time_stamp, tags=None):
+        
+        if self.tweet_time_hashtag_graph.expired(tweet_epoch):
+            self.num_late_tweets_dropped += 1
+            return
+        self.timestamp = time_stamp
+        
+        # Every tweet moves the window forward, even without hashtags.
+        # Remove edges of all hashtags older than the window in one pass.
+        for expired_tags in self.tweet_time_hashtag_graph.evict(tweet_epoch):
+            self.time_graph_last_modified = self.timestamp
+            self.remove_hashtags_edge(list(expired_tags))
+            if self.trending is not None:
+                self.trending.remove_tweet(self.hashtag_names(expired_tags))
+            if self.hashtag_table is not None:
+                self.hashtag_table.release_all(expired_tags)
+        if self.multi_window is not None:
+            self.multi_window.advance(tweet_epoch)
+        
+        # Top list of the window as of this second, before the tweet itself
+        if (self.trending_writer is not None and (self.next_trending is None or tweet_epoch >= self.next_trending)):
+            if self.next_trending is not None:
+                self.write_trending()
+            self.next_trending = tweet_epoch + self.trending_interval
+        
+        # tweet was composed of non basic latin chars or has no hashtags
+        if not clean_text or (r'#' not in clean_text):
+            return
+        
+        # Retrieve hashtags in tweet
+        self.text = clean_text
+        self.set_of_tags = self.get_hashtags() if tags is None else tags
+        
+        # No need to proceed if the hashtags no valid has tag was retrieved
+        # Update hashtag graph, creating edges for 2 or more distinct tags 
+        if (len(self.set_of_tags) > 1):
+            
+            # Track time of creating the hashtags.
+            # In sorted order, so the window and graph never depend on set iteration order.
+            tags = sorted(self.set_of_tags)
+            if self.hashtag_table is not None:
+                tags = self.hashtag_table.acquire_all(tags)
+            self.tweet_time_hashtag_graph.add(tweet_epoch, tags)
+            self.time_graph_last_modified = self.timestamp
+            if self.trending is not None:
+                self.trending.add_tweet(self.set_of_tags)
+            
+            # Create edges between every pair of hashtags
+            self.update_graph(list(tags))
+            
+            # Calculate Average Degree and Write to file
+            avg_deg = self.hashtag_graph_average_degrees()
+            self.writer.write_line("{}".format(avg_deg))
+            if self.degree_writer is not None:
+                self.write_degree_stats()
+            
+            # Same for every extra window
+            if self.multi_window is not None:
+                self.multi_window.add_tweet(tweet_epoch, self.set_of_tags)
+                for (writer, window_avg_deg) in zip(self.window_writers, self.multi_window.get_average_degrees()):
+                    writer.write_line("{}".format(round(window_avg_deg, 2)))
+                        
+    
+    '''
+        Helper function: Hashtags of a window entry, which holds ids in interned mode
+    '''
+    def hashtag_names(self, tags):
+        if self.hashtag_table is None:
+            return tags
+        return [self.hashtag_table.tag(tag_id) for tag_id in tags]
+    
+    
+    '''
+        Write the top hashtags and pairs of the window as one JSON line
+        
+        {"created_at": <tweet time>, "hashtags": [[tag, count] ...], "pairs": [[tag, tag, count] ...]}
+        Counts are estimates in count-min sketch mode.
+    '''
+    def write_trending(self):
+        (top_hashtags, top_pairs) = self.trending.top()
+        self.trending_writer.write_line(simplejson.dumps({
+            'created_at': self.timestamp,
+            'hashtags': [[tag, count] for (tag, count) in top_hashtags],
+            'pairs': [[tag1, tag2, count] for ((tag1, tag2), count) in top_pairs]}))
 
-            # Proceed only with non basic latin characters
-            self.text = remove_non_basic_latin_chars(self.text)
 
-            # tweet was composed of non basic latin chars
-            if not self.text:
-                continue
+    '''
+        Write the degree distribution of the graph as one JSON line, one per ft2 line
 
-            # Clean out text
-            self.text, has_unicode = clean_string(self.text)
-            self.text = self.text.strip()
+        {"max": <degree>, "median": <degree>, "p90": <degree> ...}
+        Each rank costs O(log max degree), see degrees.DegreeHistogram.
+    '''
+    def write_degree_stats(self):
+        self.degree_writer.write_line(simplejson.dumps(self.get_degree_stats(), sort_keys=True))
+
+
+    '''
+        Max, median and percentiles of the vertex degrees
+    '''
+    def get_degree_stats(self):
+        histogram = self.hashtag_graph.degree_histogram
+        degree_stats = {'max': histogram.max_degree, 'median': histogram.median()}
+        for percent in self.degree_percentiles:
+            degree_stats['p{:g}'.format(percent)] = histogram.percentile(percent)
+        return degree_stats
 
-            # Sanity Check on timestamp
-            self.timestamp, _ = clean_string(self.timestamp)
-        
-            # Retrieve hashtags if any in tweet
-            if (r'#' in self.text):
-                self.set_of_tags = self.get_hashtags()
-            else:
-                continue # No hashtags
 
-            # No need to proceed if the hashtags no valid has tag was retrieved
-            # Update hashtag graph, creating edges for 2 or more distinct tags 
-            if (len(self.set_of_tags) > 1):
-                
-                # Track time of creating the hashtags
-                self.tweet_time_hashtag_graph[self.timestamp] = self.set_of_tags
-                all_times = self.tweet_time_hashtag_graph.keys()
-                
-                if not t1: # Assign only once.
-                    t1 = all_times[0]
-                    self.time_graph_last_modified = t1 
-                t2 = self.timestamp
-                
-                # Create all permutations of edges
-                self.update_graph(list(self.set_of_tags), False)
-                self.update_graph(list(self.set_of_tags), True)
-                
-                # Check if time window has elaspsed.
-                # remove edges of first hashtags in tweet_time_hashtag_graph map
-                if (self.hashtag_time_window_elapsed((t1, t2))):
-                    self.time_graph_last_modified = t2
-                    self.remove_hashtags_edge(self.tweet_time_hashtag_graph[t1])
-                    
-                
-                # Calculate Average Degree and Write to file
-                avg_deg = self.hashtag_graph_average_degrees()
-                try:
-                    with open(self.output_file, 'a') as f:
-                        f.write("{}\n".format(avg_deg))
-                except IOError:
-                    sys.stderr.write("[build_hashtag_graph] - Error: Could not open {}".format(output_file))
-                    sys.exit(-1)
-                        
-    
     '''
         Helper function: Update graph from a list of vertices tha define a sub-graph.
         
-        Queue the vertices and create a edge from a vertex to the next in line using
-        queue rotatations.
-        Rotate queue clockwise, so 1st --> last, 2nd --> 1st, 3rd --> 2nd ...
+        Every pair of distinct hashtags in a tweet is connected once, so each
+        tweet contributes one count to each of its edges.
         
         If hashtags are #Apache, #Hadoop, #Storm, 
-        we must create the following permutations(order matters) of edges:
+        we must create the following edges:
         
             1. #Apache -- #Hadoop
-            2. #Hadoop -- #Storm
-            3. #Storm -- #Apache
-            4. #Storm -- #Hadoop
-            5. #Hadoop -- #Apache
-            6. #Apache -- #Storm
+            2. #Apache -- #Storm
+            3. #Hadoop -- #Storm
         
         
         :type List[str]: list_of_vertices 
-        :type reverse: boolean - reverse list to create second set of edge combinations
-        :type direction to rotate list (-n ==> n steps to left, n ==> n steps to right) : int
     '''
-    def update_graph(self, list_of_vertices, reverse, dir=-1):
+    def update_graph(self, list_of_vertices):
         if (len(list_of_vertices) < 2):
             return
         
-        # For second set of edge permuations from list
-        if (reverse):
-            list_of_vertices.reverse()
-            
-        q = deque(list_of_vertices)
-        
         # Add vertices and edges.
-        for _ in xrange(len(list_of_vertices)):
-            self.hashtag_graph.add_vertex(q[0]) # Add vertex into graph
-            self.hashtag_graph.add_edge((q[0], q[1])) # Create edge between both vertex
-            q.rotate(dir)
-        # Clean up
-        q.clear()
+        add_edge = self.hashtag_graph.add_edge
+        for edge in combinations(list_of_vertices, 2):
+            add_edge(edge)
         
     
     '''
@@ -378,23 +1308,38 @@ class InsightChallengeSolution(object):
         Find path between two hashtags in graph to enable path deletion
     '''
     def find_hashtag_path(self, st, en):
-        return self.hashtag_graph.find_path(st, en)
+        table = self.hashtag_table
+        if table is None:
+            return self.hashtag_graph.find_path(st, en)
+        
+        (st_id, en_id) = (table.get_id(st), table.get_id(en))
+        if (st_id is None or en_id is None):
+            return None
+        path = self.hashtag_graph.find_path(st_id, en_id)
+        return [table.tag(tag_id) for tag_id in path] if path else None
+    
+    
+    '''
+        Connected components of the hashtag graph of the current window
+        
+        :rtype tuple(int, int) - number of components, size of the largest one
+    '''
+    def hashtag_graph_components(self):
+        return self.hashtag_graph.get_component_stats()
     
     '''
         Remove edges between hashtags
+        
+        Drops this tweet's contribution to each edge, the edge itself only
+        goes away when no other live tweet carries it.
     '''
-    def remove_hashtags_edge(self, list_of_vertices, dir=-1):
+    def remove_hashtags_edge(self, list_of_vertices):
         if (len(list_of_vertices) < 2):
             return
             
-        q = deque(list_of_vertices)
-        
-        for _ in xrange(len(list_of_vertices)):
-            self.hashtag_graph.remove_edge((q[0], q[1]))
-            q.rotate(dir)
-        
-        # Clean up
-        q.clear()
+        remove_edge = self.hashtag_graph.remove_edge
+        for edge in combinations(list_of_vertices, 2):
+            remove_edge(edge)
     
     
     '''
@@ -404,7 +1349,7 @@ class InsightChallengeSolution(object):
     
     def get_hashtags(self):
         #Fetch and clean hashtags from tweet
-        return set([re.sub(r"#+", "#", k) for k in set([re.sub(r"(\W+)$", "", j, flags = re.UNICODE) for j in set([i for i in self.text.split() if i.startswith("#")])])])
+        return extract_hashtags(self.text)
 
     
     
@@ -418,20 +1363,6 @@ class InsightChallengeSolution(object):
         return self.timestamp.strip().split()[3].split(':')
     
     
-    '''
-        Function that returns date time format from tweet format
-        
-        :type str: Tweet time string
-        :rytpe: datetime object
-    '''
-    def format_tweettime_to_datetime(self, time_str):
-        time_arr = time_str.strip().split()
-        temp = time_arr[1:3]
-        temp.append(time_arr[-1])
-        temp.append(time_arr[3])
-        return ' '.join(temp)
-   
-
     '''
         Function that calculates if time window is elaspsed
         
@@ -441,18 +1372,14 @@ class InsightChallengeSolution(object):
     def hashtag_time_window_elapsed(self, timestamps):
         (t1, t2) = tuple(timestamps)
         
-        # Times didn't have only digits
-        if (not t1 or not t2):
-            return
+        t1 = tweet_time_to_epoch(t1)
+        t2 = tweet_time_to_epoch(t2)
         
-        t1 = self.format_tweettime_to_datetime(t1)
-        t2 = self.format_tweettime_to_datetime(t2)
+        # Times could not be parsed
+        if (t1 is None or t2 is None):
+            return False
         
-        dt1 = datetime.strptime(t1, '%b %d %Y %H:%M:%S')
-        dt2 = datetime.strptime(t2, '%b %d %Y %H:%M:%S')
-        if ((dt1 - dt2).seconds >= self.update_interval):
-            return True
-        return False
+        return abs(t2 - t1) > self.update_interval
     
     
     '''
@@ -462,6 +1389,44 @@ class InsightChallengeSolution(object):
         print self.hashtag_graph
     
     
+    '''
+        Function that streams the edges of the current window graph to a file
+        
+        :type str: filename
+        :type str: export_format - 'csv' for an edge list, 'binary' for the compact format of edgeexport
+        :rtype int - number of edges written
+    '''
+    def export_hashtag_graph(self, filename, export_format='csv'):
+        name = self.hashtag_table.tag if self.hashtag_table is not None else None
+        try:
+            with open(filename, 'wb') as f:
+                if (export_format == 'binary'):
+                    return edgeexport.write_edges_binary(self.hashtag_graph, f, name)
+                return edgeexport.write_edges_csv(self.hashtag_graph, f, name)
+        except IOError:
+            sys.stderr.write("[export_hashtag_graph] - Error: Could not write {}".format(filename))
+            sys.exit(-1)
+    
+    
+    '''
+        Function that writes the degree distribution of the current window graph to a file
+        
+        One JSON object, the fields of a --degree-stats line plus every non empty bucket:
+        {"histogram": [[degree, vertices] ...], "max": <degree>, "median": <degree>, "p90": <degree> ...}
+        
+        :type str: filename
+    '''
+    def export_degree_histogram(self, filename):
+        degree_stats = self.get_degree_stats()
+        degree_stats['histogram'] = self.hashtag_graph.degree_histogram.histogram()
+        try:
+            with open(filename, 'wb') as f:
+                f.write(simplejson.dumps(degree_stats, sort_keys=True) + '\n')
+        except IOError:
+            sys.stderr.write("[export_degree_histogram] - Error: Could not write {}".format(filename))
+            sys.exit(-1)
+    
+    
     '''
         Function converts string array to int array
         
@@ -477,23 +1442,142 @@ class InsightChallengeSolution(object):
 if __name__ == '__main__':
     
     file_dir = os.path.dirname(os.path.realpath('__file__'))
-    input_file = file_dir + '/data-gen/tweets.txt'
-    output_file = file_dir + '/tweet_output/ft1.txt'
-    output_file2 = file_dir + '/tweet_output/ft2.txt'
     
+    parser = argparse.ArgumentParser(description='Insight coding challenge: clean tweets and rolling hashtag graph degree')
+    parser.add_argument('input_file', nargs='?', default=file_dir + '/data-gen/tweets.txt')
+    parser.add_argument('output_file', nargs='?', default=file_dir + '/tweet_output/ft1.txt')
+    parser.add_argument('output_file2', nargs='?', default=file_dir + '/tweet_output/ft2.txt')
+    parser.add_argument('--no-feature1', dest='feature1', action='store_false', help='skip feature 1 (clean tweets)')
+    parser.add_argument('--no-feature2', dest='feature2', action='store_false', help='skip feature 2 (hashtag graph)')
+    parser.add_argument('--line-buffered', action='store_true', help='flush output files after every line')
+    parser.add_argument('--workers', type=int, default=1, help='worker processes parsing the input for both features, 0 for one per core')
+    parser.add_argument('--lines', dest='line_range', metavar='START:STOP', help='only process input lines START to STOP-1')
+    parser.add_argument('--from-byte', dest='start_offset', type=int, help='only process input lines from this byte offset on')
+    parser.add_argument('--checkpoint', dest='checkpoint_file', help='save periodic snapshots of the run to this file')
+    parser.add_argument('--checkpoint-every', type=int, default=100000, help='tweets between two snapshots')
+    parser.add_argument('--resume', action='store_true', help='continue from the latest snapshot in --checkpoint')
+    parser.add_argument('--follow', action='store_true', help='keep processing tweets as they are appended to the input')
+    parser.add_argument('--poll-interval', type=float, default=0.05, help='seconds between polls of a followed input')
+    parser.add_argument('--idle-timeout', type=float, help='stop following after this many seconds without new data')
+    parser.add_argument('--interned', action='store_true', help='keep hashtags as integer ids in a compact graph for feature 2')
+    parser.add_argument('--lateness', type=int, default=0, help='seconds a tweet may arrive out of order and still be reordered')
+    parser.add_argument('--serve', metavar='ADDRESS', help='read tweets from producers on HOST:PORT or unix:PATH instead of the input file')
+    parser.add_argument('--max-pending', type=int, default=1024, help='unanswered replies after which a producer is no longer read')
+    parser.add_argument('--export-graph', metavar='FILE', help='save the edges of the final window graph to FILE')
+    parser.add_argument('--export-format', choices=('csv', 'binary'), default='csv', help='format of --export-graph')
+    parser.add_argument('--trending', dest='trending_file', metavar='FILE', help='write the top hashtags and pairs of the window to FILE')
+    parser.add_argument('--top-k', type=int, default=10, help='hashtags and pairs listed in --trending')
+    parser.add_argument('--trending-interval', type=int, default=60, help='seconds of tweet time between two --trending lines')
+    parser.add_argument('--sketch-width', type=int, default=0, help='count --trending in a count-min sketch of this width, 0 for exact counts')
+    parser.add_argument('--sketch-depth', type=int, default=4, help='rows of the --sketch-width sketch')
+    parser.add_argument('--window', dest='windows', action='append', default=[], metavar='SECONDS:FILE',
+                        help='also write the rolling average degree of a SECONDS long window to FILE, repeatable')
+    parser.add_argument('--degree-stats', dest='degree_stats_file', metavar='FILE',
+                        help='write the max, median and percentiles of the vertex degrees to FILE with every ft2 line')
+    parser.add_argument('--degree-percentiles', default='90,99', metavar='P,P...', help='percentiles listed in --degree-stats')
+    parser.add_argument('--degree-histogram', dest='degree_histogram_file', metavar='FILE',
+                        help='save the degree histogram of the final window graph to FILE')
+    parser.add_argument('--build-cache', action='store_true',
+                        help='first convert the input into a pre-parsed tweet cache (INPUT.cache) that later runs read instead of the JSON')
+    parser.add_argument('--no-cache', dest='use_cache', action='store_false', help='read the JSON input even when its tweet cache is up to date')
+    parser.add_argument('--stats', action='store_true', help='time every stage and print a report to stderr at exit')
+    parser.add_argument('--stats-interval', type=float, help='also print a stats report every this many seconds')
+    parser.add_argument('--profile', metavar='FILE', help='run under cProfile and save the profile (pstats format) to FILE')
+    args = parser.parse_args()
+    
+    line_range = None
+    if args.line_range is not None:
+        try:
+            line_range = tuple(int(n) if n else None for n in args.line_range.split(':'))
+        except ValueError:
+            line_range = ()
+        if (len(line_range) != 2):
+            parser.error('--lines expects START:STOP')
+    if (args.workers != 1 and (line_range is not None or args.start_offset is not None or args.checkpoint_file or args.follow)):
+        parser.error('--lines, --from-byte, --checkpoint and --follow only apply to a single worker run')
+    input_compressed = (os.path.isfile(args.input_file) and compressed.detect_compression(args.input_file))
+    if (args.follow and input_compressed):
+        parser.error('--follow needs a plain input file')
+    if (args.follow and args.build_cache):
+        parser.error('--build-cache needs a complete input, not a followed one')
+    if (input_compressed and line_range is not None and any(n is not None and n < 0 for n in line_range)):
+        parser.error('--lines on a compressed input only takes non negative line numbers')
+    if (args.follow and line_range is not None):
+        parser.error('--follow reads to the end of the input, use --from-byte instead of --lines')
+    if (args.checkpoint_file and line_range is not None):
+        parser.error('--checkpoint reads the input by offset, use --from-byte instead of --lines')
+    if (args.resume and not args.checkpoint_file):
+        parser.error('--resume needs --checkpoint')
+    if (args.lateness < 0):
+        parser.error('--lateness must not be negative')
+    if (args.checkpoint_every < 1):
+        parser.error('--checkpoint-every must be positive')
     
-    print_out("Starting Feature 1")
-    process_tweets(input_file, output_file)
-    print_out("Done with Feature 1")
+    if args.serve:
+        if (args.workers != 1 or line_range is not None or args.start_offset is not None or
+                args.checkpoint_file or args.follow or args.build_cache or not args.feature2):
+            parser.error('--serve only combines with --no-feature1, --line-buffered, --interned, --lateness, --export-graph, --trending, --window, --degree-stats and --degree-histogram')
+    if (args.top_k < 1 or args.trending_interval < 1 or args.sketch_width < 0 or args.sketch_depth < 1):
+        parser.error('--top-k, --trending-interval and --sketch-depth must be positive, --sketch-width not negative')
+    if (args.stats_interval is not None and args.stats_interval <= 0):
+        parser.error('--stats-interval must be positive')
     
-    # Solution to feature 2
-    print_out("Starting Feature 2")
-    solution_2 = InsightChallengeSolution(input_file, output_file2)
-    solution_2.build_hashtag_graph()
-    print_out("Done with Feature 2")
+    trending = topk.TrendingTopK(args.top_k, args.sketch_width, args.sketch_depth) if args.trending_file else None
     
+    extra_windows = []
+    for window_option in args.windows:
+        (seconds, _, window_file) = window_option.partition(':')
+        if (not seconds.isdigit() or int(seconds) < 1 or not window_file):
+            parser.error('--window expects SECONDS:FILE')
+        extra_windows.append((int(seconds), window_file))
+    if (len(set(seconds for (seconds, _) in extra_windows)) != len(extra_windows)):
+        parser.error('--window lengths must differ')
+    if (len(extra_windows) > multiwindow.MAX_WINDOWS):
+        parser.error('at most {} --window options'.format(multiwindow.MAX_WINDOWS))
+    
+    try:
+        degree_percentiles = tuple(float(p) for p in args.degree_percentiles.split(',') if p)
+    except ValueError:
+        degree_percentiles = None
+    if (degree_percentiles is None or not all(0 < p <= 100 for p in degree_percentiles)):
+        parser.error('--degree-percentiles expects comma separated percents in (0, 100]')
+    
+    if (args.stats or args.stats_interval is not None):
+        enable_stats(args.stats_interval)
+    profile = cProfile.Profile() if args.profile else None
+    if profile is not None:
+        profile.enable()
+    
+    if args.serve:
+        serve_tweet_features(args.serve, args.output_file, args.output_file2, feature1=args.feature1,
+                             line_buffered=args.line_buffered, interned=args.interned, lateness=args.lateness,
+                             max_pending=args.max_pending, export_graph=args.export_graph,
+                             export_format=args.export_format, trending=trending, trending_file=args.trending_file,
+                             trending_interval=args.trending_interval, extra_windows=extra_windows,
+                             degree_stats_file=args.degree_stats_file, degree_percentiles=degree_percentiles,
+                             degree_histogram_file=args.degree_histogram_file)
+    else:
+        # Solution to feature 1 and 2 in a single pass over the input
+        print_out("Starting Features")
+        process_tweet_features(args.input_file, args.output_file, args.output_file2,
+                               feature1=args.feature1, feature2=args.feature2,
+                               line_buffered=args.line_buffered, workers=args.workers or None,
+                               line_range=line_range, start_offset=args.start_offset,
+                               checkpoint_file=args.checkpoint_file, checkpoint_every=args.checkpoint_every,
+                               resume=args.resume, follow=args.follow, poll_interval=args.poll_interval,
+                               idle_timeout=args.idle_timeout, interned=args.interned,
+                               lateness=args.lateness, export_graph=args.export_graph,
+                               export_format=args.export_format, trending=trending,
+                               trending_file=args.trending_file, trending_interval=args.trending_interval,
+                               extra_windows=extra_windows, degree_stats_file=args.degree_stats_file,
+                               degree_percentiles=degree_percentiles,
+                               degree_histogram_file=args.degree_histogram_file, use_cache=args.use_cache,
+                               build_cache=args.build_cache)
+        print_out("Done with Features")
     
-    # For Debugging do not uncomment unless needed.
-    #solution_2.display_hashtag_graph()
+    if profile is not None:
+        profile.disable()
+        profile.dump_stats(args.profile)
+    report_stats()
     
-    print_out("Done. OK!")
\ No newline at end of file
+    print_out("Done. OK!")
@@ -0,0 +1,101 @@
+'''
+    Tests of checkpoint and resume: a run interrupted mid input and resumed
+    from its latest snapshot writes exactly the outputs of an uninterrupted
+    run, for every feature 2 option that keeps state between tweets. Outputs
+    are line buffered, so lines written after the last snapshot are on disk
+    when the run stops and have to be cut back on resume.
+'''
+
+from tests.tweetdata import TempDirTestCase
+
+import solution
+from helper_modules import topk
+
+OUTPUTS = ('1', '2', '.trending', '.window300', '.window3600', '.degrees')
+
+
+class CheckpointTest(TempDirTestCase):
+
+    '''
+        Helper Function: Options of a run writing every output under prefix
+    '''
+    def options(self, prefix, trending=False, windows=False, degrees=False, **options):
+        if trending:
+            options.update(trending=topk.TrendingTopK(3), trending_file=self.path(prefix + '.trending'), trending_interval=30)
+        if windows:
+            options['extra_windows'] = [(300, self.path(prefix + '.window300')), (3600, self.path(prefix + '.window3600'))]
+        if degrees:
+            options['degree_stats_file'] = self.path(prefix + '.degrees')
+        return options
+
+
+    '''
+        Helper Function: Runs both features with a checkpoint, stopping with a KeyboardInterrupt after interrupt_after tweets
+    '''
+    def run_features(self, input_file, prefix, interrupt_after=None, checkpoint=None, **options):
+        feed_tweet = solution.feed_tweet
+        if interrupt_after is not None:
+            fed = [0]
+            def interrupted_feed_tweet(*args):
+                fed[0] += 1
+                if (fed[0] > interrupt_after):
+                    raise KeyboardInterrupt()
+                return feed_tweet(*args)
+            solution.feed_tweet = interrupted_feed_tweet
+        try:
+            solution.process_tweet_features(input_file, self.path(prefix + '1'), self.path(prefix + '2'),
+                                            checkpoint_file=self.path(checkpoint or prefix + '.checkpoint'),
+                                            checkpoint_every=97, use_cache=False, line_buffered=True,
+                                            **self.options(prefix, **options))
+        finally:
+            solution.feed_tweet = feed_tweet
+
+
+    '''
+        Helper Function: Contents of every output written under prefix
+    '''
+    def outputs(self, prefix):
+        return dict((name, self.read(prefix + name)) for name in OUTPUTS)
+
+
+    '''
+        Helper Function: Interrupts a run twice, resumes it to the end and compares it with a straight run
+    '''
+    def check_resume(self, resumed_options=None, **options):
+        input_file = self.corpus()
+        self.run_features(input_file, 'straight', **options)
+        self.assertRaises(KeyboardInterrupt, self.run_features, input_file, 'resumed', interrupt_after=450, **options)
+        resumed_options = dict(options, **(resumed_options or {}))
+        self.assertRaises(KeyboardInterrupt, self.run_features, input_file, 'resumed', interrupt_after=500,
+                          resume=True, **resumed_options)
+        self.run_features(input_file, 'resumed', resume=True, **resumed_options)
+        expected = self.outputs('straight')
+        self.assertTrue(expected['2'])
+        self.assertSameOutputs(self.outputs('resumed'), expected)
+
+
+    def test_resume(self):
+        self.check_resume()
+
+
+    def test_resume_interned(self):
+        self.check_resume(interned=True)
+
+
+    def test_resume_interned_from_plain_snapshot(self):
+        self.check_resume(resumed_options={'interned': True})
+
+
+    def test_resume_with_reordering(self):
+        self.check_resume(lateness=5)
+
+
+    def test_resume_every_output(self):
+        self.check_resume(interned=True, lateness=3, trending=True, windows=True, degrees=True)
+
+
+    def test_resume_without_snapshot_starts_over(self):
+        input_file = self.corpus(num_tweets=300)
+        self.run_features(input_file, 'straight')
+        self.run_features(input_file, 'resumed', resume=True)
+        self.assertSameOutputs(self.outputs('resumed'), self.outputs('straight'))
@@ -0,0 +1,105 @@
+# -*- coding: UTF-8 -*-
+
+'''
+    Tests of the tweet cleaner against the original clean_string: the same
+    clean texts on the seeded corpus and on texts full of backslashes,
+    escaped whitespace and unicode escapes, apart from the behavior changes
+    made on purpose, which are pinned in ft1 output of their own.
+'''
+
+import re, string
+import simplejson
+
+from tests.tweetdata import TempDirTestCase, created_at, tweet_line, FIRST_EPOCH
+
+import solution
+from helper_modules import cleaner
+
+
+'''
+    Helper Function: The original feature 1 cleaning, remove_non_basic_latin_chars then clean_string then strip
+
+    :rtype tuple(str, boolean) - clean text, True if the old unicode pattern matched
+'''
+def original_clean(text):
+    text = ''.join([c for c in text if ord(c) in xrange(32, 128)])
+    if not text:
+        return ('', False)
+    text = text.replace("\\", "\\\\")
+    text = solution.to_unicode(text)
+    has_unicode = bool(re.search(re.compile(u'(\\u[0-9A-Fa-f]+)'), text))
+    if has_unicode:
+        text = solution.to_unicode(re.sub(r'(\\u[0-9A-Fa-f]+)', '', solution.to_str(text)))
+    text = ' '.join(text.strip().split())
+    text = text.replace("\\", "")
+    return solution.to_str(text).strip(), has_unicode
+
+
+# Behavior change 1: whitespace escapes were deleted, gluing words, they are now a space
+WHITESPACE_AS_SPACE = dict((ord(c), u' ') for c in string.whitespace)
+
+BACKSLASH_TEXTS = (
+    u'a\\b path\\to',
+    u'C:\\Users\\me \\ lone backslash',
+    u'ends with \\',
+    u'\\\\double\\\\ and \\/slash',
+    u'typed escape \\u2764 and \\uface\\u00e9x #tag\\u0041',
+    u'\\\\u2764 escaped escape',
+    u'real escapes \u2764 caf\xe9 and typed \\u2764',
+    u'line\nbreak\ttab\r\nend \\n literal',
+    u'\\ \\ \\',
+    u'#hash\\tag #other',
+    u'\x1e\x07 control \x1f chars\x7f',
+)
+
+
+class CleanerTest(TempDirTestCase):
+
+    '''
+        Helper Function: Texts of every tweet of the seeded corpus, followed by BACKSLASH_TEXTS
+    '''
+    def corpus_texts(self):
+        texts = []
+        with open(self.corpus()) as corpus:
+            for line in corpus:
+                if line.strip():
+                    tweet = simplejson.loads(line)
+                    if 'text' in tweet:
+                        texts.append(tweet['text'])
+        return texts + list(BACKSLASH_TEXTS)
+
+
+    def test_matches_original_clean_string(self):
+        texts = self.corpus_texts()
+        cleaned = [cleaner.clean_text(text) for text in texts]
+        self.assertEqual(cleaner.clean_texts(texts), cleaned)
+        for (text, (clean_text, has_unicode)) in zip(texts, cleaned):
+            self.assertEqual(clean_text, original_clean(solution.to_unicode(text).translate(WHITESPACE_AS_SPACE))[0], repr(text))
+            # Behavior change 2: only real non-ASCII characters count as unicode
+            self.assertEqual(has_unicode, any(ord(c) > 127 for c in text), repr(text))
+
+
+    def test_backslashes_deleted(self):
+        self.assertEqual(cleaner.clean_text(u'a\\b path\\to'), ('ab pathto', False))
+        self.assertEqual(cleaner.clean_text(u'one \\ two'), ('one  two', False))
+        self.assertEqual(cleaner.clean_text(u'typed \\u2764 heart'), ('typed  heart', False))
+        self.assertEqual(cleaner.clean_text('raw \\/ bytes\xe2\x9d\xa4'), ('raw / bytes', True))
+
+
+    def test_intended_ft1_output(self):
+        input_file = self.path('changes.txt')
+        tweets = (u'glued\nno more\tnow',    # Change 1: whitespace escapes become a space
+                  u'cube face added',         # Change 2: no unicode, though the old pattern matched u + hex
+                  u'caf\xe9 au lait',
+                  u'\u2764\u2764',            # Change 3: only unicode, counted but not written
+                  u'path\\to \\u2764 file')
+        with open(input_file, 'wb') as f:
+            for (n, text) in enumerate(tweets):
+                f.write(tweet_line(text, created_at(FIRST_EPOCH + n)) + '\n')
+        solution.process_tweets(input_file, self.path('ft1.txt'))
+        self.assertEqual(self.read('ft1.txt').splitlines(), [
+            'glued no more now (timestamp: Thu Oct 29 17:51:01 +0000 2015)',
+            'cube face added (timestamp: Thu Oct 29 17:51:02 +0000 2015)',
+            'caf au lait (timestamp: Thu Oct 29 17:51:03 +0000 2015)',
+            'pathto  file (timestamp: Thu Oct 29 17:51:05 +0000 2015)',
+            '2 tweets contained unicode.'])
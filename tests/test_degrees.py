@@ -0,0 +1,89 @@
+'''
+    Tests of the incremental degree distribution against sorted degree lists,
+    on its own and as kept up to date by both graphs.
+'''
+
+import math, random, unittest
+
+import tests.tweetdata # Puts the repository on the path
+from helper_modules import degrees, graph
+
+
+'''
+    Helper Function: Max, median and percentiles of a list of degrees, the brute force way
+'''
+def sorted_stats(vertex_degrees, percents):
+    ordered = sorted(degree for degree in vertex_degrees if degree)
+    n = len(ordered)
+    if not n:
+        return 0, 0.0, [0 for _ in percents]
+    median = (ordered[(n - 1) // 2] + ordered[n // 2]) / 2.0
+    return ordered[-1], median, [ordered[max(1, int(math.ceil(p * n / 100.0))) - 1] for p in percents]
+
+
+PERCENTS = (1, 25, 50, 90, 99, 99.9, 100)
+
+
+class DegreeHistogramTest(unittest.TestCase):
+
+    '''
+        Helper Function: Checks every query of histogram against the degrees of the vertices
+    '''
+    def check(self, histogram, vertex_degrees):
+        (max_degree, median, percentiles) = sorted_stats(vertex_degrees, PERCENTS)
+        self.assertEqual(histogram.max_degree, max_degree)
+        self.assertEqual(histogram.median(), median)
+        self.assertEqual([histogram.percentile(p) for p in PERCENTS], percentiles)
+        buckets = {}
+        for degree in vertex_degrees:
+            if degree:
+                buckets[degree] = buckets.get(degree, 0) + 1
+        self.assertEqual(histogram.histogram(), sorted(buckets.items()))
+
+
+    def test_random_walk_matches_sorted_degrees(self):
+        rng = random.Random(5)
+        histogram = degrees.DegreeHistogram()
+        vertex_degrees = [0] * 60
+        for step in xrange(20000):
+            vertex = rng.randrange(len(vertex_degrees))
+            # Biased up at first so degrees outgrow the initial buckets, then down to empty
+            if (vertex_degrees[vertex] and rng.random() < (0.35 if step < 12000 else 0.9)):
+                histogram.decrement(vertex_degrees[vertex])
+                vertex_degrees[vertex] -= 1
+            elif (step < 12000):
+                histogram.increment(vertex_degrees[vertex])
+                vertex_degrees[vertex] += 1
+            if (step % 50 == 0):
+                self.check(histogram, vertex_degrees)
+        self.assertTrue(len(histogram.counts) > degrees.INITIAL_SIZE)
+        self.check(histogram, vertex_degrees)
+
+
+    def test_rank_out_of_range(self):
+        histogram = degrees.DegreeHistogram()
+        self.assertEqual((histogram.median(), histogram.percentile(50), histogram.degree_at_rank(1)), (0.0, 0, 0))
+        histogram.increment(0)
+        self.assertEqual((histogram.degree_at_rank(1), histogram.degree_at_rank(2)), (1, 0))
+
+
+    def test_graphs_track_degrees(self):
+        rng = random.Random(6)
+        for graph_class in (graph.Graph, graph.CompactGraph):
+            hashtag_graph = graph_class(track_degrees=True)
+            live_edges = []
+            for step in xrange(6000):
+                if (live_edges and rng.random() < 0.4):
+                    hashtag_graph.remove_edge(live_edges.pop(rng.randrange(len(live_edges))))
+                else:
+                    edge = (rng.randrange(40), rng.randrange(40))
+                    live_edges.append(edge)
+                    hashtag_graph.add_edge(edge)
+                if (step % 100 == 0):
+                    self.check(hashtag_graph.degree_histogram,
+                               [len(hashtag_graph.neighbors(vertex)) for vertex in hashtag_graph.get_vertices()])
+
+            # Rebuilt from edge counts, e.g on resume
+            rebuilt = graph_class(track_degrees=True)
+            rebuilt.load_edge_counts(dict(hashtag_graph.iter_edge_counts()))
+            self.assertEqual(rebuilt.degree_histogram.histogram(), hashtag_graph.degree_histogram.histogram())
@@ -0,0 +1,86 @@
+'''
+    Tests of the edge list export: CSV and binary exports read back to the
+    edges and counts of the graph, written to files or to in-memory
+    handles, and an interned window graph exports the hashtags of the plain
+    one.
+'''
+
+import csv, random
+from cStringIO import StringIO
+from io import BytesIO
+
+from tests.tweetdata import TempDirTestCase
+
+import solution
+from helper_modules import edgeexport, graph
+
+
+'''
+    Helper Function: A graph with repeated edges, so counts go above one, and more edges than one binary write
+'''
+def random_graph(graph_class, seed=9):
+    rng = random.Random(seed)
+    hashtag_graph = graph_class()
+    for _ in xrange(3 * edgeexport.EDGES_PER_WRITE):
+        hashtag_graph.add_edge((rng.randrange(400), rng.randrange(400)))
+    return hashtag_graph
+
+
+'''
+    Helper Function: Edges of a graph as a set of (source, target, count), vertices named by name
+'''
+def edge_set(hashtag_graph, name=str):
+    return set((name(v1), name(v2), count) for ((v1, v2), count) in hashtag_graph.iter_edge_counts())
+
+
+class EdgeExportTest(TempDirTestCase):
+
+    def test_binary_round_trip(self):
+        for graph_class in (graph.Graph, graph.CompactGraph):
+            hashtag_graph = random_graph(graph_class)
+            expected = edge_set(hashtag_graph)
+            self.assertTrue(max(count for (_, _, count) in expected) > 1)
+            self.assertEqual(set(hashtag_graph.iter_edges()),
+                             set(edge for (edge, _) in hashtag_graph.iter_edge_counts()))
+            for handle in (BytesIO(), StringIO()):
+                num_edges = edgeexport.write_edges_binary(hashtag_graph, handle)
+                self.assertEqual(num_edges, len(expected))
+                handle.seek(0)
+                edges = list(edgeexport.read_edges_binary(handle))
+                self.assertEqual(len(edges), num_edges)
+                self.assertEqual(set(edges), expected)
+
+
+    def test_truncated_binary_export(self):
+        handle = BytesIO()
+        edgeexport.write_edges_binary(random_graph(graph.Graph), handle)
+        truncated = BytesIO(handle.getvalue()[:-5])
+        self.assertRaises(ValueError, list, edgeexport.read_edges_binary(truncated))
+        self.assertRaises(ValueError, list, edgeexport.read_edges_binary(BytesIO('not an export')))
+
+
+    def test_csv_round_trip(self):
+        hashtag_graph = random_graph(graph.Graph)
+        handle = StringIO()
+        num_edges = edgeexport.write_edges_csv(hashtag_graph, handle)
+        rows = list(csv.reader(StringIO(handle.getvalue())))
+        self.assertEqual(rows[0], ['source', 'target', 'count'])
+        self.assertEqual(len(rows) - 1, num_edges)
+        self.assertEqual(set((v1, v2, int(count)) for (v1, v2, count) in rows[1:]), edge_set(hashtag_graph))
+
+
+    def test_interned_export_names_hashtags(self):
+        input_file = self.corpus()
+        exported = {}
+        for interned in (False, True):
+            hashtag_solution = solution.InsightChallengeSolution(input_file, self.path('ft2-{}'.format(interned)),
+                                                                 interned=interned)
+            solution.feed_tweet_features(input_file, hashtag_graph=hashtag_solution, use_cache=False)
+            for export_format in ('csv', 'binary'):
+                filename = self.path('{}.{}'.format(interned, export_format))
+                self.assertTrue(hashtag_solution.export_hashtag_graph(filename, export_format) > 0)
+            with open(self.path('{}.binary'.format(interned)), 'rb') as f:
+                exported[interned] = set(frozenset(edge[:2]) for edge in edgeexport.read_edges_binary(f))
+            rows = list(csv.reader(StringIO(self.read('{}.csv'.format(interned)))))[1:]
+            self.assertEqual(set(frozenset(row[:2]) for row in rows), exported[interned])
+        self.assertEqual(exported[True], exported[False])
@@ -0,0 +1,62 @@
+'''
+    Tests of follow mode: a followed file is handed out in whole lines, also
+    when they are written in pieces, and a run that follows a finished
+    capture until its idle timeout writes what a batch run writes, including
+    the last tweet when the file does not end with a newline.
+'''
+
+import threading, time
+
+from tests.tweetdata import TempDirTestCase, FIRST_EPOCH, created_at, tweet_line
+
+import solution
+from helper_modules import follow, tweetfile
+
+
+class FollowTest(TempDirTestCase):
+
+    '''
+        Helper Function: A corpus ending in a tweet with hashtags and no newline
+    '''
+    def corpus_without_newline(self):
+        input_file = self.corpus()
+        with open(input_file, 'ab') as f:
+            f.write(tweet_line(u'last #one #two', created_at(FIRST_EPOCH + 5000)))
+        return input_file
+
+
+    def test_lines_without_trailing_newline(self):
+        input_file = self.corpus_without_newline()
+        with tweetfile.TweetFile(input_file) as tweets:
+            expected = [(begin + len(line), line) for (begin, line) in tweets.lines()]
+        lines = [line for line in follow.follow_lines(input_file, poll_interval=0.01, idle_timeout=0.05) if line is not None]
+        self.assertFalse(expected[-1][1].endswith('\n'))
+        self.assertEqual(lines, expected)
+
+
+    def test_lines_written_in_pieces(self):
+        input_file = self.path('growing.txt')
+        line = tweet_line(u'#a #b', created_at(FIRST_EPOCH)) + '\n'
+        with open(input_file, 'wb') as f:
+            f.write(line + line[:10])
+        def write_rest():
+            time.sleep(0.1)
+            with open(input_file, 'ab') as f:
+                f.write(line[10:])
+        writer = threading.Thread(target=write_rest)
+        writer.start()
+        try:
+            lines = [piece for piece in follow.follow_lines(input_file, poll_interval=0.01, idle_timeout=0.3) if piece is not None]
+        finally:
+            writer.join()
+        self.assertEqual(lines, [(len(line), line), (2 * len(line), line)])
+
+
+    def test_follow_matches_batch(self):
+        input_file = self.corpus_without_newline()
+        solution.process_tweet_features(input_file, self.path('batch1'), self.path('batch2'), use_cache=False)
+        solution.process_tweet_features(input_file, self.path('follow1'), self.path('follow2'), use_cache=False,
+                                        follow=True, poll_interval=0.01, idle_timeout=0.05)
+        self.assertTrue(self.read('batch1').splitlines()[-2].startswith('last #one #two'))
+        self.assertSameOutputs({'ft1': self.read('follow1'), 'ft2': self.read('follow2')},
+                               {'ft1': self.read('batch1'), 'ft2': self.read('batch2')})
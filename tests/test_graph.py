@@ -0,0 +1,97 @@
+'''
+    Tests of the hashtag graphs: Graph and CompactGraph under the same random
+    edge stream keep the same edges, degrees and average degree, and the
+    interning table recycles the ids of forgotten hashtags.
+'''
+
+import random, unittest
+
+import tests.tweetdata # Puts the repository on the path
+from helper_modules import graph, interning
+
+
+'''
+    Helper Function: Adjacency of a graph as a dict of vertex --> set of neighbors
+'''
+def adjacency_sets(hashtag_graph):
+    return dict((vertex, set(hashtag_graph.neighbors(vertex))) for vertex in hashtag_graph.get_vertices())
+
+
+class SmallHubGraph(graph.CompactGraph):
+    __slots__ = ()
+    HUB_DEGREE = 8 # So random streams cross it often
+
+
+class CompactGraphTest(unittest.TestCase):
+
+    '''
+        Helper Function: Applies the same random adds and removes to both graphs, checking them on the way
+    '''
+    def check_random_stream(self, num_vertices, num_steps, seed, hub_share=0.0, compact_class=graph.CompactGraph):
+        rng = random.Random(seed)
+        (reference, compact) = (graph.Graph(), compact_class())
+        live_edges = []
+        for step in xrange(num_steps):
+            if (live_edges and rng.random() < 0.45):
+                edge = live_edges.pop(rng.randrange(len(live_edges)))
+                reference.remove_edge(edge)
+                compact.remove_edge(edge)
+            else:
+                v1 = 0 if (rng.random() < hub_share) else rng.randrange(num_vertices)
+                edge = (v1, rng.randrange(num_vertices))
+                live_edges.append(edge)
+                reference.add_edge(edge)
+                compact.add_edge(edge)
+            if (step % 97 == 0):
+                self.assertEqual(adjacency_sets(compact), adjacency_sets(reference))
+                self.assertEqual(compact.get_graph_average_degrees(), reference.get_graph_average_degrees())
+        self.assertEqual(adjacency_sets(compact), adjacency_sets(reference))
+        for vertex in compact.get_vertices():
+            self.assertEqual(len(compact.neighbors(vertex)), len(set(compact.neighbors(vertex))))
+        return compact
+
+
+    def test_matches_graph(self):
+        self.check_random_stream(num_vertices=50, num_steps=5000, seed=1)
+
+
+    def test_hub_vertex_matches_graph(self):
+        # Vertices keep crossing HUB_DEGREE up and down
+        compact = self.check_random_stream(num_vertices=30, num_steps=20000, seed=2, hub_share=0.3,
+                                           compact_class=SmallHubGraph)
+        self.assertTrue(compact.hub_slots)
+        for (vertex, slots) in compact.hub_slots.iteritems():
+            neighbors = compact.neighbors(vertex)
+            self.assertTrue(len(neighbors) > SmallHubGraph.HUB_DEGREE // 2)
+            self.assertEqual(slots, dict((neighbour, slot) for (slot, neighbour) in enumerate(neighbors)))
+
+
+    def test_hub_drains_to_empty(self):
+        compact = graph.CompactGraph()
+        edges = [(0, vertex) for vertex in xrange(1, 3 * graph.CompactGraph.HUB_DEGREE)]
+        for edge in edges:
+            compact.add_edge(edge)
+        self.assertTrue(0 in compact.hub_slots)
+        random.Random(3).shuffle(edges)
+        for edge in edges:
+            compact.remove_edge(edge)
+        self.assertEqual(compact.get_vertices(), [])
+        self.assertEqual(compact.hub_slots, {})
+        self.assertEqual(compact.get_graph_average_degrees(), 0.0)
+
+
+class HashtagTableTest(unittest.TestCase):
+
+    def test_ids_are_recycled(self):
+        table = interning.HashtagTable()
+        ids = table.acquire_all(['#a', '#b', '#c'])
+        self.assertEqual(list(ids), [0, 1, 2])
+        self.assertEqual(table.acquire('#b'), 1) # Second reference
+        table.release_all(ids)
+        self.assertEqual((len(table), table.get_id('#a'), table.get_id('#b')), (1, None, 1))
+
+        # New tags take the freed ids before growing the table
+        self.assertEqual(sorted([table.acquire('#d'), table.acquire('#e')]), [0, 2])
+        self.assertEqual(table.acquire('#f'), 3)
+        for tag in ('#b', '#d', '#e', '#f'):
+            self.assertEqual(table.tag(table.get_id(tag)), tag)
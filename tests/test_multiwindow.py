@@ -0,0 +1,52 @@
+'''
+    Tests of the extra windows: a window of the main window's length writes
+    the main output, and each window's average degree matches a graph
+    rebuilt from the tweets it still holds.
+'''
+
+import random, unittest
+from itertools import combinations
+
+from tests.tweetdata import TempDirTestCase
+
+import solution
+from helper_modules import multiwindow
+
+
+class MultiWindowTest(TempDirTestCase):
+
+    def test_main_length_window_matches_ft2(self):
+        input_file = self.corpus()
+        for (name, options) in (('plain', {}), ('interned', {'interned': True}), ('late', {'lateness': 5})):
+            solution.process_tweet_features(input_file, self.path(name + '1'), self.path(name + '2'), feature1=False,
+                                            use_cache=False, extra_windows=[(60, self.path(name + '.window60')),
+                                                                            (600, self.path(name + '.window600'))],
+                                            **options)
+            self.assertTrue(self.read(name + '2'))
+            self.assertSameOutput(self.read(name + '.window60'), self.read(name + '2'), name)
+
+
+class MultiWindowGraphTest(unittest.TestCase):
+
+    def test_average_degrees_match_rebuilt_graphs(self):
+        rng = random.Random(8)
+        lengths = [4, 30, 200]
+        windows = multiwindow.MultiWindowGraph(lengths)
+        (tweets, epoch) = ([], 1000)
+        for step in xrange(3000):
+            epoch += rng.choice((0, 0, 1, 1, 3, 20))
+            tags = set(rng.sample(range(25), rng.randint(2, 4)))
+            windows.advance(epoch)
+            windows.add_tweet(epoch, tags)
+            tweets.append((epoch, tags))
+            if (step % 37 == 0):
+                expected = []
+                for length in lengths:
+                    edges = set()
+                    for (tweet_epoch, tweet_tags) in tweets:
+                        if (tweet_epoch >= epoch - length):
+                            edges.update(combinations(sorted(tweet_tags), 2))
+                    vertices = set(vertex for edge in edges for vertex in edge)
+                    expected.append(2.0 * len(edges) / len(vertices) if vertices else 0.0)
+                self.assertEqual([round(average, 6) for average in windows.get_average_degrees()],
+                                 [round(average, 6) for average in expected])
@@ -0,0 +1,109 @@
+'''
+    Tests of the graph queries: find_path returns a shortest path, or None
+    between vertices that are not connected, and the component stats match
+    a plain breadth first search, on both graphs and through the interned
+    hashtag names of a solution.
+'''
+
+import random
+from itertools import combinations
+
+from tests.tweetdata import TempDirTestCase
+
+import solution
+from helper_modules import graph
+
+
+'''
+    Helper Function: Distances from start to every vertex it reaches, the brute force way
+'''
+def distances_from(hashtag_graph, start):
+    distances = {start: 0}
+    queue = [start]
+    for vertex in queue:
+        for neighbour in hashtag_graph.neighbors(vertex):
+            if (neighbour not in distances):
+                distances[neighbour] = distances[vertex] + 1
+                queue.append(neighbour)
+    return distances
+
+
+'''
+    Helper Function: A random graph of several clusters joined by a few edges, some left apart
+'''
+def random_graph(graph_class, seed):
+    rng = random.Random(seed)
+    hashtag_graph = graph_class()
+    for cluster in xrange(8):
+        vertices = range(cluster * 30, cluster * 30 + 30)
+        for _ in xrange(rng.choice((5, 25, 60))):
+            hashtag_graph.add_edge(tuple(rng.sample(vertices, 2)))
+    for _ in xrange(4):
+        hashtag_graph.add_edge((rng.randrange(120), rng.randrange(120, 180))) # Leaves the last clusters apart
+    return hashtag_graph
+
+
+class PathTest(TempDirTestCase):
+
+    '''
+        Helper Function: Checks path is a shortest path from st to en in hashtag_graph, or None when they are apart
+    '''
+    def check_path(self, hashtag_graph, path, st, en, distances):
+        if (en not in distances):
+            self.assertEqual(path, None)
+            return
+        self.assertEqual((path[0], path[-1], len(path) - 1), (st, en, distances[en]))
+        for (vertex, neighbour) in zip(path, path[1:]):
+            self.assertTrue(neighbour in hashtag_graph.neighbors(vertex))
+
+
+    def test_shortest_paths(self):
+        for graph_class in (graph.Graph, graph.CompactGraph):
+            hashtag_graph = random_graph(graph_class, seed=11)
+            vertices = sorted(hashtag_graph.get_vertices())
+            for st in vertices[::7]:
+                distances = distances_from(hashtag_graph, st)
+                for en in vertices:
+                    self.check_path(hashtag_graph, hashtag_graph.find_path(st, en), st, en, distances)
+
+
+    def test_path_to_missing_vertex(self):
+        hashtag_graph = graph.Graph()
+        hashtag_graph.add_edge(('#a', '#b'))
+        self.assertEqual(hashtag_graph.find_path('#a', '#z'), None)
+        self.assertEqual(hashtag_graph.find_path('#a', '#b'), ['#a', '#b'])
+        self.assertEqual(hashtag_graph.find_path('#a', '#a'), ['#a'])
+
+
+    def test_component_stats(self):
+        for graph_class in (graph.Graph, graph.CompactGraph):
+            hashtag_graph = random_graph(graph_class, seed=12)
+            (sizes, seen) = ([], set())
+            for vertex in hashtag_graph.get_vertices():
+                if (vertex not in seen):
+                    component = distances_from(hashtag_graph, vertex)
+                    seen.update(component)
+                    sizes.append(len(component))
+            self.assertEqual(hashtag_graph.get_component_stats(), (len(sizes), max(sizes)))
+            self.assertEqual(sum(len(component) for component in hashtag_graph.connected_components()), len(seen))
+        self.assertEqual(graph.Graph().get_component_stats(), (0, 0))
+
+
+    def test_interned_hashtag_paths(self):
+        input_file = self.corpus()
+        solutions = []
+        for interned in (False, True):
+            hashtag_solution = solution.InsightChallengeSolution(input_file, self.path('ft2-{}'.format(interned)),
+                                                                 interned=interned)
+            solution.feed_tweet_features(input_file, hashtag_graph=hashtag_solution, use_cache=False)
+            solutions.append(hashtag_solution)
+        (plain, interned) = solutions
+        self.assertEqual(interned.hashtag_graph_components(), plain.hashtag_graph_components())
+
+        hashtag_graph = plain.hashtag_graph
+        tags = sorted(hashtag_graph.get_vertices())
+        self.assertTrue(len(tags) > 2)
+        for (st, en) in combinations(tags, 2):
+            distances = distances_from(hashtag_graph, st)
+            self.check_path(hashtag_graph, interned.find_hashtag_path(st, en), st, en, distances)
+        self.assertEqual(interned.find_hashtag_path(tags[0], '#nosuchtag'), None)
@@ -0,0 +1,56 @@
+'''
+    Tests of the worker pools: parsed rows come out of the pipeline in input
+    order whatever order the ranges finish in, and runs with several workers
+    write the same outputs as a single process.
+'''
+
+from tests.tweetdata import TempDirTestCase
+
+import solution
+from helper_modules import tweetfile
+
+CHUNK_SIZE = 4096 # Small ranges, so a test corpus is split in dozens of them
+
+
+class PipelineTest(TempDirTestCase):
+
+    '''
+        Helper Function: Runs the features into outputs named prefix1 and prefix2, pipeline ranges of CHUNK_SIZE bytes
+    '''
+    def run_features(self, input_file, prefix, **options):
+        pipeline_tweet_rows = solution.pipeline_tweet_rows
+        solution.pipeline_tweet_rows = lambda input_file, workers: pipeline_tweet_rows(input_file, workers, CHUNK_SIZE)
+        try:
+            solution.process_tweet_features(input_file, self.path(prefix + '1'), self.path(prefix + '2'),
+                                            use_cache=False, **options)
+        finally:
+            solution.pipeline_tweet_rows = pipeline_tweet_rows
+        return {'ft1': self.read(prefix + '1'), 'ft2': self.read(prefix + '2')}
+
+
+    def test_rows_in_input_order(self):
+        input_file = self.corpus()
+        expected = []
+        with tweetfile.TweetFile(input_file) as tweets:
+            for (begin, line) in tweets.lines():
+                parsed = solution.parse_tweet(line)
+                if parsed is not None:
+                    expected.append((begin + len(line),) + parsed)
+        rows = list(solution.pipeline_tweet_rows(input_file, 3, chunk_size=CHUNK_SIZE, max_pending=2))
+        self.assertEqual(len(rows), len(expected))
+        self.assertTrue(rows == expected, 'pipeline rows differ from a sequential parse')
+
+
+    def test_workers_match_single_process(self):
+        input_file = self.corpus()
+        for (name, options) in (('both', {}), ('interned', {'interned': True}), ('late', {'lateness': 5}),
+                                ('feature2', {'feature1': False})):
+            expected = self.run_features(input_file, name + '-single', **options)
+            self.assertSameOutputs(self.run_features(input_file, name + '-workers', workers=2, **options), expected)
+
+
+    def test_parallel_feature1_matches_single_process(self):
+        input_file = self.corpus()
+        solution.process_tweets(input_file, self.path('single1'))
+        solution.process_tweets_parallel(input_file, self.path('workers1'), workers=2, chunk_size=CHUNK_SIZE)
+        self.assertSameOutput(self.read('workers1'), self.read('single1'))
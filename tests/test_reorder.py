@@ -0,0 +1,115 @@
+'''
+    Tests of the lateness tolerance: the reorder buffer hands tweets out in
+    time order once the watermark passes them, a run with lateness over a
+    locally shuffled input writes what a run over the sorted input writes,
+    and tweets older than the window are counted and dropped.
+'''
+
+import random, sys
+from cStringIO import StringIO
+
+from tests.tweetdata import TempDirTestCase, FIRST_EPOCH, created_at, tweet_line
+
+import solution
+from helper_modules import reorder
+
+HASHTAGS = ('#a', '#b', '#c', '#d', '#e', '#f', '#g', '#h')
+
+
+'''
+    Helper Function: Tweets at the given epochs, two to four hashtags each, so each one writes a line
+
+    :rtype List[(epoch, raw JSON line)]
+'''
+def make_tweets(epochs, seed=3):
+    rng = random.Random(seed)
+    tweets = []
+    for (n, epoch) in enumerate(epochs):
+        tags = rng.sample(HASHTAGS, rng.randint(2, 4))
+        tweets.append((epoch, tweet_line(u'tweet {} {}'.format(n, u' '.join(tags)), created_at(epoch))))
+    return tweets
+
+
+'''
+    Helper Function: Writes tweets made by make_tweets to path
+'''
+def write_tweets(path, tweets):
+    with open(path, 'wb') as corpus:
+        for (_, line) in tweets:
+            corpus.write(line + '\n')
+    return path
+
+
+'''
+    Helper Function: Moves every entry of ordered back by up to max_shift places
+'''
+def locally_shuffled(ordered, max_shift, seed=4):
+    rng = random.Random(seed)
+    keyed = [(n + rng.uniform(0, max_shift), value) for (n, value) in enumerate(ordered)]
+    return [value for (_, value) in sorted(keyed)]
+
+
+class ReorderBufferTest(TempDirTestCase):
+
+    def test_releases_in_time_order(self):
+        rng = random.Random(1)
+        lateness = 5
+        buffer = reorder.ReorderBuffer(lateness)
+        (pushed, released) = ([], [])
+        newest = 0
+        for n in xrange(3000):
+            newest += rng.choice((0, 1, 1, 2))
+            epoch = newest - rng.randint(0, lateness)
+            pushed.append((epoch, n))
+            for (released_epoch, item) in buffer.push(epoch, n):
+                self.assertTrue(released_epoch <= newest - lateness)
+                released.append((released_epoch, item))
+            self.assertTrue(all(epoch > buffer.watermark() for (epoch, _, _) in buffer.heap))
+        released.extend(buffer.drain())
+        # Sorted by time, arrival order within a second
+        self.assertEqual(released, sorted(pushed))
+        self.assertEqual(len(buffer), 0)
+
+
+    def test_too_late_released_at_once(self):
+        buffer = reorder.ReorderBuffer(2)
+        self.assertEqual(buffer.push(100, 'a'), [])
+        self.assertEqual(buffer.push(103, 'b'), [(100, 'a')])
+        self.assertEqual(buffer.push(90, 'late'), [(90, 'late')])
+        self.assertEqual(buffer.watermark(), 101)
+        self.assertEqual(buffer.drain(), [(103, 'b')])
+
+
+    def test_lateness_restores_sorted_outputs(self):
+        epochs = [FIRST_EPOCH + 2 * n for n in xrange(800)] # Two seconds apart, so no two tweets tie
+        tweets = make_tweets(epochs)
+        sorted_file = write_tweets(self.path('sorted.txt'), tweets)
+        shuffled_file = write_tweets(self.path('shuffled.txt'), locally_shuffled(tweets, 4))
+        self.assertNotEqual(self.read('sorted.txt'), self.read('shuffled.txt'))
+
+        solution.process_tweet_features(sorted_file, self.path('sorted1'), self.path('sorted2'), feature1=False,
+                                        use_cache=False)
+        solution.process_tweet_features(shuffled_file, self.path('shuffled1'), self.path('shuffled2'), feature1=False,
+                                        use_cache=False, lateness=10)
+        self.assertEqual(len(self.read('sorted2').splitlines()), len(epochs))
+        self.assertSameOutput(self.read('shuffled2'), self.read('sorted2'), 'ft2')
+
+
+    def test_tweets_older_than_window_dropped(self):
+        epochs = [FIRST_EPOCH + n for n in xrange(200)]
+        epochs[150] = FIRST_EPOCH # Behind the window, even with lateness
+        epochs[160] -= 3 # Within the window, kept
+        input_file = write_tweets(self.path('late.txt'), make_tweets(epochs))
+        for lateness in (0, 5):
+            hashtag_solution = solution.InsightChallengeSolution(input_file, self.path('ft2-{}'.format(lateness)),
+                                                                 lateness=lateness)
+            stdout = sys.stdout
+            sys.stdout = StringIO()
+            try:
+                solution.feed_tweet_features(input_file, hashtag_graph=hashtag_solution, use_cache=False)
+                report = sys.stdout.getvalue()
+            finally:
+                sys.stdout = stdout
+            self.assertEqual(hashtag_solution.num_late_tweets_dropped, 1)
+            self.assertTrue('1 tweets arrived after the window moved past them' in report)
+            self.assertEqual(len(self.read('ft2-{}'.format(lateness)).splitlines()), len(epochs) - 1)
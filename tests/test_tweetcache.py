@@ -0,0 +1,87 @@
+# -*- coding: UTF-8 -*-
+
+'''
+    Tests of the pre-parsed tweet cache: a cached run writes the same outputs
+    as a run over the JSON, a changed input is never read from a stale cache,
+    and --stats counts the tweets of a cached run.
+'''
+
+import os, StringIO
+
+from tests.tweetdata import TempDirTestCase, FIRST_EPOCH
+
+import solution
+from helper_modules import stats, tweetcache
+
+
+class TweetCacheTest(TempDirTestCase):
+
+    '''
+        Helper Function: Runs both features over input_file into outputs named prefix1 and prefix2
+    '''
+    def run_features(self, input_file, prefix, **options):
+        solution.process_tweet_features(input_file, self.path(prefix + '1'), self.path(prefix + '2'), **options)
+        return {'ft1': self.read(prefix + '1'), 'ft2': self.read(prefix + '2')}
+
+
+    def test_cached_run_matches_json(self):
+        input_file = self.corpus()
+        self.assertTrue(solution.build_tweet_cache(input_file) > 0)
+        self.assertTrue(tweetcache.load_cache(input_file) is not None)
+
+        for (name, options) in (('plain', {}), ('interned', {'interned': True}), ('late', {'lateness': 5})):
+            expected = self.run_features(input_file, name + '-json', use_cache=False, **options)
+            self.assertTrue(expected['ft2'], 'the corpus must produce ft2 lines')
+            self.assertSameOutputs(self.run_features(input_file, name + '-cache', **options), expected)
+
+
+    def test_cached_run_from_offset_matches_json(self):
+        input_file = self.corpus()
+        solution.build_tweet_cache(input_file)
+        start_offset = os.path.getsize(input_file) // 3 # Mid line, the run starts at the next one
+        self.assertSameOutputs(self.run_features(input_file, 'cache', start_offset=start_offset),
+                               self.run_features(input_file, 'json', start_offset=start_offset, use_cache=False))
+
+
+    def test_changed_input_ignores_cache(self):
+        input_file = self.corpus()
+        solution.build_tweet_cache(input_file)
+
+        # Same size, other mtime
+        stat = os.stat(input_file)
+        os.utime(input_file, (stat.st_atime, stat.st_mtime + 10))
+        self.assertTrue(tweetcache.read_header(input_file) is None)
+        self.assertTrue(tweetcache.load_cache(input_file) is None)
+
+        # Appended tweets must show up in a run that used to be cached
+        solution.build_tweet_cache(input_file)
+        self.corpus('more.txt', num_tweets=50, seed=3, first_epoch=FIRST_EPOCH + 3600)
+        with open(input_file, 'ab') as f:
+            f.write(self.read('more.txt'))
+        self.assertTrue(tweetcache.load_cache(input_file) is None)
+        self.assertSameOutputs(self.run_features(input_file, 'after'),
+                               self.run_features(input_file, 'json', use_cache=False))
+
+
+    def test_truncated_cache_ignored(self):
+        input_file = self.corpus()
+        solution.build_tweet_cache(input_file)
+        cache_file = tweetcache.cache_path(input_file)
+        with open(cache_file, 'r+b') as cache:
+            cache.truncate(os.path.getsize(cache_file) - 100)
+        self.assertTrue(tweetcache.load_cache(input_file) is None)
+
+
+    def test_stats_count_cached_tweets(self):
+        input_file = self.corpus()
+        num_cached = solution.build_tweet_cache(input_file)
+
+        for (name, use_cache) in (('cache', True), ('json', False)):
+            collector = solution.enable_stats(interval=1e-9)
+            collector.stream = StringIO.StringIO()
+            try:
+                self.run_features(input_file, name, use_cache=use_cache)
+            finally:
+                stats.disable()
+            self.assertEqual(collector.ticks, num_cached, name)
+            self.assertTrue('Running stats' in collector.stream.getvalue(), name)
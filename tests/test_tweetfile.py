@@ -0,0 +1,50 @@
+'''
+    Tests of the memory-mapped tweets reader: line access through the sidecar
+    index, its rebuild for a changed input, and the split points handed to
+    the worker pools.
+'''
+
+import os
+
+from tests.tweetdata import TempDirTestCase
+
+import solution
+from helper_modules import tweetfile
+
+
+class TweetFileTest(TempDirTestCase):
+
+    def test_lines_match_file(self):
+        input_file = self.corpus(num_tweets=300)
+        lines = self.read('tweets.txt').splitlines(True)
+        with tweetfile.TweetFile(input_file) as tweets:
+            self.assertEqual(len(tweets), len(lines))
+            self.assertEqual([line for (_, line) in tweets.lines()], lines)
+            self.assertEqual([line for (_, line) in tweets.lines(10, -10)], lines[10:-10])
+            self.assertEqual(tweets.line(-1), lines[-1])
+            offset = tweets.offset(42)
+            self.assertEqual([line for (_, line) in tweets.lines_from_offset(offset - 1)], lines[42:])
+        self.assertTrue(os.path.exists(input_file + '.idx'))
+
+
+    def test_changed_input_rebuilds_index(self):
+        input_file = self.corpus(num_tweets=100)
+        with tweetfile.TweetFile(input_file) as tweets:
+            num_lines = len(tweets)
+        with open(input_file, 'ab') as f:
+            f.write('{"limit":{"track":1}}\n')
+        with tweetfile.TweetFile(input_file) as tweets:
+            self.assertEqual(len(tweets), num_lines + 1)
+
+
+    def test_split_ranges_on_line_boundaries(self):
+        input_file = self.corpus(num_tweets=500)
+        data = self.read('tweets.txt')
+        for chunk_size in (1, 1000, 7777, len(data), 10 * len(data)):
+            ranges = solution.split_input_ranges(input_file, chunk_size)
+            self.assertEqual(ranges[0][0], 0)
+            self.assertEqual(ranges[-1][1], len(data))
+            for ((_, end), (start, _)) in zip(ranges, ranges[1:]):
+                self.assertEqual(end, start)
+                self.assertEqual(data[end - 1], '\n')
+        self.assertEqual(solution.split_input_ranges(self.corpus('empty.txt', num_tweets=0), 1000), [])
@@ -0,0 +1,109 @@
+# -*- coding: UTF-8 -*-
+
+'''
+    Tests of the selective tweet field extraction: the fast path returns
+    what a full parse returns, or falls back to it, on the seeded corpus in
+    the compact layout of the streaming API and on lines whose nested
+    objects carry entities of their own.
+'''
+
+import simplejson
+from collections import OrderedDict
+
+from tests.tweetdata import TempDirTestCase, created_at, FIRST_EPOCH
+
+from helper_modules import tweetjson
+
+FIELDS = ('created_at', 'text', 'id_str', 'timestamp_ms', 'hashtags')
+
+
+'''
+    Helper Function: A JSON line in the compact layout of the streaming API
+'''
+def compact_line(tweet):
+    return simplejson.dumps(tweet, separators=(',', ':'))
+
+
+'''
+    Helper Function: An entities object listing the hashtags of text
+'''
+def entities(text, tags=None):
+    hashtags = []
+    for word in text.split():
+        if (word.startswith('#') and len(word) > 1):
+            start = text.find(word)
+            hashtags.append(OrderedDict([('text', word[1:]), ('indices', [start, start + len(word)])]))
+    if tags is not None:
+        hashtags = [OrderedDict([('text', tag), ('indices', [0, len(tag) + 1])]) for tag in tags]
+    return OrderedDict([('hashtags', hashtags), ('urls', []), ('user_mentions', [])])
+
+
+'''
+    Helper Function: A streamed tweet object, extra keys go between user and timestamp_ms
+'''
+def tweet(text, epoch=FIRST_EPOCH, tags=None, **extra):
+    status = OrderedDict([('created_at', created_at(epoch)), ('id', 7), ('id_str', '7'), ('text', text),
+                          ('user', OrderedDict([('id', 2), ('name', 'Test User')]))])
+    status.update(sorted(extra.items()))
+    status['entities'] = entities(text, tags)
+    status['timestamp_ms'] = str(epoch * 1000)
+    return status
+
+
+class TweetJsonTest(TempDirTestCase):
+
+    '''
+        Helper Function: Checks the fast path against a full parse, returns True if it did not fall back
+    '''
+    def check_line(self, line):
+        full = tweetjson.extract_fields_full(line, FIELDS)
+        self.assertEqual(tweetjson.extract_fields(line, FIELDS), full, line)
+        try:
+            fast = tweetjson.extract_fields_fast(line, FIELDS)
+        except tweetjson.FallbackToFullParse:
+            return False
+        self.assertEqual(fast, full, line)
+        return True
+
+
+    def test_seeded_corpus_matches_full_parse(self):
+        num_fast = 0
+        with open(self.corpus()) as corpus:
+            for line in corpus:
+                if not line.strip():
+                    continue
+                decoded = simplejson.loads(line, object_pairs_hook=OrderedDict)
+                if ('text' in decoded):
+                    decoded['entities'] = entities(decoded['text'])
+                    decoded['timestamp_ms'] = decoded.pop('timestamp_ms', str(FIRST_EPOCH * 1000))
+                for layout in (compact_line(decoded), simplejson.dumps(decoded)):
+                    num_fast += self.check_line(layout)
+        self.assertTrue(num_fast > 1000)
+
+
+    def test_nested_entities_fall_back(self):
+        nested = tweet(u'inner #Nested text', tags=['Nested'])
+        lines = [
+            tweet(u'top #Top', retweeted_status=nested),
+            tweet(u'top #Top', quoted_status=nested),
+            tweet(u'top #Top …', extended_tweet=OrderedDict([('full_text', u'top #Top #Longer'),
+                                                               ('entities', entities(u'#Top #Longer'))])),
+            tweet(u'top #Top', place=OrderedDict([('name', 'Here'), ('entities', entities(u'#Place'))])),
+            tweet(u'top #Top', zfuture=OrderedDict([('entities', entities(u'#Future'))])),
+            tweet(u'no tags at the top'),
+            tweet(u'escaped "entities":{"hashtags":[ in the text #Top'),
+            tweet(u'caf\xe9 #Caf\xe9 #❤', tags=[u'Caf\xe9', u'❤']),
+        ]
+        # A nested object after the top-level entities
+        after = tweet(u'top #Top')
+        after['zlast'] = OrderedDict([('entities', entities(u'#After'))])
+        after['timestamp_ms'] = after.pop('timestamp_ms')
+        lines.append(after)
+        # Top-level entities that do not start with hashtags, next to a nested one that does
+        reordered = tweet(u'top #Top', aplace=OrderedDict([('entities', entities(u'#Place'))]))
+        reordered['entities'] = OrderedDict(reversed(reordered['entities'].items()))
+        lines.append(reordered)
+
+        fast = [self.check_line(compact_line(status)) for status in lines]
+        self.assertEqual(fast, [False, False, False, False, False, True, True, True, False, False])
+        self.assertEqual(tweetjson.extract_fields(compact_line(lines[2]), FIELDS)['hashtags'], ['Top'])
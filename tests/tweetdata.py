@@ -0,0 +1,151 @@
+# -*- coding: UTF-8 -*-
+
+'''
+    Small reproducible tweet corpora and helpers shared by the tests.
+
+    A corpus is a seeded mix of what real captures hold: tweets with zero
+    to four hashtags drawn from a skewed pool, texts with unicode, escaped
+    characters and repeated #s, tweets a few seconds out of order, malformed
+    timestamps, rate limit messages and keep-alive blank lines. The same
+    seed always writes the same file.
+
+    Run the suite from the repository root: python -m unittest discover -s tests -t .
+'''
+
+import os, random, shutil, sys, tempfile, time, unittest
+import simplejson
+from collections import OrderedDict
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+HASHTAGS = ('#Spark', '#Apache', '#Hadoop', '#Storm', '#Flink', '#Kafka', '#news', '#bigdata',
+            '#Python', '#ml', '#cloud', '#data', '#AI', '#ops', '#jobs', '#dev')
+
+WORDS = ('the', 'data', 'stream', 'summit', 'this', 'week', 'new', 'release', 'love', 'today')
+
+UNICODE_WORDS = (u'café', u'João', u'❤', u'naïve')
+
+TIME_FORMAT = '%a %b %d %H:%M:%S +0000 %Y'
+FIRST_EPOCH = 1446141061 # Thu Oct 29 17:51:01 +0000 2015
+
+
+'''
+    Function that formats an epoch second as a created_at string
+'''
+def created_at(epoch):
+    return time.strftime(TIME_FORMAT, time.gmtime(epoch))
+
+
+'''
+    Function that returns one raw JSON line of a tweet
+'''
+def tweet_line(text, time_str, timestamp_ms=None):
+    tweet = OrderedDict([('created_at', time_str), ('id', 1), ('text', text),
+                         ('user', {'id': 2, 'name': 'Test User', 'description': None})])
+    if timestamp_ms is not None:
+        tweet['timestamp_ms'] = timestamp_ms
+    return simplejson.dumps(tweet)
+
+
+'''
+    Function that writes a seeded corpus of num_tweets lines to path
+
+    :rtype int - number of tweets (lines the features see as tweets)
+'''
+def write_corpus(path, num_tweets=1500, seed=7, max_late=4, first_epoch=FIRST_EPOCH):
+    rng = random.Random(seed)
+    epoch = first_epoch
+    num_written = 0
+    with open(path, 'wb') as corpus:
+        for i in xrange(num_tweets):
+            epoch += rng.choice((0, 0, 1, 1, 2, 3, 7))
+            words = [rng.choice(WORDS) for _ in xrange(rng.randint(1, 6))]
+            num_tags = rng.choice((0, 1, 2, 2, 3, 4))
+            for _ in xrange(num_tags):
+                # Skewed towards the first tags, so hub vertices build up
+                words.insert(rng.randint(0, len(words)), HASHTAGS[int(len(HASHTAGS) * rng.random() ** 2)])
+            if (rng.random() < 0.1):
+                words.append(rng.choice(UNICODE_WORDS))
+            if (rng.random() < 0.05):
+                words.append(u'##Double,')
+            if (rng.random() < 0.05):
+                words.append(u'line\nbreak "quoted" \\/ slash')
+            tweet_epoch = epoch - rng.randint(0, max_late) if (rng.random() < 0.1) else epoch
+            time_str = created_at(tweet_epoch) if (rng.random() > 0.01) else 'not a time'
+            timestamp_ms = str(tweet_epoch * 1000 + rng.randint(0, 999)) if (rng.random() < 0.5) else None
+            corpus.write(tweet_line(u' '.join(words), time_str, timestamp_ms) + '\n')
+            num_written += 1
+            if (i % 97 == 0):
+                corpus.write('{"limit":{"track":5,"timestamp_ms":"1446141061000"}}\n')
+            if (i % 131 == 0):
+                corpus.write('\n')
+    return num_written
+
+
+class TempDirTestCase(unittest.TestCase):
+
+    '''
+        Creates an empty working directory for every test
+    '''
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp(prefix='insight-tests-')
+
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+
+    '''
+        Function that returns the path of name in the working directory
+    '''
+    def path(self, name):
+        return os.path.join(self.temp_dir, name)
+
+
+    '''
+        Function that writes a corpus in the working directory, see write_corpus
+
+        :rtype str - its path
+    '''
+    def corpus(self, name='tweets.txt', **options):
+        path = self.path(name)
+        write_corpus(path, **options)
+        return path
+
+
+    '''
+        Checks two output texts are equal, reporting the first line that differs
+
+        assertEqual would diff the whole outputs, which takes ages on a few thousand lines.
+    '''
+    def assertSameOutput(self, first, second, name='output'):
+        if (first == second):
+            return
+        (first_lines, second_lines) = (first.splitlines(), second.splitlines())
+        for n in xrange(max(len(first_lines), len(second_lines))):
+            (line1, line2) = (first_lines[n:n + 1], second_lines[n:n + 1])
+            if (line1 != line2):
+                self.fail('{} differs from line {} on: {!r} != {!r}'.format(name, n + 1, line1, line2))
+        self.fail('{} differs in line endings'.format(name))
+
+
+    '''
+        Checks two dicts of output texts are equal
+    '''
+    def assertSameOutputs(self, first, second):
+        self.assertEqual(sorted(first), sorted(second))
+        for name in sorted(first):
+            self.assertSameOutput(first[name], second[name], name)
+
+
+    '''
+        Function that returns the contents of a file of the working directory, '' when missing
+    '''
+    def read(self, name):
+        path = self.path(name)
+        if not os.path.exists(path):
+            return ''
+        with open(path, 'rb') as f:
+            return f.read()